@@ -2,80 +2,120 @@
 Data Migration Script
 Migrates data from .txt files to Django database
 Run this script after initial migration: python manage.py shell < data_migration.py
+
+Each file is migrated in chunks, one transaction per chunk, with a checkpoint
+saved alongside every chunk. A failed run keeps what it committed and a rerun
+continues from the last checkpoint.
 """
 
 import os
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from django.utils import timezone
-from django.contrib.auth.hashers import make_password
-from django.db import transaction
+from django.db import connections, transaction
 
 # Import models
-from pos_system.models import (
+from pos.models import (
     Employee, Item, Customer, Rental, Sale, SaleItem,
     ReturnTransaction, ReturnItem, Coupon, EmployeeLog
 )
+from legacy.formats import parse_legacy_date, parse_log_timestamp
+from legacy.keymaps import KeyMap
+from legacy.passwords import hash_passwords
+from legacy.reader import read_chunks, resume_position
 
 
-def parse_date(date_str):
-    """Parse date from MM/dd/yy format"""
+def parse_date(token):
+    """Parse a date field (bytes) from MM/dd/yy format"""
     try:
-        return datetime.strptime(date_str, '%m/%d/%y').date()
+        return parse_legacy_date(token)
     except ValueError:
         # Try alternative format
         try:
-            return datetime.strptime(date_str, '%m/%d/%Y').date()
+            return datetime.strptime(token.decode(), '%m/%d/%Y').date()
         except ValueError:
-            print(f"Warning: Could not parse date: {date_str}")
+            print(f"Warning: Could not parse date: {token.decode(errors='replace')}")
             return datetime.now().date()
 
 
-def migrate_employees(file_path='Database/employeeDatabase.txt'):
-    """Migrate employees from employeeDatabase.txt"""
+def warn_unknown(rows, keys, counter):
+    """Print one line for rows skipped because their key was not found"""
+    if counter:
+        examples = ', '.join(str(key) for key, _ in counter.most_common(10))
+        print(f"Warning: Skipped {sum(counter.values())} {rows} of {len(counter)} unknown {keys} "
+              f"(most frequent: {examples})")
+
+
+def migrate_employees(file_path='Database/employeeDatabase.txt', restart=False,
+                      fast_hash=False, workers=None):
+    """
+    Migrate employees from employeeDatabase.txt
+    Passwords of new employees are hashed in a process pool of workers
+    processes, started once for the whole file. With fast_hash they are
+    stored with the cheap import hasher and rehashed on each employee's
+    first login.
+    """
     print("Migrating employees...")
     count = 0
+    skipped = 0
     
     if not os.path.exists(file_path):
         print(f"Warning: {file_path} not found")
         return
     
-    with open(file_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            
-            parts = line.split()
-            if len(parts) < 5:
-                print(f"Warning: Invalid employee line: {line}")
-                continue
+    pool = None
+    try:
+        for chunk in read_chunks(file_path, resume_position(file_path, restart)):
+            rows = {}
+            for view in chunk.iter_lines():
+                parts = bytes(view).split()
+                if not parts:
+                    continue
+                
+                if len(parts) < 5:
+                    print(f"Warning: Invalid employee line: {bytes(view).decode(errors='replace')}")
+                    continue
+                parts = [part.decode() for part in parts[:5]]
+                rows.setdefault(parts[0], parts)
             
-            username = parts[0]
-            position = parts[1]
-            first_name = parts[2]
-            last_name = parts[3]
-            password = parts[4]
+            # Check which employees already exist
+            existing = set(Employee.objects.filter(username__in=list(rows)).values_list('username', flat=True))
+            skipped += len(existing)
+            new_rows = [parts for username, parts in rows.items() if username not in existing]
             
-            # Check if employee already exists
-            if Employee.objects.filter(username=username).exists():
-                print(f"Employee {username} already exists, skipping...")
-                continue
+            if pool is None and not fast_hash and workers != 0 and len(new_rows) > 1:
+                # Workers are forked on the first submit; make sure none inherits a connection
+                connections.close_all()
+                pool = ProcessPoolExecutor(max_workers=workers)
+            password_hashes = hash_passwords([parts[4] for parts in new_rows], pool=pool, workers=0, fast=fast_hash)
+            employees = [
+                Employee(
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    position=position,
+                    password=password_hash,
+                    is_staff=(position == 'Admin')
+                )
+                for (username, position, first_name, last_name, _), password_hash in zip(new_rows, password_hashes)
+            ]
             
-            Employee.objects.create(
-                username=username,
-                first_name=first_name,
-                last_name=last_name,
-                position=position,
-                password_hash=make_password(password),
-                is_staff=(position == 'Admin')
-            )
-            count += 1
+            with transaction.atomic():
+                Employee.objects.bulk_create(employees, batch_size=1000)
+                chunk.commit()
+            count += len(employees)
+    finally:
+        if pool is not None:
+            pool.shutdown()
     
+    if skipped:
+        print(f"Skipped {skipped} employees that already exist")
     print(f"Migrated {count} employees")
 
 
-def migrate_items(file_path='Database/itemDatabase.txt', item_type='Sale'):
+def migrate_items(file_path='Database/itemDatabase.txt', item_type='Sale', restart=False):
     """Migrate items from itemDatabase.txt or rentalDatabase.txt"""
     print(f"Migrating {item_type} items...")
     count = 0
@@ -84,59 +124,53 @@ def migrate_items(file_path='Database/itemDatabase.txt', item_type='Sale'):
         print(f"Warning: {file_path} not found")
         return
     
-    with open(file_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+    # Stock fields this file sets; 'Both' fills both on new items only
+    stock_fields = {'Sale': ['stock_sale'], 'Rental': ['stock_rental']}.get(item_type, [])
+    
+    for chunk in read_chunks(file_path, resume_position(file_path, restart)):
+        rows = {}
+        for view in chunk.iter_lines():
+            parts = bytes(view).split()
+            if not parts:
                 continue
             
-            parts = line.split()
             if len(parts) < 4:
-                print(f"Warning: Invalid item line: {line}")
+                print(f"Warning: Invalid item line: {bytes(view).decode(errors='replace')}")
                 continue
             
             try:
                 item_id = int(parts[0])
-                name = parts[1]
-                price = float(parts[2])
-                amount = int(parts[3])
-                
-                # Check if item already exists
-                item, created = Item.objects.get_or_create(
-                    item_id=item_id,
-                    defaults={
-                        'name': name,
-                        'price': price,
-                        'item_type': item_type,
-                    }
-                )
-                
-                if created:
-                    if item_type == 'Sale':
-                        item.stock_sale = amount
-                    elif item_type == 'Rental':
-                        item.stock_rental = amount
-                    else:
-                        item.stock_sale = amount
-                        item.stock_rental = amount
-                    item.save()
-                    count += 1
-                else:
-                    # Update existing item
-                    if item_type == 'Sale':
-                        item.stock_sale = amount
-                    elif item_type == 'Rental':
-                        item.stock_rental = amount
-                    item.save()
-                    
+                row = rows.setdefault(item_id, {'name': parts[1].decode(), 'price': float(parts[2])})
+                # A repeated item keeps its first name and price and its last amount
+                row['amount'] = int(parts[3])
             except (ValueError, IndexError) as e:
-                print(f"Warning: Error parsing item line '{line}': {e}")
+                print(f"Warning: Error parsing item line '{bytes(view).decode(errors='replace')}': {e}")
                 continue
+        
+        existing = Item.objects.in_bulk(list(rows), field_name='item_id')
+        new_items = []
+        for item_id, row in rows.items():
+            item = existing.get(item_id)
+            if item is None:
+                item = Item(item_id=item_id, name=row['name'], price=row['price'], item_type=item_type)
+                new_items.append(item)
+                for field in stock_fields or ['stock_sale', 'stock_rental']:
+                    setattr(item, field, row['amount'])
+            else:
+                for field in stock_fields:
+                    setattr(item, field, row['amount'])
+        
+        with transaction.atomic():
+            Item.objects.bulk_create(new_items, batch_size=1000)
+            if stock_fields and existing:
+                Item.objects.bulk_update(existing.values(), stock_fields, batch_size=1000)
+            chunk.commit()
+        count += len(new_items)
     
     print(f"Migrated {count} {item_type} items")
 
 
-def migrate_customers_and_rentals(file_path='Database/userDatabase.txt'):
+def migrate_customers_and_rentals(file_path='Database/userDatabase.txt', restart=False):
     """Migrate customers and rentals from userDatabase.txt"""
     print("Migrating customers and rentals...")
     customer_count = 0
@@ -146,87 +180,77 @@ def migrate_customers_and_rentals(file_path='Database/userDatabase.txt'):
         print(f"Warning: {file_path} not found")
         return
     
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-        
-        # Skip header line
-        if lines:
-            lines = lines[1:]
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
+    # Items are resolved in memory; customers through a bounded map
+    item_pks = KeyMap(Item, 'item_id')
+    unknown_items = Counter()
+    customer_pks = KeyMap(Customer, 'phone_key')
+    
+    for chunk in read_chunks(file_path, resume_position(file_path, restart), skip_header=True):
+        # Parse the chunk first: (phone_key, phone_number, [(item_id, due_date, returned)])
+        entries = []
+        for view in chunk.iter_lines():
+            fields = bytes(view).split()
+            if not fields:
                 continue
             
-            parts = line.split()
-            if len(parts) < 1:
-                continue
+            phone_number, *rental_entries = fields
+            phone_number = phone_number.decode()
+            rentals = []
+            # Parse rental entries (format: itemID,returnDate,returned)
+            for rental_entry in rental_entries:
+                rental_parts = rental_entry.split(b',')
+                if len(rental_parts) < 3:
+                    continue
+                try:
+                    item_id = int(rental_parts[0])
+                except ValueError as e:
+                    print(f"Warning: Error parsing rental entry '{rental_entry.decode(errors='replace')}': {e}")
+                    continue
+                rentals.append((item_id, parse_date(rental_parts[1]), rental_parts[2].lower() == b'true'))
+            entries.append((Customer.normalize_phone(phone_number), phone_number, rentals))
+        
+        # Differently formatted numbers are one customer, stored as first seen
+        phone_numbers = {}
+        for phone_key, phone_number, _ in entries:
+            phone_numbers.setdefault(phone_key, {'phone_number': phone_number})
+        with transaction.atomic():
+            customers, created = customer_pks.ensure(phone_numbers, fields=phone_numbers)
+            customer_count += len(created)
+            items = item_pks.resolve(item_id for _, _, rentals in entries for item_id, _, _ in rentals)
             
-            try:
-                phone_number = parts[0]
-                
-                # Get or create customer
-                customer, created = Customer.objects.get_or_create(
-                    phone_number=phone_number
-                )
-                if created:
-                    customer_count += 1
-                
-                # Parse rental entries (format: itemID,returnDate,returned)
-                if len(parts) > 1:
-                    for rental_entry in parts[1:]:
-                        rental_parts = rental_entry.split(',')
-                        if len(rental_parts) < 3:
-                            continue
-                        
-                        try:
-                            item_id = int(rental_parts[0])
-                            return_date_str = rental_parts[1]
-                            returned_str = rental_parts[2]
-                            
-                            # Parse dates
-                            due_date = parse_date(return_date_str)
-                            rental_date = due_date - timedelta(days=14)  # Assume 14-day rental period
-                            
-                            # Check if item exists
-                            try:
-                                item = Item.objects.get(item_id=item_id)
-                            except Item.DoesNotExist:
-                                print(f"Warning: Item {item_id} not found, skipping rental")
-                                continue
-                            
-                            # Check if rental already exists
-                            is_returned = returned_str.lower() == 'true'
-                            return_date = None
-                            if is_returned:
-                                return_date = parse_date(return_date_str)
-                            
-                            # Create rental record
-                            Rental.objects.get_or_create(
-                                customer=customer,
-                                item=item,
-                                due_date=due_date,
-                                defaults={
-                                    'rental_date': rental_date,
-                                    'return_date': return_date,
-                                    'is_returned': is_returned,
-                                    'quantity': 1,
-                                }
-                            )
-                            rental_count += 1
-                            
-                        except (ValueError, IndexError) as e:
-                            print(f"Warning: Error parsing rental entry '{rental_entry}': {e}")
-                            continue
-                            
-            except (ValueError, IndexError) as e:
-                print(f"Warning: Error parsing customer line '{line}': {e}")
-                continue
+            # New customers cannot have rentals yet
+            existing = set(Rental.objects.filter(
+                customer_id__in=[pk for phone, pk in customers.items() if phone not in created]
+            ).values_list('customer_id', 'item_id', 'due_date'))
+            
+            new_rentals = []
+            for phone_key, _, rentals in entries:
+                for item_id, due_date, is_returned in rentals:
+                    if item_id not in items:
+                        unknown_items[item_id] += 1
+                        continue
+                    key = (customers[phone_key], items[item_id], due_date)
+                    if key in existing:
+                        continue
+                    existing.add(key)
+                    new_rentals.append(Rental(
+                        customer_id=key[0],
+                        item_id=key[1],
+                        due_date=due_date,
+                        rental_date=due_date - timedelta(days=14),  # Assume 14-day rental period
+                        return_date=due_date if is_returned else None,
+                        is_returned=is_returned,
+                        quantity=1
+                    ))
+            Rental.objects.bulk_create(new_rentals, batch_size=1000)
+            rental_count += len(new_rentals)
+            chunk.commit()
     
+    warn_unknown('rentals', 'items', unknown_items)
     print(f"Migrated {customer_count} customers and {rental_count} rentals")
 
 
-def migrate_coupons(file_path='Database/couponNumber.txt'):
+def migrate_coupons(file_path='Database/couponNumber.txt', restart=False):
     """Migrate coupons from couponNumber.txt"""
     print("Migrating coupons...")
     count = 0
@@ -235,19 +259,21 @@ def migrate_coupons(file_path='Database/couponNumber.txt'):
         print(f"Warning: {file_path} not found")
         return
     
-    with open(file_path, 'r') as f:
-        for line in f:
-            code = line.strip()
-            if not code:
-                continue
-            
-            Coupon.objects.get_or_create(code=code)
-            count += 1
+    for chunk in read_chunks(file_path, resume_position(file_path, restart)):
+        with transaction.atomic():
+            for view in chunk.iter_lines():
+                code = bytes(view).strip()
+                if not code:
+                    continue
+                
+                Coupon.objects.get_or_create(code=code.decode())
+                count += 1
+            chunk.commit()
     
     print(f"Migrated {count} coupons")
 
 
-def migrate_employee_logs(file_path='Database/employeeLogfile.txt'):
+def migrate_employee_logs(file_path='Database/employeeLogfile.txt', restart=False):
     """Migrate employee logs from employeeLogfile.txt"""
     print("Migrating employee logs...")
     count = 0
@@ -256,62 +282,69 @@ def migrate_employee_logs(file_path='Database/employeeLogfile.txt'):
         print(f"Warning: {file_path} not found")
         return
     
-    with open(file_path, 'r') as f:
-        for line in f:
-            line = line.strip()
+    employee_pks = KeyMap(Employee, 'username')
+    unknown_employees = Counter()
+    
+    for chunk in read_chunks(file_path, resume_position(file_path, restart)):
+        logs = []
+        for view in chunk.iter_lines():
+            line = bytes(view).strip()
             if not line:
                 continue
             
             # Parse format: "name (username position) logs into POS System. Time: yyyy-MM-dd HH:mm:ss.SSS"
             try:
-                if 'logs into' in line:
+                if b'logs into' in line:
                     action = 'login'
-                elif 'logs out' in line:
+                elif b'logs out' in line:
                     action = 'logout'
                 else:
                     continue
                 
-                # Extract timestamp
-                if 'Time: ' in line:
-                    time_str = line.split('Time: ')[1].strip()
-                    timestamp = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S.%f')
-                    
-                    # Extract username (between parentheses)
-                    if '(' in line and ')' in line:
-                        username_part = line.split('(')[1].split(')')[0]
-                        username = username_part.split()[0]
-                        
-                        try:
-                            employee = Employee.objects.get(username=username)
-                            EmployeeLog.objects.create(
-                                employee=employee,
-                                action=action,
-                                timestamp=timestamp
-                            )
-                            count += 1
-                        except Employee.DoesNotExist:
-                            print(f"Warning: Employee {username} not found for log entry")
-                            
+                # Extract timestamp and username (between parentheses)
+                if b'Time: ' in line and b'(' in line and b')' in line:
+                    time_str = line.split(b'Time: ')[1].strip().decode()
+                    timestamp = timezone.make_aware(parse_log_timestamp(time_str))
+                    username_part = line.split(b'(')[1].split(b')')[0]
+                    logs.append((username_part.split()[0].decode(), action, timestamp))
+            
             except (ValueError, IndexError) as e:
-                print(f"Warning: Error parsing log line '{line}': {e}")
+                print(f"Warning: Error parsing log line '{line.decode(errors='replace')}': {e}")
                 continue
+        
+        employees = employee_pks.resolve(username for username, _, _ in logs)
+        new_logs = []
+        for username, action, timestamp in logs:
+            if username not in employees:
+                unknown_employees[username] += 1
+                continue
+            new_logs.append(EmployeeLog(employee_id=employees[username], action=action, timestamp=timestamp))
+        
+        with transaction.atomic():
+            EmployeeLog.objects.bulk_create(new_logs, batch_size=1000)
+            chunk.commit()
+        count += len(new_logs)
     
+    warn_unknown('log entries', 'employees', unknown_employees)
     print(f"Migrated {count} employee logs")
 
 
-def run_migration():
-    """Run all migrations"""
+def run_migration(restart=False, fast_hash=False):
+    """
+    Run all migrations
+    Pass restart=True to ignore checkpoints and migrate every file again, and
+    fast_hash=True to defer full password hashing to each first login.
+    """
     print("=" * 50)
     print("Starting Data Migration from .txt files to Django Database")
     print("=" * 50)
     
-    with transaction.atomic():
-        migrate_employees()
-        migrate_items('Database/itemDatabase.txt', 'Sale')
-        migrate_items('Database/rentalDatabase.txt', 'Rental')
-        migrate_customers_and_rentals()
-        migrate_coupons()
-        migrate_employee_logs()
+    migrate_employees(restart=restart, fast_hash=fast_hash)
+    migrate_items('Database/itemDatabase.txt', 'Sale', restart=restart)
+    migrate_items('Database/rentalDatabase.txt', 'Rental', restart=restart)
+    migrate_customers_and_rentals(restart=restart)
+    migrate_coupons(restart=restart)
+    migrate_employee_logs(restart=restart)
     
     print("=" * 50)
     print("Data Migration Complete!")
@@ -1,250 +1,381 @@
 """
 Legacy Data Importer
 Migrates data from .txt files to Django database
+
+Files are parsed and validated in a process pool while a single writer (the
+main process) commits the results in dependency order: employees, items,
+coupons, then customers and rentals from one pass over userDatabase.txt.
+Every chunk is committed together with its file checkpoint, so an interrupted
+import resumes where it stopped.
+
+    python legacy/data_importer.py [--workers N] [--restart] [--fast-hash]
 """
 
+import argparse
 import os
 import sys
 import django
-from datetime import datetime, timedelta
-from decimal import Decimal
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
 
 # Setup Django
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pos_system.settings')
 django.setup()
 
-from pos.models import Employee, Item, Customer, Rental, Coupon, EmployeeLog
+from pos.models import Employee, Item, Customer, Rental, Coupon
 from pos.config import SystemConfig
-from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from legacy.formats import parse_legacy_date
+from legacy.keymaps import KeyMap
+from legacy.passwords import hash_passwords
+from legacy.reader import read_chunks, resume_position
 
+# Rows per INSERT statement
+BATCH_SIZE = 1000
+# Lines between progress reports
+PROGRESS_EVERY = 50000
+# Chunks per file parsed ahead of the writer
+READ_AHEAD = 4
 
-def import_employees():
-    """Import employees from employeeDatabase.txt"""
-    file_path = SystemConfig.EMPLOYEE_DB
-    count = 0
-    
+
+# --- Parsing (runs in worker processes, no database access) ---
+# Parsers get one stripped line as bytes
+
+def parse_employee(line, warnings):
+    """username position first_name last_name password"""
+    parts = line.decode().split()
+    if len(parts) < 5:
+        raise ValueError("expected 5 fields")
+    return tuple(parts[:5])
+
+
+def parse_item(line, warnings):
+    """item_id name price amount"""
+    parts = line.decode().split()
+    if len(parts) < 4:
+        raise ValueError("expected 4 fields")
     try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                parts = line.split()
-                if len(parts) >= 5:
-                    username = parts[0]
-                    position = parts[1]
-                    first_name = parts[2]
-                    last_name = parts[3]
-                    password = parts[4]
-                    
-                    # Check if employee already exists
-                    if not Employee.objects.filter(username=username).exists():
-                        Employee.objects.create_user(
-                            username=username,
-                            first_name=first_name,
-                            last_name=last_name,
-                            position=position,
-                            password=password,
-                            is_staff=(position == 'Admin')
-                        )
-                        count += 1
-                        print(f"Imported employee: {username}")
-    except FileNotFoundError:
-        print(f"File not found: {file_path}")
+        price = Decimal(parts[2])
+    except InvalidOperation:
+        raise ValueError(f"invalid price {parts[2]!r}")
+    return int(parts[0]), parts[1], price, int(parts[3])
+
+
+def parse_coupon(line, warnings):
+    """code"""
+    return (line.decode(),)
+
+
+def parse_user(line, warnings):
+    """
+    phone_number itemID,MM/dd/yy,returned ...
+    Returns (phone_number, rentals); each rental is
+    (item_id, rental_date, due_date, return_date, is_returned).
+    """
+    phone_number, *entries = line.split()
+    phone_number = phone_number.decode()
+    rental_period = timedelta(days=SystemConfig.get_rental_period_days())
+    rentals = []
+    for entry in entries:
+        rental_data = entry.split(b',')
+        if len(rental_data) < 3:
+            continue
+        try:
+            item_id = int(rental_data[0])
+            return_date = parse_legacy_date(rental_data[1])
+        except ValueError:
+            warnings.append(f"Invalid rental entry for {phone_number}: {entry.decode(errors='replace')}")
+            continue
+        is_returned = rental_data[2].lower() == b'true'
+        rental_date = return_date - rental_period
+        rentals.append((item_id, rental_date, return_date,
+                        return_date if is_returned else None, is_returned))
+    return phone_number, rentals
+
+
+PARSERS = {
+    'employee': parse_employee,
+    'item': parse_item,
+    'coupon': parse_coupon,
+    'user': parse_user,
+}
+
+
+def parse_chunk(kind, chunk):
+    """
+    Parse the lines of a LineChunk; returns (records, warnings)
+    Parsers raise ValueError to skip a whole line, or add to warnings when
+    they skip part of one.
+    """
+    parse_line = PARSERS[kind]
+    records, warnings = [], []
+    for view in chunk.iter_lines():
+        line = bytes(view).strip()
+        if not line:
+            continue
+        try:
+            records.append(parse_line(line, warnings))
+        except ValueError as e:
+            warnings.append(f"Skipping {kind} line '{line.decode(errors='replace')}': {e}")
+    return records, warnings
+
+
+class ParsedFile:
+    """
+    Chunks of one legacy file, parsed ahead of the writer in a process pool
+    Iterating yields (chunk, records) in file order, starting at position.
+    Workers are only sent the chunk's byte range and map the file themselves.
+    Without a pool the chunks are parsed inline.
+    """
     
-    return count
+    def __init__(self, pool, kind, file_path, position=(0, 0), skip_header=False):
+        self.pool = pool
+        self.kind = kind
+        self.file_path = file_path
+        self._pending = deque()
+        try:
+            self._chunks = read_chunks(file_path, position, skip_header=skip_header)
+            self._fill()
+        except FileNotFoundError:
+            print(f"File not found: {file_path}")
+            self._chunks = iter(())
+    
+    def _submit(self, chunk):
+        if self.pool is None:
+            future = Future()
+            future.set_result(parse_chunk(self.kind, chunk))
+            return future
+        return self.pool.submit(parse_chunk, self.kind, chunk)
+    
+    def _fill(self):
+        while len(self._pending) < READ_AHEAD:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._pending.append((chunk, self._submit(chunk)))
+    
+    def __iter__(self):
+        while self._pending:
+            chunk, future = self._pending.popleft()
+            self._fill()
+            records, warnings = future.result()
+            for warning in warnings:
+                print(f"Warning: {warning}")
+            yield chunk, records
 
 
-def import_items():
-    """Import items from itemDatabase.txt"""
-    file_path = SystemConfig.ITEM_DB
-    count = 0
+# --- Writing (main process only) ---
+
+class Progress:
+    """Prints a progress line every PROGRESS_EVERY lines"""
     
-    try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                parts = line.split()
-                if len(parts) >= 4:
-                    item_id = int(parts[0])
-                    name = parts[1]
-                    price = float(parts[2])
-                    amount = int(parts[3])
-                    
-                    # Check if item already exists
-                    if not Item.objects.filter(item_id=item_id).exists():
-                        Item.objects.create(
-                            item_id=item_id,
-                            name=name,
-                            price=Decimal(str(price)),
-                            stock_sale=amount,
-                            stock_rental=amount,
-                            item_type='Both'
-                        )
-                        count += 1
-                        print(f"Imported item: {name} (ID: {item_id})")
-    except FileNotFoundError:
-        print(f"File not found: {file_path}")
+    def __init__(self, label):
+        self.label = label
+        self.next_report = PROGRESS_EVERY
     
-    return count
+    def update(self, lines_read, **counts):
+        if lines_read >= self.next_report:
+            summary = ', '.join(f"{count} {name}" for name, count in counts.items())
+            print(f"   {self.label}: {lines_read} lines read, {summary}")
+            self.next_report = lines_read - lines_read % PROGRESS_EVERY + PROGRESS_EVERY
 
 
-def import_customers():
-    """Import customers from userDatabase.txt"""
-    file_path = SystemConfig.USER_DB
+def write_new(label, chunks, model, key_field, build):
+    """
+    Insert the records whose key is not in the database yet, one chunk per
+    transaction. Existing keys are loaded once per chunk; build turns the
+    list of new records into model instances before the transaction starts.
+    """
     count = 0
+    progress = Progress(label)
     
-    try:
-        with open(file_path, 'r') as f:
-            # Skip first line (header)
-            next(f, None)
-            
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                parts = line.split()
-                if len(parts) >= 1:
-                    phone_number = parts[0]
-                    
-                    # Check if customer already exists
-                    if not Customer.objects.filter(phone_number=phone_number).exists():
-                        Customer.objects.create(phone_number=phone_number)
-                        count += 1
-                        print(f"Imported customer: {phone_number}")
-    except FileNotFoundError:
-        print(f"File not found: {file_path}")
+    for chunk, records in chunks:
+        # First occurrence of a key wins, as with the old row-by-row import
+        by_key = {}
+        for record in records:
+            by_key.setdefault(record[0], record)
+        
+        keys = model.objects.filter(**{f'{key_field}__in': list(by_key)})
+        existing = set(keys.values_list(key_field, flat=True))
+        new_objects = build([record for key, record in by_key.items() if key not in existing])
+        
+        with transaction.atomic():
+            before = keys.count() if new_objects else 0
+            model.objects.bulk_create(new_objects, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            # ignore_conflicts skips rows silently; count what actually went in
+            inserted = keys.count() - before if new_objects else 0
+            chunk.commit()
+        count += inserted
+        progress.update(chunk.rows_read, imported=count)
     
     return count
 
 
-def import_rentals():
-    """Import rentals from userDatabase.txt"""
-    file_path = SystemConfig.USER_DB
-    count = 0
+def import_employees(chunks, pool=None, fast_hash=False):
+    """
+    Import employees from employeeDatabase.txt
+    Only new employees' passwords are hashed, spread over the parser pool.
+    """
+    def build(records):
+        hashes = hash_passwords([record[4] for record in records], pool=pool, workers=0, fast=fast_hash)
+        return [
+            Employee(
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+                position=position,
+                password=password_hash,
+                is_staff=(position == 'Admin')
+            )
+            for (username, position, first_name, last_name, _), password_hash in zip(records, hashes)
+        ]
     
-    try:
-        with open(file_path, 'r') as f:
-            # Skip first line (header)
-            next(f, None)
-            
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                parts = line.split()
-                if len(parts) >= 2:
-                    phone_number = parts[0]
-                    
-                    # Get or create customer
-                    customer, _ = Customer.objects.get_or_create(phone_number=phone_number)
-                    
-                    # Parse rental entries (format: itemID,returnDate,returned)
-                    for i in range(1, len(parts)):
-                        rental_data = parts[i].split(',')
-                        if len(rental_data) >= 3:
-                            item_id = int(rental_data[0])
-                            return_date_str = rental_data[1]
-                            is_returned = rental_data[2].lower() == 'true'
-                            
-                            # Parse date (MM/dd/yy)
-                            try:
-                                return_date = datetime.strptime(return_date_str, '%m/%d/%y').date()
-                                rental_date = return_date - timedelta(days=SystemConfig.get_rental_period_days())
-                                due_date = return_date
-                                
-                                # Get item
-                                try:
-                                    item = Item.objects.get(item_id=item_id)
-                                    
-                                    # Check if rental already exists
-                                    if not Rental.objects.filter(
-                                        customer=customer,
-                                        item=item,
-                                        rental_date=rental_date
-                                    ).exists():
-                                        Rental.objects.create(
-                                            customer=customer,
-                                            item=item,
-                                            quantity=1,
-                                            rental_date=rental_date,
-                                            due_date=due_date,
-                                            return_date=return_date if is_returned else None,
-                                            is_returned=is_returned
-                                        )
-                                        count += 1
-                                        print(f"Imported rental: {item.name} for {phone_number}")
-                                except Item.DoesNotExist:
-                                    print(f"Item {item_id} not found, skipping rental")
-                            except ValueError:
-                                print(f"Invalid date format: {return_date_str}")
-    except FileNotFoundError:
-        print(f"File not found: {file_path}")
+    return write_new('Employees', chunks, Employee, 'username', build)
+
+
+def import_items(chunks):
+    """Import items from itemDatabase.txt"""
+    def build(records):
+        return [
+            Item(
+                item_id=item_id,
+                name=name,
+                price=price,
+                stock_sale=amount,
+                stock_rental=amount,
+                item_type='Both'
+            )
+            for item_id, name, price, amount in records
+        ]
     
-    return count
+    return write_new('Items', chunks, Item, 'item_id', build)
 
 
-def import_coupons():
+def import_coupons(chunks):
     """Import coupons from couponNumber.txt"""
-    file_path = SystemConfig.COUPON_DB
-    count = 0
+    def build(records):
+        return [Coupon(code=code, discount_percentage=Decimal('10.00'), is_active=True)
+                for code, in records]
     
-    try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                code = line
-                
-                # Check if coupon already exists
-                if not Coupon.objects.filter(code=code).exists():
-                    Coupon.objects.create(
-                        code=code,
-                        discount_percentage=Decimal('10.00'),
-                        is_active=True
-                    )
-                    count += 1
-                    print(f"Imported coupon: {code}")
-    except FileNotFoundError:
-        print(f"File not found: {file_path}")
+    return write_new('Coupons', chunks, Coupon, 'code', build)
+
+
+def import_customers_and_rentals(chunks):
+    """
+    Import customers and their rentals from one pass over userDatabase.txt
+    Items must already be imported; rentals of unknown items are skipped.
+    Items and customers are resolved through in-memory key maps, so a chunk
+    costs one query for the rentals already there plus the inserts.
+    """
+    customer_count = rental_count = 0
+    unknown_items = Counter()  # Rentals skipped per unknown item_id
+    progress = Progress('Customers/rentals')
+    item_pks = KeyMap(Item, 'item_id')
+    customer_pks = KeyMap(Customer, 'phone_key')
     
-    return count
+    for chunk, records in chunks:
+        # Differently formatted numbers are one customer, stored as first seen
+        phone_numbers = {}
+        for phone, _ in records:
+            phone_numbers.setdefault(Customer.normalize_phone(phone), {'phone_number': phone})
+        with transaction.atomic():
+            customers, created = customer_pks.ensure(phone_numbers, BATCH_SIZE, fields=phone_numbers)
+            customer_count += len(created)
+            items = item_pks.resolve(entry[0] for _, rentals in records for entry in rentals)
+            
+            # New customers cannot have rentals yet
+            existing_rentals = set(Rental.objects.filter(
+                customer_id__in=[pk for phone, pk in customers.items() if phone not in created]
+            ).values_list('customer_id', 'item_id', 'rental_date'))
+            
+            new_rentals = []
+            for phone, rentals in records:
+                for item_id, rental_date, due_date, return_date, is_returned in rentals:
+                    item_pk = items.get(item_id)
+                    if item_pk is None:
+                        unknown_items[item_id] += 1
+                        continue
+                    key = (customers[Customer.normalize_phone(phone)], item_pk, rental_date)
+                    if key in existing_rentals:
+                        continue
+                    existing_rentals.add(key)
+                    new_rentals.append(Rental(
+                        customer_id=key[0],
+                        item_id=item_pk,
+                        quantity=1,
+                        rental_date=rental_date,
+                        due_date=due_date,
+                        return_date=return_date,
+                        is_returned=is_returned
+                    ))
+            Rental.objects.bulk_create(new_rentals, batch_size=BATCH_SIZE)
+            chunk.commit()
+        rental_count += len(new_rentals)
+        
+        progress.update(chunk.rows_read, customers=customer_count, rentals=rental_count,
+                        skipped=sum(unknown_items.values()))
+    
+    if unknown_items:
+        examples = ', '.join(str(item_id) for item_id, _ in unknown_items.most_common(10))
+        print(f"   Skipped {sum(unknown_items.values())} rentals of {len(unknown_items)} unknown items "
+              f"(most frequent: {examples})")
+    return customer_count, rental_count
 
 
-def main():
+def main(argv=None):
     """Main import function"""
+    parser = argparse.ArgumentParser(description='Import legacy .txt databases')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Parser processes (0 parses in the writer process)')
+    parser.add_argument('--restart', action='store_true',
+                        help='Ignore checkpoints and read every file from the start')
+    parser.add_argument('--fast-hash', action='store_true',
+                        help='Store passwords with the cheap import hasher; '
+                             'they are rehashed on each employee\'s first login')
+    args = parser.parse_args(argv)
+    
     print("=" * 50)
     print("Legacy Data Import")
     print("=" * 50)
     
-    print("\n1. Importing Employees...")
-    emp_count = import_employees()
-    print(f"   Imported {emp_count} employees")
-    
-    print("\n2. Importing Items...")
-    item_count = import_items()
-    print(f"   Imported {item_count} items")
-    
-    print("\n3. Importing Customers...")
-    cust_count = import_customers()
-    print(f"   Imported {cust_count} customers")
+    files = [SystemConfig.EMPLOYEE_DB, SystemConfig.ITEM_DB, SystemConfig.COUPON_DB, SystemConfig.USER_DB]
+    positions = {path: resume_position(path, args.restart) for path in files}
+    for path, (offset, rows) in positions.items():
+        if offset:
+            print(f"Resuming {path} after {rows} lines")
+    # Workers are forked on the first submit; make sure none inherits a connection
+    connections.close_all()
     
-    print("\n4. Importing Rentals...")
-    rental_count = import_rentals()
-    print(f"   Imported {rental_count} rentals")
-    
-    print("\n5. Importing Coupons...")
-    coupon_count = import_coupons()
-    print(f"   Imported {coupon_count} coupons")
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 0 else None
+    try:
+        # All files start parsing at once; the writer consumes them in order
+        employees = ParsedFile(pool, 'employee', SystemConfig.EMPLOYEE_DB, positions[SystemConfig.EMPLOYEE_DB])
+        items = ParsedFile(pool, 'item', SystemConfig.ITEM_DB, positions[SystemConfig.ITEM_DB])
+        coupons = ParsedFile(pool, 'coupon', SystemConfig.COUPON_DB, positions[SystemConfig.COUPON_DB])
+        users = ParsedFile(pool, 'user', SystemConfig.USER_DB, positions[SystemConfig.USER_DB],
+                           skip_header=True)
+        
+        print("\n1. Importing Employees...")
+        emp_count = import_employees(employees, pool, args.fast_hash)
+        print(f"   Imported {emp_count} employees")
+        
+        print("\n2. Importing Items...")
+        item_count = import_items(items)
+        print(f"   Imported {item_count} items")
+        
+        print("\n3. Importing Coupons...")
+        coupon_count = import_coupons(coupons)
+        print(f"   Imported {coupon_count} coupons")
+        
+        print("\n4. Importing Customers and Rentals...")
+        cust_count, rental_count = import_customers_and_rentals(users)
+        print(f"   Imported {cust_count} customers and {rental_count} rentals")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
     
     print("\n" + "=" * 50)
     print("Import Complete!")
@@ -259,4 +390,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
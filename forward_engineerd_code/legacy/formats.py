@@ -0,0 +1,28 @@
+"""
+Field formats of the legacy .txt databases
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8192)
+def parse_legacy_date(token: bytes) -> date:
+    """
+    Parse a MM/dd/yy date as written by the Java system
+    The files repeat a few thousand distinct dates millions of times, so
+    results are cached, and the usual zero-padded form skips strptime.
+    Two-digit years follow strptime: 69-99 are 19xx, 00-68 are 20xx.
+    """
+    if len(token) == 8 and token[2] == token[5] == 0x2f:  # b'/'
+        month, day, year = int(token[0:2]), int(token[3:5]), int(token[6:8])
+        return date(year + (1900 if year >= 69 else 2000), month, day)
+    return datetime.strptime(token.decode(), '%m/%d/%y').date()
+
+
+def parse_log_timestamp(text: str) -> datetime:
+    """Parse a yyyy-MM-dd HH:mm:ss.SSS log timestamp"""
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return datetime.strptime(text, '%Y-%m-%d %H:%M:%S.%f')
@@ -0,0 +1,86 @@
+"""
+In-memory natural key -> primary key maps for resolving foreign keys
+Legacy files refer to items, employees and customers by item_id, username
+and phone number, and repeat the same keys millions of times. A KeyMap turns
+those lookups into dict hits instead of one query per row.
+"""
+
+from collections import OrderedDict
+
+# Tables up to this size are loaded whole; larger ones are cached LRU
+MAX_ENTRIES = 200000
+
+
+class KeyMap:
+    """
+    Maps one model's natural key to its pk
+    Small tables are loaded once and the map is complete, so a key it does
+    not hold does not exist. Tables over max_entries are cached as a bounded
+    LRU instead, and misses are fetched in one IN query per resolve call.
+    """
+    
+    def __init__(self, model, key_field, max_entries=MAX_ENTRIES):
+        self.model = model
+        self.key_field = key_field
+        self.max_entries = max_entries
+        self._pks = OrderedDict()
+        self.complete = model.objects.count() <= max_entries
+        if self.complete:
+            self._pks.update(model.objects.values_list(key_field, 'pk'))
+    
+    def resolve(self, keys):
+        """pks of the keys that exist, keyed by natural key"""
+        found, missing = {}, []
+        for key in set(keys):
+            pk = self._pks.get(key)
+            if pk is None:
+                missing.append(key)
+            else:
+                found[key] = pk
+                if not self.complete:
+                    self._pks.move_to_end(key)
+        
+        if missing and not self.complete:
+            fetched = dict(self.model.objects.filter(
+                **{f'{self.key_field}__in': missing}
+            ).values_list(self.key_field, 'pk'))
+            self.add(fetched)
+            found.update(fetched)
+        return found
+    
+    def ensure(self, keys, batch_size=1000, fields=None):
+        """
+        pks of keys, inserting a row for each key that does not exist yet,
+        with only the key set plus fields[key] if given (a dict of field
+        values per key). Returns (pks, created_keys).
+        """
+        keys = list(keys)
+        pks = self.resolve(keys)
+        fields = fields or {}
+        new_rows = [
+            self.model(**{self.key_field: key}, **fields.get(key, {}))
+            for key in dict.fromkeys(keys) if key not in pks
+        ]
+        if not new_rows:
+            return pks, set()
+        
+        self.model.objects.bulk_create(new_rows, batch_size=batch_size)
+        if all(row.pk is not None for row in new_rows):
+            created = {getattr(row, self.key_field): row.pk for row in new_rows}
+        else:
+            # Backends that cannot return pks from a bulk insert
+            created = dict(self.model.objects.filter(
+                **{f'{self.key_field}__in': [getattr(row, self.key_field) for row in new_rows]}
+            ).values_list(self.key_field, 'pk'))
+        self.add(created)
+        pks.update(created)
+        return pks, set(created)
+    
+    def add(self, pks):
+        """Record rows inserted since the map was loaded"""
+        self._pks.update(pks)
+        if len(self._pks) > self.max_entries:
+            # Too big to keep whole; from now on misses go to the database
+            self.complete = False
+            while len(self._pks) > self.max_entries:
+                self._pks.popitem(last=False)
@@ -0,0 +1,33 @@
+"""
+Password hashing for bulk employee imports
+The default hasher is deliberately slow, so hashing thousands of imported
+passwords is spread over a process pool. With fast=True the cheap import
+hasher is used instead, and each hash is upgraded on the employee's first
+login (see pos.hashers).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+
+FAST_HASHER = 'pbkdf2_import'
+
+
+def hash_passwords(passwords, pool=None, workers=None, fast=False):
+    """
+    make_password for a list of passwords, in parallel
+    Uses pool if given, otherwise a temporary pool of workers processes
+    (workers=0 hashes in this process). Must not be called inside a
+    transaction when it has to start its own pool.
+    """
+    hash_one = partial(make_password, hasher=FAST_HASHER if fast else 'default')
+    if fast or len(passwords) < 2 or (pool is None and workers == 0):
+        return [hash_one(password) for password in passwords]
+    if pool is not None:
+        return list(pool.map(hash_one, passwords))
+    
+    # Forked workers must not inherit an open database connection
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers) as own_pool:
+        return list(own_pool.map(hash_one, passwords))
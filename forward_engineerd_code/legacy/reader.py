@@ -0,0 +1,141 @@
+"""
+Chunked, resumable, memory-mapped reading of legacy .txt databases
+Files are mapped rather than read, and lines are memoryview slices of the
+mapping. Parsing still copies each line once (bytes(view) or str(view)),
+but only the line at hand, so memory stays flat however large a file is.
+A chunk is only a byte range: it is cheap to hand to a worker process,
+which maps the file itself. Committing a chunk records the offset it ends
+at as the file's checkpoint, so a restarted import seeks past everything
+already committed.
+The checkpoint also fingerprints the bytes it covers; a file replaced since
+(longer or shorter) fails the check and is read from the start.
+"""
+
+import mmap
+import os
+import zlib
+from pos.repositories.import_checkpoint_repository import ImportCheckpointRepository
+
+# Lines per chunk (and per transaction)
+CHUNK_SIZE = 5000
+
+# Bytes checksummed at the start of a file and just before its checkpoint
+FINGERPRINT_BYTES = 4096
+
+# Mappings opened by this process, keyed by file path
+_mappings = {}
+
+
+def _mapping(file_path, end=None):
+    """
+    Read-only mapping of file_path
+    With end, a cached mapping is reused if it covers end; without it the
+    file is always mapped afresh.
+    """
+    mapped = _mappings.get(file_path)
+    if mapped is None or end is None or len(mapped) < end:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                mapped = b''  # Empty files cannot be mapped
+        _mappings[file_path] = mapped
+    return mapped
+
+
+def fingerprint(buffer, offset):
+    """Checksum of buffer's first bytes and the bytes just before offset"""
+    head = buffer[:min(offset, FINGERPRINT_BYTES)]
+    tail = buffer[max(0, offset - FINGERPRINT_BYTES):offset]
+    return zlib.crc32(tail, zlib.crc32(head))
+
+
+def iter_lines(buffer, start=0, end=None):
+    """
+    Lines of buffer[start:end] as memoryview slices, without line endings
+    A slice shares the buffer's memory; callers copy it out to parse it.
+    """
+    view = memoryview(buffer)
+    end = len(buffer) if end is None else end
+    find = buffer.find
+    while start < end:
+        newline = find(b'\n', start, end)
+        stop = end if newline == -1 else newline
+        line_end = stop - 1 if stop > start and buffer[stop - 1] == 0x0d else stop  # \r\n
+        yield view[start:line_end]
+        start = stop + 1
+
+
+class LineChunk:
+    """A byte range of whole lines in a file plus the position just after it"""
+    
+    def __init__(self, file_path, start_offset, end_offset, line_count, rows_before):
+        self.file_path = file_path
+        self.start_offset = start_offset
+        self.end_offset = end_offset
+        self.rows_read = rows_before + line_count
+    
+    def iter_lines(self):
+        """The chunk's lines as memoryview slices; maps the file in this process"""
+        buffer = _mapping(self.file_path, self.end_offset)
+        return iter_lines(buffer, self.start_offset, self.end_offset)
+    
+    @property
+    def lines(self):
+        """The chunk's lines decoded to str"""
+        return [str(line, 'utf-8') for line in self.iter_lines()]
+    
+    def commit(self):
+        """Save the checkpoint; call inside the transaction that wrote the chunk"""
+        buffer = _mapping(self.file_path, self.end_offset)
+        ImportCheckpointRepository.save(self.file_path, self.end_offset, self.rows_read,
+                                        fingerprint(buffer, self.end_offset))
+
+
+def resume_position(file_path, restart=False):
+    """
+    Where to start reading file_path: (byte_offset, rows_read)
+    A checkpoint whose fingerprint no longer matches the file means the file
+    was replaced, so it is read from the start.
+    """
+    if restart:
+        ImportCheckpointRepository.clear([file_path])
+        return 0, 0
+    checkpoint = ImportCheckpointRepository.get_checkpoint(file_path)
+    if checkpoint is None:
+        return 0, 0
+    offset, rows_read, saved = checkpoint
+    buffer = _mapping(file_path)
+    if offset > len(buffer) or saved != fingerprint(buffer, offset):
+        print(f"Warning: {file_path} changed since its checkpoint, reading it again")
+        return 0, 0
+    return offset, rows_read
+
+
+def read_chunks(file_path, position=(0, 0), chunk_size=CHUNK_SIZE, skip_header=False):
+    """
+    Split file_path into LineChunks of chunk_size lines, starting at position
+    The header line is only skipped when reading from the start. A position
+    past the end of the file means the file was replaced, so it is read again
+    (resume_position catches other replacements by fingerprint).
+    """
+    offset, rows_read = position
+    buffer = _mapping(file_path)
+    size = len(buffer)
+    if offset > size:
+        print(f"Warning: {file_path} is shorter than its checkpoint, reading it again")
+        offset, rows_read = 0, 0
+    if offset == 0 and skip_header:
+        newline = buffer.find(b'\n')
+        offset = size if newline == -1 else newline + 1
+    
+    find = buffer.find
+    while offset < size:
+        end, line_count = offset, 0
+        while line_count < chunk_size and end < size:
+            newline = find(b'\n', end)
+            end = size if newline == -1 else newline + 1
+            line_count += 1
+        chunk = LineChunk(file_path, offset, end, line_count, rows_read)
+        yield chunk
+        offset, rows_read = end, chunk.rows_read
@@ -6,7 +6,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from pos.models import (
     Employee, Item, Customer, Rental, Sale, SaleItem,
-    ReturnTransaction, ReturnItem, Coupon, EmployeeLog
+    ReturnTransaction, ReturnItem, Coupon, EmployeeLog, StockReservation
 )
 
 
@@ -39,17 +39,29 @@ class EmployeeAdmin(admin.ModelAdmin):
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
     """Admin interface for Item model"""
-    list_display = ['item_id', 'name', 'price', 'stock_sale', 'stock_rental', 'item_type']
+    list_display = ['item_id', 'name', 'price', 'stock_sale', 'stock_rental', 'item_type',
+                    'reorder_threshold']
     list_filter = ['item_type']
     search_fields = ['name', 'item_id']
     ordering = ['item_id']
 
 
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    """Admin interface for StockReservation model"""
+    list_display = ['id', 'item', 'holder', 'stock_type', 'quantity', 'expires_at']
+    list_select_related = ['item']
+    list_filter = ['stock_type']
+    search_fields = ['holder', 'item__name']
+    ordering = ['expires_at']
+
+
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
     """Admin interface for Customer model"""
-    list_display = ['phone_number', 'created_at']
-    search_fields = ['phone_number']
+    list_display = ['phone_number', 'phone_key', 'created_at']
+    search_fields = ['phone_number', 'phone_key']
+    readonly_fields = ['phone_key']
     ordering = ['phone_number']
 
 
@@ -57,6 +69,7 @@ class CustomerAdmin(admin.ModelAdmin):
 class RentalAdmin(admin.ModelAdmin):
     """Admin interface for Rental model"""
     list_display = ['id', 'customer', 'item', 'quantity', 'rental_date', 'due_date', 'is_returned']
+    list_select_related = ['customer', 'item']
     list_filter = ['is_returned', 'rental_date']
     search_fields = ['customer__phone_number', 'item__name']
     ordering = ['-rental_date']
@@ -66,6 +79,7 @@ class RentalAdmin(admin.ModelAdmin):
 class SaleAdmin(admin.ModelAdmin):
     """Admin interface for Sale model"""
     list_display = ['id', 'transaction_time', 'total_amount', 'employee']
+    list_select_related = ['employee']
     list_filter = ['transaction_time']
     search_fields = ['employee__username']
     ordering = ['-transaction_time']
@@ -75,6 +89,7 @@ class SaleAdmin(admin.ModelAdmin):
 class SaleItemAdmin(admin.ModelAdmin):
     """Admin interface for SaleItem model"""
     list_display = ['id', 'sale', 'item', 'quantity', 'subtotal']
+    list_select_related = ['sale', 'item']
     list_filter = ['sale__transaction_time']
     search_fields = ['item__name']
 
@@ -99,6 +114,7 @@ class CouponAdmin(admin.ModelAdmin):
 class EmployeeLogAdmin(admin.ModelAdmin):
     """Admin interface for EmployeeLog model"""
     list_display = ['id', 'employee', 'action', 'timestamp']
+    list_select_related = ['employee']
     list_filter = ['action', 'timestamp']
     search_fields = ['employee__username']
     ordering = ['-timestamp']
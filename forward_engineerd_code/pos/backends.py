@@ -11,6 +11,10 @@ class EmployeeBackend:
     """
     
     def authenticate(self, request, username=None, password=None, **kwargs):
+        """
+        Check the password; check_password also rehashes passwords stored with
+        a hasher other than the default (e.g. the bulk import hasher)
+        """
         try:
             employee = Employee.objects.get(username=username)
             if employee.check_password(password) and employee.is_active:
@@ -0,0 +1,143 @@
+"""
+Session-backed Cart
+Holds the line items and running subtotal of an open sale in memory so that
+scanning an item does not touch the sales tables. Sale/SaleItem rows are only
+written once, when the sale is finalized. The cart_id identifies the cart's
+stock reservations.
+"""
+
+import uuid
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+
+class CartLine:
+    """A single line of an open cart"""
+
+    def __init__(self, item_id: int, name: str, unit_price: Decimal, quantity: int):
+        self.item_id = item_id
+        self.name = name
+        self.unit_price = unit_price
+        self.quantity = quantity
+
+    @property
+    def subtotal(self) -> Decimal:
+        return self.unit_price * self.quantity
+
+    def to_dict(self) -> Dict:
+        return {
+            'item_id': self.item_id,
+            'name': self.name,
+            'unit_price': str(self.unit_price),
+            'quantity': self.quantity,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CartLine':
+        return cls(
+            item_id=data['item_id'],
+            name=data['name'],
+            unit_price=Decimal(data['unit_price']),
+            quantity=data['quantity'],
+        )
+
+
+class Cart:
+    """
+    Open sale kept in the session
+    Decimals are stored as strings so the session stays JSON serializable.
+    """
+    SESSION_KEY = 'cart'
+
+    def __init__(self, session):
+        self.session = session
+        data = session.get(self.SESSION_KEY) or {}
+        self.cart_id: str = data.get('cart_id') or uuid.uuid4().hex
+        self._lines = {
+            int(item_id): CartLine.from_dict(line)
+            for item_id, line in data.get('lines', {}).items()
+        }
+        self._subtotal = Decimal(data.get('subtotal', '0.00'))
+        self.coupon_code: Optional[str] = data.get('coupon_code')
+        self.discount_percentage: Optional[Decimal] = (
+            Decimal(data['discount_percentage'])
+            if data.get('discount_percentage') is not None else None
+        )
+
+    @property
+    def lines(self) -> List[CartLine]:
+        return list(self._lines.values())
+
+    @property
+    def subtotal(self) -> Decimal:
+        return self._subtotal
+
+    def __len__(self):
+        return len(self._lines)
+
+    def is_empty(self) -> bool:
+        return not self._lines
+
+    def item_ids(self) -> List[int]:
+        return list(self._lines.keys())
+
+    def get_line(self, item_id: int) -> Optional[CartLine]:
+        return self._lines.get(item_id)
+
+    def quantity_of(self, item_id: int) -> int:
+        line = self._lines.get(item_id)
+        return line.quantity if line else 0
+
+    def add(self, item_id: int, name: str, unit_price: Decimal, quantity: int) -> CartLine:
+        """Add quantity of an item, merging with an existing line"""
+        line = self._lines.get(item_id)
+        if line is None:
+            line = CartLine(item_id, name, unit_price, 0)
+            self._lines[item_id] = line
+        line.quantity += quantity
+        self._subtotal += unit_price * quantity
+        self.save()
+        return line
+
+    def remove(self, item_id: int) -> bool:
+        """Remove an item line entirely"""
+        line = self._lines.pop(item_id, None)
+        if line is None:
+            return False
+        self._subtotal -= line.subtotal
+        self.save()
+        return True
+
+    def set_coupon(self, code: Optional[str], discount_percentage: Optional[Decimal]):
+        """Attach (or clear) a coupon"""
+        self.coupon_code = code
+        self.discount_percentage = discount_percentage
+        self.save()
+
+    def get_discount_rate(self) -> Decimal:
+        """Discount rate as decimal (e.g., 0.90 for 10% off)"""
+        if self.discount_percentage is None:
+            return Decimal('1.00')
+        return Decimal('1.00') - (self.discount_percentage / Decimal('100'))
+
+    def save(self):
+        self.session[self.SESSION_KEY] = {
+            'cart_id': self.cart_id,
+            'lines': {str(item_id): line.to_dict() for item_id, line in self._lines.items()},
+            'subtotal': str(self._subtotal),
+            'coupon_code': self.coupon_code,
+            'discount_percentage': (
+                str(self.discount_percentage)
+                if self.discount_percentage is not None else None
+            ),
+        }
+        self.session.modified = True
+
+    def clear(self):
+        self.cart_id = uuid.uuid4().hex
+        self._lines = {}
+        self._subtotal = Decimal('0.00')
+        self.coupon_code = None
+        self.discount_percentage = None
+        self.session.pop(self.SESSION_KEY, None)
+        self.session.modified = True
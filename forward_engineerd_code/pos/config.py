@@ -16,6 +16,30 @@ class SystemConfig:
     DISCOUNT_RATE = 0.90  # 10% discount (for coupons)
     LATE_FEE_RATE = 0.1  # 10% late fee per day
     RENTAL_PERIOD_DAYS = 14  # Standard rental period
+    RESERVATION_TTL_MINUTES = 15  # Stock held for an idle cart
+    
+    # Rows per page on list screens
+    PAGE_SIZE = 50
+    
+    # Item catalog cache (per process)
+    CATALOG_CACHE_SIZE = 5000  # Max cached items
+    CATALOG_CACHE_TTL_SECONDS = 300  # Max staleness of a cached name/price
+    
+    # Logged-in employee cache
+    EMPLOYEE_CACHE_TTL_SECONDS = 300  # Max staleness of a cached employee
+    
+    # Employee activity log writer (per process)
+    AUDIT_LOG_BUFFERED = False  # Opt in to batch log inserts off the request path
+    AUDIT_LOG_FLUSH_INTERVAL_MS = 250  # Max delay before a log row is written
+    AUDIT_LOG_FLUSH_SIZE = 100  # Pending entries that trigger an early flush
+    AUDIT_LOG_MAX_PENDING = 10000  # Writers flush inline beyond this
+    AUDIT_LOG_STORAGE = 'database'  # or 'segments': append-only files, compacted later
+    AUDIT_LOG_SEGMENT_DIR = "Database/auditSegments"
+    AUDIT_LOG_SEGMENT_MAX_ENTRIES = 10000  # Entries per segment before it is sealed
+    AUDIT_LOG_SEGMENT_MAX_AGE_SECONDS = 3600  # Max age of an unsealed segment
+    
+    # Per-view request histograms, shared by all worker processes
+    REQUEST_METRICS_FILE = "Database/requestMetrics.bin"
     
     # Date formats
     DATE_FORMAT = "MM/dd/yy"
@@ -59,4 +83,74 @@ class SystemConfig:
     def get_rental_period_days(cls):
         """Get rental period in days"""
         return cls.RENTAL_PERIOD_DAYS
+    
+    @classmethod
+    def get_reservation_ttl_minutes(cls):
+        """Get how long an idle cart keeps its stock reserved"""
+        return cls.RESERVATION_TTL_MINUTES
+    
+    @classmethod
+    def get_page_size(cls):
+        """Get rows per page on list screens"""
+        return cls.PAGE_SIZE
+    
+    @classmethod
+    def get_catalog_cache_size(cls):
+        """Get max number of items in the catalog cache"""
+        return cls.CATALOG_CACHE_SIZE
+    
+    @classmethod
+    def get_catalog_cache_ttl_seconds(cls):
+        """Get catalog cache entry lifetime"""
+        return cls.CATALOG_CACHE_TTL_SECONDS
+    
+    @classmethod
+    def get_employee_cache_ttl_seconds(cls):
+        """Get how long a logged-in employee is cached"""
+        return cls.EMPLOYEE_CACHE_TTL_SECONDS
+    
+    @classmethod
+    def get_request_metrics_file(cls):
+        """Get the memory-mapped file holding request histograms"""
+        return cls.REQUEST_METRICS_FILE
+    
+    @classmethod
+    def get_audit_log_buffered(cls):
+        """Get whether activity logs are written in background batches"""
+        return cls.AUDIT_LOG_BUFFERED
+    
+    @classmethod
+    def get_audit_log_flush_interval_ms(cls):
+        """Get how often buffered activity logs are flushed"""
+        return cls.AUDIT_LOG_FLUSH_INTERVAL_MS
+    
+    @classmethod
+    def get_audit_log_flush_size(cls):
+        """Get pending activity logs that trigger an early flush"""
+        return cls.AUDIT_LOG_FLUSH_SIZE
+    
+    @classmethod
+    def get_audit_log_max_pending(cls):
+        """Get max activity logs held in memory awaiting a flush"""
+        return cls.AUDIT_LOG_MAX_PENDING
+    
+    @classmethod
+    def get_audit_log_storage(cls):
+        """Get where activity logs are stored: 'database' or 'segments'"""
+        return cls.AUDIT_LOG_STORAGE
+    
+    @classmethod
+    def get_audit_log_segment_dir(cls):
+        """Get the directory of activity log segment files"""
+        return cls.AUDIT_LOG_SEGMENT_DIR
+    
+    @classmethod
+    def get_audit_log_segment_max_entries(cls):
+        """Get entries per activity log segment before it is sealed"""
+        return cls.AUDIT_LOG_SEGMENT_MAX_ENTRIES
+    
+    @classmethod
+    def get_audit_log_segment_max_age_seconds(cls):
+        """Get how long an activity log segment stays unsealed"""
+        return cls.AUDIT_LOG_SEGMENT_MAX_AGE_SECONDS
 
@@ -10,7 +10,8 @@ class ItemForm(forms.ModelForm):
     """Form for creating/editing items"""
     class Meta:
         model = Item
-        fields = ['item_id', 'name', 'price', 'stock_sale', 'stock_rental', 'item_type']
+        fields = ['item_id', 'name', 'price', 'stock_sale', 'stock_rental', 'item_type',
+                  'reorder_threshold']
         widgets = {
             'item_id': forms.NumberInput(attrs={'class': 'form-control'}),
             'name': forms.TextInput(attrs={'class': 'form-control'}),
@@ -18,5 +19,6 @@ class ItemForm(forms.ModelForm):
             'stock_sale': forms.NumberInput(attrs={'class': 'form-control', 'min': 0}),
             'stock_rental': forms.NumberInput(attrs={'class': 'form-control', 'min': 0}),
             'item_type': forms.Select(attrs={'class': 'form-control'}),
+            'reorder_threshold': forms.NumberInput(attrs={'class': 'form-control', 'min': 0}),
         }
 
@@ -3,6 +3,21 @@ Rental Forms
 """
 
 from django import forms
+from pos.models import Customer
+
+MIN_PHONE_DIGITS = 7
+
+
+def clean_phone(phone_number: str) -> str:
+    """
+    Phone number as typed, once it has enough digits
+    Customers are matched on the normalized key, which the repository derives.
+    """
+    phone_number = phone_number.strip()
+    phone_key = Customer.normalize_phone(phone_number)
+    if not phone_key.isdigit() or len(phone_key) < MIN_PHONE_DIGITS:
+        raise forms.ValidationError('Enter a valid phone number')
+    return phone_number
 
 
 class RentalForm(forms.Form):
@@ -34,6 +49,9 @@ class RentalForm(forms.Form):
             'min': 1
         })
     )
+    
+    def clean_phone_number(self):
+        return clean_phone(self.cleaned_data['phone_number'])
 
 
 class ReturnForm(forms.Form):
@@ -49,10 +67,33 @@ class ReturnForm(forms.Form):
     )
     rental_id = forms.IntegerField(
         label='Rental ID',
+        required=False,
         widget=forms.NumberInput(attrs={
             'class': 'form-control',
-            'placeholder': 'Enter Rental ID',
-            'required': True
+            'placeholder': 'Enter Rental ID'
         })
     )
+    # Rentals ticked in the customer's outstanding list
+    rental_ids = forms.Field(
+        required=False,
+        widget=forms.MultipleHiddenInput
+    )
+    
+    def clean_phone_number(self):
+        return clean_phone(self.cleaned_data['phone_number'])
+    
+    def clean_rental_ids(self):
+        try:
+            return [int(rental_id) for rental_id in self.cleaned_data['rental_ids'] or []]
+        except ValueError:
+            raise forms.ValidationError('Invalid rental ID')
+    
+    def clean(self):
+        """Rentals to return: the typed rental ID and the ticked ones"""
+        cleaned_data = super().clean()
+        rental_ids = list(cleaned_data.get('rental_ids') or [])
+        if cleaned_data.get('rental_id'):
+            rental_ids.insert(0, cleaned_data['rental_id'])
+        cleaned_data['rental_ids'] = list(dict.fromkeys(rental_ids))
+        return cleaned_data
 
@@ -0,0 +1,16 @@
+"""
+Password hashers for the POS system
+"""
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ImportPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Cheap PBKDF2 for passwords of bulk imported employees
+    It is listed after the default hasher in PASSWORD_HASHERS, so a hash made
+    with it is a "rehash on first login" marker: check_password upgrades it
+    to the default hasher the first time the employee signs in.
+    """
+    algorithm = 'pbkdf2_import'
+    iterations = 1000
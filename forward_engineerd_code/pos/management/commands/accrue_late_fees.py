@@ -0,0 +1,24 @@
+"""
+Recompute accrued late fees of all overdue rentals (run nightly)
+Usage: python manage.py accrue_late_fees [--as-of YYYY-MM-DD]
+"""
+
+from datetime import date
+from django.core.management.base import BaseCommand
+from pos.services.rental_service import RentalService
+
+
+class Command(BaseCommand):
+    help = 'Precompute days late and late fees of all outstanding overdue rentals'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', type=date.fromisoformat,
+                            help='Accrue fees as of this date (default: today)')
+    
+    def handle(self, *args, **options):
+        rental_service = RentalService()
+        count = rental_service.refresh_late_fees(options['as_of'])
+        summary = rental_service.get_late_fee_summary()
+        self.stdout.write(self.style.SUCCESS(
+            f"Accrued late fees for {count} overdue rentals, ${summary['total']} in total"
+        ))
@@ -0,0 +1,64 @@
+"""
+Time item search against a synthetic catalogue
+Usage: python manage.py benchmark_item_search [--items N] [--repeat N]
+
+The catalogue is inserted in a transaction that is rolled back afterwards,
+so the real items table is left as it was.
+"""
+
+import random
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from pos.models import Item
+from pos.repositories import item_search
+
+# Few distinct words, so every word matches a large share of the catalogue
+VOCABULARY = [
+    'hammer', 'drill', 'saw', 'wrench', 'ladder', 'sander', 'chisel', 'clamp', 'level', 'mallet',
+    'pliers', 'router', 'planer', 'grinder', 'nailer', 'stapler', 'trowel', 'shovel', 'rake', 'hoe',
+    'cordless', 'electric', 'heavy', 'compact', 'steel', 'wooden', 'folding', 'rotary', 'orbital',
+    'angle', 'mitre', 'jig', 'pipe', 'socket',
+]
+
+
+class Command(BaseCommand):
+    help = 'Print p50/p95 search latency per query kind on a synthetic catalogue'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=200000, help='Catalogue size')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query')
+    
+    def handle(self, *args, **options):
+        count, repeat = options['items'], options['repeat']
+        rng = random.Random(0)
+        with transaction.atomic():
+            first_id = (Item.objects.aggregate(top=Max('item_id'))['top'] or 0) + 1
+            start = time.perf_counter()
+            Item.objects.bulk_create((
+                Item(item_id=first_id + index, name=' '.join(rng.sample(VOCABULARY, 3)).title(),
+                     price=Decimal('9.99'))
+                for index in range(count)
+            ), batch_size=5000)
+            self.stdout.write(f'Inserted {count} items in {time.perf_counter() - start:.1f} s')
+            
+            queries = {
+                'word': 'drill',
+                'prefix': 'dri',
+                'two words': 'cordless drill',
+                'item id': str(first_id + count // 2),
+                'fuzzy': 'drilll',
+            }
+            self.stdout.write(f"{'query':<10} {'p50 ms':>8} {'p95 ms':>8} {'results':>8}")
+            for kind, query in queries.items():
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    results = item_search.search(query)
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(f'{kind:<10} {timings[len(timings) // 2]:>8.2f} {p95:>8.2f} {len(results):>8}')
+            transaction.set_rollback(True)
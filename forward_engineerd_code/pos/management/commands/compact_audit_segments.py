@@ -0,0 +1,25 @@
+"""
+Move sealed activity log segments into the employee_logs table
+Usage: python manage.py compact_audit_segments [--directory DIR]
+"""
+
+from django.core.management.base import BaseCommand
+from pos.config import SystemConfig
+from pos.repositories.audit_segments import AuditSegmentStore
+
+
+class Command(BaseCommand):
+    help = 'Compact sealed activity log segment files into the database'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', default=SystemConfig.get_audit_log_segment_dir(),
+                            help='Segment directory (default: %(default)s)')
+    
+    def handle(self, *args, **options):
+        store = AuditSegmentStore(
+            directory=options['directory'],
+            max_entries=SystemConfig.get_audit_log_segment_max_entries(),
+            max_age_seconds=SystemConfig.get_audit_log_segment_max_age_seconds(),
+        )
+        inserted = store.compact()
+        self.stdout.write(self.style.SUCCESS(f'Compacted {inserted} activity log entries'))
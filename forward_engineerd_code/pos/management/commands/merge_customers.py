@@ -0,0 +1,22 @@
+"""
+Merge customers whose phone numbers differ only in formatting (run once)
+Usage: python manage.py merge_customers [--batch-size N]
+"""
+
+from django.core.management.base import BaseCommand
+from pos.services.customer_service import CustomerService
+
+
+class Command(BaseCommand):
+    help = 'Merge duplicate customers into one per normalized phone number, moving their rentals'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Duplicates merged per transaction')
+    
+    def handle(self, *args, **options):
+        result = CustomerService().merge_duplicate_customers(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged {result['merged']} duplicate customers ({result['rentals']} rentals moved), "
+            f"keyed {result['keyed']} customers"
+        ))
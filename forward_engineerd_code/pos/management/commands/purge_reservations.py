@@ -0,0 +1,15 @@
+"""
+Delete stock reservations left behind by abandoned carts
+Usage: python manage.py purge_reservations
+"""
+
+from django.core.management.base import BaseCommand
+from pos.repositories.reservation_repository import ReservationRepository
+
+
+class Command(BaseCommand):
+    help = 'Delete expired stock reservations'
+    
+    def handle(self, *args, **options):
+        deleted = ReservationRepository.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired reservations'))
@@ -0,0 +1,38 @@
+"""
+Show per-view request percentiles recorded by RequestMetricsMiddleware
+Usage: python manage.py request_metrics [--reset]
+"""
+
+from django.core.management.base import BaseCommand
+from pos.metrics import request_metrics
+
+
+class Command(BaseCommand):
+    help = 'Print p50/p95/p99 wall time, queries, DB time and response size per view'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help='Zero the histograms after printing them')
+    
+    def handle(self, *args, **options):
+        report = request_metrics.report()
+        if not report:
+            self.stdout.write('No requests recorded')
+        else:
+            self.stdout.write(
+                f"{'view':<28} {'requests':>8}  {'wall ms p50/p95/p99':>22}  "
+                f"{'queries p50/p95/p99':>20}  {'db ms p95':>9}  {'KB p95':>7}"
+            )
+            for view_name, metrics in sorted(report.items()):
+                wall, queries, db = metrics['wall_ms'], metrics['queries'], metrics['db_ms']
+                size = metrics.get('bytes', {}).get('p95', 0) / 1024
+                self.stdout.write(
+                    f"{view_name:<28} {wall['count']:>8}  "
+                    f"{wall['p50']:>6.1f} {wall['p95']:>7.1f} {wall['p99']:>7.1f}  "
+                    f"{queries['p50']:>6.1f} {queries['p95']:>6.1f} {queries['p99']:>6.1f}  "
+                    f"{db['p95']:>9.1f}  {size:>7.1f}"
+                )
+        
+        if options['reset']:
+            request_metrics.reset()
+            self.stdout.write(self.style.SUCCESS('Request metrics reset'))
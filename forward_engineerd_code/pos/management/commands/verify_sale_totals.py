@@ -0,0 +1,42 @@
+"""
+Verify stored sale totals against their line items
+Usage: python manage.py verify_sale_totals [--sale-id ID] [--fix]
+"""
+
+from django.core.management.base import BaseCommand
+from pos.models import Sale
+from pos.services.sale_service import SaleService
+
+
+class Command(BaseCommand):
+    help = 'Check that running sale totals agree with the sum of their line items'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--sale-id', type=int, help='Only check this sale')
+        parser.add_argument('--fix', action='store_true',
+                            help='Recalculate inconsistent sales from their line items')
+    
+    def handle(self, *args, **options):
+        sale_service = SaleService()
+        
+        sales = Sale.objects.all()
+        if options['sale_id']:
+            sales = sales.filter(id=options['sale_id'])
+        
+        mismatches = sale_service.verify_totals(sales)
+        for mismatch in mismatches:
+            sale = mismatch['sale']
+            self.stdout.write(
+                f"Sale #{sale.id}: stored {mismatch['stored']} "
+                f"expected {mismatch['expected']}"
+            )
+        
+        if mismatches and options['fix']:
+            sale_service.recalculate_totals(Sale.objects.filter(id__in=[m['sale'].id for m in mismatches]))
+        
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('All sale totals are consistent'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Recalculated {len(mismatches)} sales'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(mismatches)} inconsistent sales'))
@@ -0,0 +1,194 @@
+"""
+Request Metrics - Fixed-bucket histograms of per-view request costs
+Histograms are uint64 counters in a memory-mapped file (MAP_SHARED), so every
+worker process records into the same counters and a management command can
+read them while the server runs. Views are keyed by their URL name from
+pos/urls.py; anything else is recorded as 'other'.
+"""
+
+import mmap
+import os
+import threading
+import zlib
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from pos.config import SystemConfig
+
+try:
+    import fcntl
+except ImportError:  # No flock on Windows; concurrent updates may then be lost
+    fcntl = None
+
+# Bucket upper bounds per metric; one more bucket holds everything above
+TIME_BOUNDS_MS = [1, 1.5, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300,
+                  500, 750, 1000, 1500, 2000, 3000, 5000, 10000]
+METRICS = {
+    'wall_ms': TIME_BOUNDS_MS,
+    'queries': [0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100, 200, 500],
+    'db_ms': TIME_BOUNDS_MS,
+    'bytes': [1024, 2048, 5120, 10240, 20480, 51200, 102400, 204800, 512000, 1048576, 4194304],
+}
+# Sums are stored as integers: times in microseconds
+SUM_SCALE = {'wall_ms': 1000, 'queries': 1, 'db_ms': 1000, 'bytes': 1}
+# Query counts are whole numbers with a bucket each, so report bounds as-is
+INTERPOLATE = {'wall_ms': True, 'queries': False, 'db_ms': True, 'bytes': True}
+PERCENTILES = (50, 95, 99)
+
+MAGIC = int.from_bytes(b'POSMET01', 'little')
+HEADER_SLOTS = 2  # Magic, layout checksum
+
+
+def view_names() -> List[str]:
+    """Every named pos URL, plus 'other'"""
+    from pos.urls import app_name, urlpatterns
+    names = {f'{app_name}:{pattern.name}' for pattern in urlpatterns if pattern.name}
+    return ['other'] + sorted(names)
+
+
+def _percentile(counts: List[int], bounds: List[float], total: int, percent: float,
+                interpolate: bool = True) -> float:
+    """Value below which percent of samples fall, interpolated within its bucket"""
+    rank = total * percent / 100
+    seen, lower = 0, 0
+    for index, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if index == len(bounds):
+                return bounds[-1]  # Only known to be above the last bound
+            if not interpolate:
+                return bounds[index]
+            return lower + (bounds[index] - lower) * (rank - seen) / count
+        seen += count
+        if index < len(bounds):
+            lower = bounds[index]
+    return 0
+
+
+class RequestMetrics:
+    """
+    Histograms of one metrics file
+    Each (view, metric) pair owns one counter per bucket plus a sample count
+    and a sum. The file is re-initialised if the URL names or buckets change.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._names: Optional[List[str]] = None
+        self._index: Dict[str, int] = {}
+        self._fd = None
+        self._map = None
+        self._counters = None
+        self._pid = None
+        # flock only excludes other processes; threads share this process's lock
+        self._thread_lock = threading.Lock()
+    
+    def _layout(self):
+        self._names = view_names()
+        self._index = {name: index for index, name in enumerate(self._names)}
+        self._offsets = {}
+        offset = 0
+        for metric, bounds in METRICS.items():
+            self._offsets[metric] = offset
+            offset += len(bounds) + 3  # Buckets, overflow bucket, count, sum
+        self._view_slots = offset
+        self._slots = HEADER_SLOTS + len(self._names) * self._view_slots
+        layout = repr((self._names, METRICS)).encode()
+        self._checksum = zlib.crc32(layout)
+    
+    def _open(self):
+        if self._map is not None and self._pid == os.getpid():
+            return
+        self._close()
+        if self._names is None:
+            self._layout()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._pid = os.getpid()
+        size = self._slots * 8
+        with self._locked():
+            current = os.fstat(self._fd).st_size
+            if current != size:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+            self._counters = memoryview(self._map).cast('Q')
+            if self._counters[0] != MAGIC or self._counters[1] != self._checksum:
+                self._map[:] = bytes(size)
+                self._counters[0] = MAGIC
+                self._counters[1] = self._checksum
+    
+    def _close(self):
+        # A forked child inherits the parent's mapping and descriptor; release
+        # its copies (and the shared flock) before mapping the file again
+        if self._counters is not None:
+            self._counters.release()
+        if self._map is not None:
+            self._map.close()
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = self._map = self._counters = None
+    
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+    
+    def _base(self, view_name: str, metric: str) -> int:
+        view = self._index.get(view_name, 0)
+        return HEADER_SLOTS + view * self._view_slots + self._offsets[metric]
+    
+    def record(self, view_name: str, wall_ms: float, queries: int, db_ms: float, size: Optional[int]):
+        """Add one request's costs; size is None for streaming responses"""
+        self._open()
+        values = {'wall_ms': wall_ms, 'queries': queries, 'db_ms': db_ms, 'bytes': size}
+        counters = self._counters
+        with self._locked():
+            for metric, bounds in METRICS.items():
+                value = values[metric]
+                if value is None:
+                    continue
+                base = self._base(view_name, metric)
+                bucket = bisect_left(bounds, value)  # First bound >= value
+                counters[base + bucket] += 1
+                counters[base + len(bounds) + 1] += 1
+                counters[base + len(bounds) + 2] += int(value * SUM_SCALE[metric])
+    
+    def report(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Per view and metric: count, mean and percentiles, for views with requests"""
+        self._open()
+        with self._locked():
+            counters = self._counters.tolist()
+        report = {}
+        for view_name in self._names:
+            metrics = {}
+            for metric, bounds in METRICS.items():
+                base = self._base(view_name, metric)
+                counts = counters[base:base + len(bounds) + 1]
+                total, total_sum = counters[base + len(bounds) + 1], counters[base + len(bounds) + 2]
+                if not total:
+                    continue
+                summary = {'count': total, 'mean': total_sum / SUM_SCALE[metric] / total}
+                for percent in PERCENTILES:
+                    summary[f'p{percent}'] = _percentile(counts, bounds, total, percent, INTERPOLATE[metric])
+                metrics[metric] = summary
+            if metrics:
+                report[view_name] = metrics
+        return report
+    
+    def reset(self):
+        """Zero every histogram"""
+        self._open()
+        with self._locked():
+            self._map[HEADER_SLOTS * 8:] = bytes((self._slots - HEADER_SLOTS) * 8)
+
+
+request_metrics = RequestMetrics(SystemConfig.get_request_metrics_file())
@@ -0,0 +1,63 @@
+"""
+POS Middleware
+"""
+
+import time
+from contextlib import ExitStack
+from django.db import connections
+from pos.metrics import request_metrics
+from pos.repositories.employee_repository import EmployeeRepository
+
+
+class CurrentEmployeeMiddleware:
+    """
+    Attach the logged-in Employee, or None, as request.employee
+    It is resolved once per request through the employee cache, so views
+    neither repeat the lookup nor, usually, query the employees table.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        request.employee = EmployeeRepository.get_cached(request.session.get('employee_id'))
+        return self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record wall time, query count, database time and response size of every
+    request into the per-view histograms. Place it first to time the whole
+    middleware stack.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        stats = {'queries': 0, 'db_seconds': 0.0}
+        
+        def count_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['queries'] += 1
+                stats['db_seconds'] += time.perf_counter() - start
+        
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        wall_seconds = time.perf_counter() - start
+        
+        match = request.resolver_match
+        request_metrics.record(
+            view_name=match.view_name if match else 'other',
+            wall_ms=wall_seconds * 1000,
+            queries=stats['queries'],
+            db_ms=stats['db_seconds'] * 1000,
+            size=None if response.streaming else len(response.content),
+        )
+        return response
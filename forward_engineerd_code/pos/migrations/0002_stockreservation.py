@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:19
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('holder', models.CharField(max_length=64)),
+                ('stock_type', models.CharField(choices=[('sale', 'Sale'), ('rental', 'Rental')], max_length=10)),
+                ('quantity', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='pos.item')),
+            ],
+            options={
+                'db_table': 'stock_reservations',
+                'indexes': [models.Index(fields=['item', 'stock_type', 'expires_at'], name='idx_reservations_item'), models.Index(fields=['expires_at'], name='idx_reservations_expiry')],
+                'unique_together': {('holder', 'item', 'stock_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0002_stockreservation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['is_returned', 'due_date', 'id'], name='idx_rentals_open_due'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['transaction_time', 'id'], name='idx_sales_time_id'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:23
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='reorder_threshold',
+            field=models.IntegerField(default=10, help_text='Stock below this level needs reordering', validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('stock_sale__lt', models.F('reorder_threshold'))), fields=['item_id'], name='idx_items_low_sale'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('stock_rental__lt', models.F('reorder_threshold'))), fields=['item_id'], name='idx_items_low_rental'),
+        ),
+    ]
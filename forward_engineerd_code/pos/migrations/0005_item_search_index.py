@@ -0,0 +1,84 @@
+"""
+Full-text search tables for items (SQLite FTS5 only)
+
+items_fts answers ranked word/prefix queries; items_trigram answers substring
+and typo-tolerant queries (SQLite 3.34+ only). Both are external-content
+tables over items, kept in sync by triggers so bulk writes that bypass model
+signals are covered too.
+Other databases skip this migration and search falls back to icontains.
+"""
+
+import warnings
+
+from django.db import migrations
+
+# The trigram tokenizer was added in SQLite 3.34.0; older versions get word
+# and prefix search only, and fuzzy search falls back to icontains
+TRIGRAM_MIN_SQLITE = (3, 34, 0)
+
+
+def forward_sql(trigram):
+    """Statements creating the search tables, with or without items_trigram"""
+    fts_insert = "INSERT INTO items_fts(rowid, name, item_id) VALUES (new.id, new.name, new.item_id); "
+    fts_delete = ("INSERT INTO items_fts(items_fts, rowid, name, item_id) "
+                  "VALUES ('delete', old.id, old.name, old.item_id); ")
+    trigram_insert = "INSERT INTO items_trigram(rowid, name) VALUES (new.id, new.name); " if trigram else ""
+    trigram_delete = ("INSERT INTO items_trigram(items_trigram, rowid, name) "
+                      "VALUES ('delete', old.id, old.name); ") if trigram else ""
+    
+    statements = [
+        "CREATE VIRTUAL TABLE items_fts USING fts5("
+        "name, item_id, content='items', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')",
+        "CREATE TRIGGER items_search_ai AFTER INSERT ON items BEGIN "
+        + fts_insert + trigram_insert + "END",
+        "CREATE TRIGGER items_search_ad AFTER DELETE ON items BEGIN "
+        + fts_delete + trigram_delete + "END",
+        # Stock updates are by far the most frequent writes; only reindex on catalog changes
+        "CREATE TRIGGER items_search_au AFTER UPDATE OF name, item_id ON items BEGIN "
+        + fts_delete + trigram_delete + fts_insert + trigram_insert + "END",
+        "INSERT INTO items_fts(items_fts) VALUES ('rebuild')",
+    ]
+    if trigram:
+        # Created before the triggers that write to it
+        statements.insert(1, "CREATE VIRTUAL TABLE items_trigram USING fts5("
+                             "name, content='items', content_rowid='id', tokenize='trigram')")
+        statements.append("INSERT INTO items_trigram(items_trigram) VALUES ('rebuild')")
+    return statements
+
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS items_search_au",
+    "DROP TRIGGER IF EXISTS items_search_ad",
+    "DROP TRIGGER IF EXISTS items_search_ai",
+    "DROP TABLE IF EXISTS items_trigram",
+    "DROP TABLE IF EXISTS items_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        if callable(statements):
+            trigram = schema_editor.connection.Database.sqlite_version_info >= TRIGRAM_MIN_SQLITE
+            if not trigram:
+                warnings.warn(f"SQLite {schema_editor.connection.Database.sqlite_version} has no trigram "
+                              f"tokenizer; fuzzy item search will use icontains", RuntimeWarning)
+            run_statements = statements(trigram)
+        else:
+            run_statements = statements
+        for statement in run_statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0004_item_reorder_threshold'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(forward_sql), _run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0006_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employeelog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
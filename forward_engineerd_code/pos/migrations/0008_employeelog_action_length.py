@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0007_employeelog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employeelog',
+            name='action',
+            field=models.CharField(choices=[('login', 'Login'), ('logout', 'Logout'), ('sale_completed', 'Sale completed'), ('rental_created', 'Rental created'), ('rental_returned', 'Rental returned')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0008_employeelog_action_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LateFeeAccrual',
+            fields=[
+                ('rental', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='accrual', serialize=False, to='pos.rental')),
+                ('days_late', models.IntegerField()),
+                ('accrued_fee', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('as_of', models.DateField()),
+            ],
+            options={
+                'db_table': 'late_fee_accruals',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+def normalize_phone(phone_number):
+    # Frozen copy of Customer.normalize_phone
+    digits = ''.join(char for char in phone_number if char in '0123456789')
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits or phone_number.strip()
+
+
+def backfill_phone_keys(apps, schema_editor):
+    """
+    Key the oldest customer of each normalized phone number; newer duplicates
+    keep a NULL key until the merge_customers command folds them in
+    """
+    Customer = apps.get_model('pos', 'Customer')
+    seen = set()
+    keyed = []
+    for pk, phone_number in Customer.objects.order_by('pk').values_list('pk', 'phone_number').iterator():
+        key = normalize_phone(phone_number)
+        if key not in seen:
+            seen.add(key)
+            keyed.append(Customer(pk=pk, phone_key=key))
+    Customer.objects.bulk_update(keyed, ['phone_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0010_rental_open_due_partial_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_key',
+            field=models.CharField(blank=True, max_length=20, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_phone_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0011_customer_phone_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompactedSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('row_count', models.IntegerField(default=0)),
+                ('compacted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'compacted_segments',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -6,7 +6,8 @@ Migrated from .txt file-based storage to relational database
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.core.validators import MinValueValidator
-from decimal import Decimal
+from django.utils import timezone
+from decimal import Decimal, ROUND_HALF_UP
 from datetime import date, timedelta
 
 
@@ -19,7 +20,7 @@ class EmployeeManager(BaseUserManager):
         user.set_password(password)
         user.save(using=self._db)
         return user
-
+    
     def create_superuser(self, username, password=None, **extra_fields):
         extra_fields.setdefault('is_staff', True)
         extra_fields.setdefault('position', 'Admin')
@@ -86,6 +87,8 @@ class Item(models.Model):
     stock_sale = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     stock_rental = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     item_type = models.CharField(max_length=10, choices=ITEM_TYPE_CHOICES, default='Both')
+    reorder_threshold = models.IntegerField(default=10, validators=[MinValueValidator(0)],
+                                            help_text='Stock below this level needs reordering')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -95,11 +98,23 @@ class Item(models.Model):
         indexes = [
             models.Index(fields=['item_id']),
             models.Index(fields=['name']),
+            # Partial indexes only hold the (few) items below their reorder level
+            models.Index(fields=['item_id'], name='idx_items_low_sale',
+                         condition=models.Q(stock_sale__lt=models.F('reorder_threshold'))),
+            models.Index(fields=['item_id'], name='idx_items_low_rental',
+                         condition=models.Q(stock_rental__lt=models.F('reorder_threshold'))),
         ]
     
     def __str__(self):
         return f"{self.name} (ID: {self.item_id})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The item_id as loaded, so a save that changes it can drop the old cache entry
+        instance._loaded_item_id = instance.__dict__.get('item_id')
+        return instance
+    
     def is_available_for_sale(self, quantity=1):
         """Check if item is available for sale"""
         return self.stock_sale >= quantity and self.item_type in ['Sale', 'Both']
@@ -107,6 +122,40 @@ class Item(models.Model):
     def is_available_for_rental(self, quantity=1):
         """Check if item is available for rental"""
         return self.stock_rental >= quantity and self.item_type in ['Rental', 'Both']
+    
+    def is_low_stock(self):
+        """Check if either stock is below the reorder threshold"""
+        return (self.stock_sale < self.reorder_threshold or
+                self.stock_rental < self.reorder_threshold)
+
+
+class StockReservation(models.Model):
+    """
+    StockReservation model - stock held for an open cart
+    Reservations stop counting once expires_at has passed.
+    """
+    STOCK_TYPE_CHOICES = [
+        ('sale', 'Sale'),
+        ('rental', 'Rental')
+    ]
+    
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='reservations')
+    holder = models.CharField(max_length=64)
+    stock_type = models.CharField(max_length=10, choices=STOCK_TYPE_CHOICES)
+    quantity = models.IntegerField(validators=[MinValueValidator(1)])
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'stock_reservations'
+        unique_together = [['holder', 'item', 'stock_type']]
+        indexes = [
+            models.Index(fields=['item', 'stock_type', 'expires_at'], name='idx_reservations_item'),
+            models.Index(fields=['expires_at'], name='idx_reservations_expiry'),
+        ]
+    
+    def __str__(self):
+        return f"{self.quantity} x {self.item_id} held by {self.holder}"
 
 
 class Customer(models.Model):
@@ -115,6 +164,9 @@ class Customer(models.Model):
     Format: phoneNumber itemID1,returnDate1,returned1 itemID2,returnDate2,returned2...
     """
     phone_number = models.CharField(max_length=20, unique=True, db_index=True)
+    # Canonical lookup key: phone_number's digits (see normalize_phone). NULL
+    # only on duplicates of another customer awaiting the merge_customers job
+    phone_key = models.CharField(max_length=20, unique=True, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -128,6 +180,24 @@ class Customer(models.Model):
     def __str__(self):
         return f"Customer: {self.phone_number}"
     
+    def save(self, *args, **kwargs):
+        # Duplicates stay unkeyed until merged; everyone else follows phone_number
+        if self._state.adding or self.phone_key is not None:
+            self.phone_key = self.normalize_phone(self.phone_number)
+        super().save(*args, **kwargs)
+    
+    @staticmethod
+    def normalize_phone(phone_number: str) -> str:
+        """
+        Lookup key of a phone number: its digits, so 555-1234, (555) 1234 and
+        5551234 are one customer. A leading 1 (US country code) is dropped
+        from 11-digit numbers; input without digits is kept as typed.
+        """
+        digits = ''.join(char for char in phone_number if char in '0123456789')
+        if len(digits) == 11 and digits.startswith('1'):
+            digits = digits[1:]
+        return digits or phone_number.strip()
+    
     def get_outstanding_rentals(self):
         """Get all outstanding (not returned) rentals for this customer"""
         return self.rentals.filter(is_returned=False)
@@ -156,6 +226,10 @@ class Rental(models.Model):
             models.Index(fields=['customer', 'is_returned']),
             models.Index(fields=['due_date']),
             models.Index(fields=['item']),
+            # Outstanding rentals only: the return counter's due-date lookups
+            # and the keyset-paginated rental list
+            models.Index(fields=['due_date', 'id'], name='idx_rentals_open_due_date',
+                         condition=models.Q(is_returned=False)),
         ]
     
     def __str__(self):
@@ -169,11 +243,39 @@ class Rental(models.Model):
         return (date.today() - self.due_date).days
     
     def calculate_late_fee(self, late_fee_rate=0.1):
-        """Calculate late fee based on days late"""
-        days_late = self.calculate_days_late()
-        if days_late > 0:
-            return Decimal(str(self.item.price * self.quantity * late_fee_rate * days_late))
-        return Decimal('0.00')
+        """
+        Calculate late fee based on days late
+        Rounded half-up to cents (see late_fee_for). This used to multiply the
+        Decimal price by a float rate, which raised TypeError for a saved item
+        and gave unrounded fees for an unsaved one with a float price.
+        """
+        return self.late_fee_for(self.item.price, self.quantity, self.calculate_days_late(), late_fee_rate)
+    
+    @staticmethod
+    def late_fee_for(price, quantity, days_late, late_fee_rate=0.1) -> Decimal:
+        """Late fee of a rental line, in exact decimal arithmetic, rounded to cents"""
+        if days_late <= 0:
+            return Decimal('0.00')
+        fee = Decimal(price) * quantity * Decimal(str(late_fee_rate)) * days_late
+        return fee.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+class LateFeeAccrual(models.Model):
+    """
+    Days late and late fee accrued by an overdue rental as of a date
+    Precomputed for all outstanding rentals at once, so screens and reports
+    read fees instead of computing them per row.
+    """
+    rental = models.OneToOneField(Rental, on_delete=models.CASCADE, primary_key=True, related_name='accrual')
+    days_late = models.IntegerField()
+    accrued_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    as_of = models.DateField()
+    
+    class Meta:
+        db_table = 'late_fee_accruals'
+    
+    def __str__(self):
+        return f"Rental #{self.rental_id}: ${self.accrued_fee} as of {self.as_of}"
 
 
 class Sale(models.Model):
@@ -196,6 +298,7 @@ class Sale(models.Model):
         indexes = [
             models.Index(fields=['transaction_time']),
             models.Index(fields=['employee']),
+            models.Index(fields=['transaction_time', 'id'], name='idx_sales_time_id'),
         ]
     
     def __str__(self):
@@ -291,11 +394,15 @@ class EmployeeLog(models.Model):
     ACTION_CHOICES = [
         ('login', 'Login'),
         ('logout', 'Logout'),
+        ('sale_completed', 'Sale completed'),
+        ('rental_created', 'Rental created'),
+        ('rental_returned', 'Rental returned'),
     ]
     
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='logs')
-    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    # A default rather than auto_now_add, so imported logs keep their time
+    timestamp = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -308,3 +415,43 @@ class EmployeeLog(models.Model):
     
     def __str__(self):
         return f"{self.employee.username} - {self.action} at {self.timestamp}"
+
+
+class ImportCheckpoint(models.Model):
+    """
+    ImportCheckpoint model - progress of a legacy .txt file import
+    Saved in the same transaction as each imported chunk, so a restarted
+    import can seek straight to byte_offset. fingerprint is a checksum of the
+    file's first bytes and the bytes just before byte_offset, so a replaced
+    file is noticed and read from the start.
+    """
+    file_path = models.CharField(max_length=500, unique=True)
+    byte_offset = models.BigIntegerField(default=0)
+    row_count = models.BigIntegerField(default=0)
+    fingerprint = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'import_checkpoints'
+        ordering = ['file_path']
+    
+    def __str__(self):
+        return f"{self.file_path}: {self.row_count} rows ({self.byte_offset} bytes)"
+
+
+class CompactedSegment(models.Model):
+    """
+    CompactedSegment model - an audit segment file already moved into employee_logs
+    Saved in the same transaction as the segment's rows and deleted with the
+    file, so a segment left behind by a crash is never inserted twice.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    row_count = models.IntegerField(default=0)
+    compacted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'compacted_segments'
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name}: {self.row_count} rows"
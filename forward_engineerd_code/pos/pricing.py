@@ -0,0 +1,86 @@
+"""
+Batch Pricing - Integer-cents late fees and sale totals for many rows at once
+Each function takes parallel sequences (one value per rental or sale) and
+returns array('q') results. Rows are still priced one at a time in plain
+Python; the speedup over the scalar Decimal methods comes from integer-cents
+arithmetic with rates held as exact fractions, not from vectorization.
+Rounding is half-up (away from zero), the same as the scalar methods
+(Rental.late_fee_for, SaleRepository.compute_totals), so the results match
+them exactly.
+"""
+
+from array import array
+from datetime import date
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Iterable, Sequence, Tuple
+
+
+def to_cents(amount) -> int:
+    """Exact cents of a money amount with at most two decimal places"""
+    cents = Decimal(str(amount)).scaleb(2)
+    if cents != cents.to_integral_value():
+        raise ValueError(f"{amount} is not a whole number of cents")
+    return int(cents)
+
+
+def from_cents(cents: int) -> Decimal:
+    """Money amount of a number of cents, with two decimal places"""
+    return Decimal(cents).scaleb(-2)
+
+
+def _fraction(rate) -> Tuple[int, int]:
+    """(numerator, denominator) of a decimal rate, e.g. 0.1 -> (1, 10)"""
+    fraction = Fraction(Decimal(str(rate)))
+    return fraction.numerator, fraction.denominator
+
+
+def _round_half_up(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded to an integer, halves away from zero"""
+    rounded = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return rounded if numerator >= 0 else -rounded
+
+
+def days_late(due_dates: Iterable[date], returned: Iterable[bool], as_of: date) -> array:
+    """Days past due as of as_of; 0 for returned or not yet due rentals"""
+    today = as_of.toordinal()
+    return array('q', (
+        0 if is_returned else max(today - due_date.toordinal(), 0)
+        for due_date, is_returned in zip(due_dates, returned)
+    ))
+
+
+def late_fees(price_cents: Sequence[int], quantities: Sequence[int], days: Sequence[int],
+              late_fee_rate=0.1) -> array:
+    """Late fee in cents per rental: price * quantity * rate * days late"""
+    numerator, denominator = _fraction(late_fee_rate)
+    return array('q', (
+        _round_half_up(price * quantity * day * numerator, denominator) if day > 0 else 0
+        for price, quantity, day in zip(price_cents, quantities, days)
+    ))
+
+
+def sale_totals(subtotal_cents: Sequence[int], discount_rates: Sequence, tax_rate=1.06) -> Dict[str, array]:
+    """
+    Discount, tax and total in cents per sale, as in compute_totals
+    discount_rates holds each sale's rate (1.00 without a coupon).
+    """
+    tax_numerator, tax_denominator = _fraction(Decimal(str(tax_rate)) - 1)
+    fractions = {}
+    discounts, taxes, totals = array('q'), array('q'), array('q')
+    for subtotal, discount_rate in zip(subtotal_cents, discount_rates):
+        fraction = fractions.get(discount_rate)
+        if fraction is None:
+            fraction = fractions[discount_rate] = _fraction(1 - Decimal(str(discount_rate)))
+        discount = _round_half_up(subtotal * fraction[0], fraction[1])
+        discounted = subtotal - discount
+        tax = _round_half_up(discounted * tax_numerator, tax_denominator)
+        discounts.append(discount)
+        taxes.append(tax)
+        totals.append(discounted + tax)
+    return {
+        'subtotal': array('q', subtotal_cents),
+        'discount_amount': discounts,
+        'tax_amount': taxes,
+        'total_amount': totals,
+    }
@@ -8,6 +8,9 @@ from .sale_repository import SaleRepository
 from .rental_repository import RentalRepository
 from .customer_repository import CustomerRepository
 from .employee_repository import EmployeeRepository
+from .reservation_repository import ReservationRepository
+from .import_checkpoint_repository import ImportCheckpointRepository
+from .late_fee_repository import LateFeeAccrualRepository
 
 __all__ = [
     'ItemRepository',
@@ -15,5 +18,8 @@ __all__ = [
     'RentalRepository',
     'CustomerRepository',
     'EmployeeRepository',
+    'ReservationRepository',
+    'ImportCheckpointRepository',
+    'LateFeeAccrualRepository',
 ]
 
@@ -0,0 +1,152 @@
+"""
+Audit Log - Process-local batching writer for EmployeeLog entries
+By default entries are saved inline. With AUDIT_LOG_BUFFERED they are
+queued once the caller's transaction commits and a background thread
+inserts them with bulk_create every FLUSH_INTERVAL_MS or as soon as
+FLUSH_SIZE are pending, so logging adds no INSERT to the request.
+Whatever is still pending is flushed when the process exits.
+
+With AUDIT_LOG_STORAGE = 'segments' entries go to append-only segment files
+instead of the table (see audit_segments).
+"""
+
+import atexit
+import logging
+import threading
+from collections import deque
+from functools import partial
+from typing import Dict, Optional
+from django.db import DatabaseError, close_old_connections, transaction
+from pos.config import SystemConfig
+from pos.models import EmployeeLog
+from .audit_segments import AuditSegmentStore
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """
+    Writes EmployeeLog entries, inline or in batches
+    Unbuffered, write() saves the entry in the caller's transaction. Buffered,
+    entries of a rolled back transaction are never queued, a failed flush is
+    retried on the next one, and at max_pending the caller flushes the queue
+    itself. Only if that flush fails too is the oldest entry dropped, with a
+    warning, rather than growing without bound. Given segments, committed
+    entries are appended to those files instead.
+    """
+    
+    def __init__(self, buffered: bool, flush_interval_ms: int, flush_size: int, max_pending: int,
+                 segments: Optional[AuditSegmentStore] = None):
+        self.buffered = buffered
+        self.segments = segments
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_size = flush_size
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+    
+    def write(self, entry: EmployeeLog):
+        """Save entry now, or queue it for the next flush once committed"""
+        if self.segments is not None:
+            transaction.on_commit(partial(self.segments.append, entry))
+            return
+        if not self.buffered:
+            entry.save()
+            return
+        transaction.on_commit(partial(self._enqueue, entry))
+    
+    def _enqueue(self, entry: EmployeeLog):
+        with self._lock:
+            backlogged = len(self._pending) >= self.max_pending
+        if backlogged:
+            # The flush thread is falling behind; write in the caller instead
+            self.flush()
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+                logger.warning("Audit log queue full, dropped the oldest entry (%d dropped)", self.dropped)
+            self._pending.append(entry)
+            full = len(self._pending) >= self.flush_size
+        self._start()
+        if full:
+            self._wake.set()
+    
+    def _start(self):
+        # Started on first use, so a forked worker starts its own thread
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stopped.clear()
+                    self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+                    self._thread.start()
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            close_old_connections()
+        close_old_connections()
+    
+    def flush(self) -> int:
+        """Insert every pending entry; returns how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return 0
+            try:
+                EmployeeLog.objects.bulk_create(batch, batch_size=500)
+            except DatabaseError:
+                logger.exception("Failed to write %d audit log entries, will retry", len(batch))
+                with self._lock:
+                    self._pending.extendleft(reversed(batch))
+                return 0
+            with self._lock:
+                self.written += len(batch)
+            return len(batch)
+    
+    def close(self):
+        """Stop the flush thread, write what is still pending and seal segments"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        if self.segments is not None:
+            self.segments.close()
+    
+    def stats(self) -> Dict:
+        """Queue counters for sizing the buffer"""
+        with self._lock:
+            return {
+                'buffered': self.buffered,
+                'pending': len(self._pending),
+                'written': self.written,
+                'dropped': self.dropped,
+            }
+
+
+audit_log = AuditLogWriter(
+    buffered=SystemConfig.get_audit_log_buffered(),
+    flush_interval_ms=SystemConfig.get_audit_log_flush_interval_ms(),
+    flush_size=SystemConfig.get_audit_log_flush_size(),
+    max_pending=SystemConfig.get_audit_log_max_pending(),
+    segments=(
+        AuditSegmentStore(
+            directory=SystemConfig.get_audit_log_segment_dir(),
+            max_entries=SystemConfig.get_audit_log_segment_max_entries(),
+            max_age_seconds=SystemConfig.get_audit_log_segment_max_age_seconds(),
+        )
+        if SystemConfig.get_audit_log_storage() == 'segments' else None
+    ),
+)
+atexit.register(audit_log.close)
@@ -0,0 +1,292 @@
+"""
+Audit Segments - Append-only segment files for EmployeeLog entries
+An alternative to the employee_logs table for the activity log. Each process
+appends one line per entry to its own active segment. A full or old segment
+is sealed: rewritten with a header holding its min/max timestamp, so a range
+read only opens the sealed segments that overlap the range, plus the active
+ones. Sealed segments are compacted back into employee_logs for reporting.
+
+Line format:   <epoch microseconds> <employee id> <action>
+(an employee's id is their username)
+Sealed header: #segment <min microseconds> <max microseconds> <entry count>
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from django.db import transaction
+from pos.models import CompactedSegment, Employee, EmployeeLog
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so idle segments are left to their owners
+    fcntl = None
+
+ACTIVE_SUFFIX = '.active'
+SEALED_SUFFIX = '.seg'
+HEADER_PREFIX = b'#segment '
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _to_micros(timestamp: datetime) -> int:
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def _locked(file):
+    """Exclusive flock on an open segment, held by its owner while writing"""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def _unlinked(file) -> bool:
+    """Whether an open segment has been sealed (removed) by another process"""
+    return os.fstat(file.fileno()).st_nlink == 0
+
+
+class SegmentHeader(NamedTuple):
+    min_micros: int
+    max_micros: int
+    count: int
+
+
+class AuditSegmentStore:
+    """
+    Segment files of one directory
+    Active segments are named <start ns>-<pid>.active and only ever appended
+    to by that process; sealed ones swap the suffix for .seg and never change
+    again, so their headers are cached. Compaction may seal another live
+    process's segment once it has been idle for max age; the owner notices on
+    its next append and starts a new segment.
+    """
+    
+    def __init__(self, directory: str, max_entries: int, max_age_seconds: float):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._pid = None
+        self._count = 0
+        self._opened_at = 0.0
+        self._headers: Dict[str, SegmentHeader] = {}
+    
+    def append(self, entry: EmployeeLog):
+        """Append entry to this process's active segment, rotating it when due"""
+        line = f'{_to_micros(entry.timestamp)} {entry.employee_id} {entry.action}\n'.encode()
+        with self._lock:
+            if self._file is None or self._pid != os.getpid():
+                self._open()
+            current = self._file
+            with _locked(current):
+                if _unlinked(current):
+                    self._open()  # Sealed by compaction while idle
+                self._file.write(line)
+                self._file.flush()
+            if current is not self._file:
+                current.close()
+            self._count += 1
+            if self._count >= self.max_entries or time.monotonic() - self._opened_at >= self.max_age_seconds:
+                self._close_active()
+    
+    def _open(self):
+        # After a fork the inherited file belongs to the parent; start our own
+        os.makedirs(self.directory, exist_ok=True)
+        self._pid = os.getpid()
+        self._path = os.path.join(self.directory, f'{time.time_ns()}-{self._pid}{ACTIVE_SUFFIX}')
+        self._file = open(self._path, 'ab')
+        self._count = 0
+        self._opened_at = time.monotonic()
+    
+    def _close_active(self):
+        with self._file, _locked(self._file):
+            if not _unlinked(self._file):
+                self._seal(self._path)
+        self._file = self._path = None
+    
+    def close(self):
+        """Seal this process's active segment"""
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._close_active()
+    
+    def seal_if_stale(self) -> bool:
+        """Seal this process's active segment if it is past max age"""
+        with self._lock:
+            if (self._file is not None and self._pid == os.getpid()
+                    and time.monotonic() - self._opened_at >= self.max_age_seconds):
+                self._close_active()
+                return True
+        return False
+    
+    def _seal(self, path: str):
+        sealed = path[:-len(ACTIVE_SUFFIX)] + SEALED_SUFFIX
+        if os.path.exists(sealed):
+            # Sealed before a crash that left the active file behind
+            os.remove(path)
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        data = data[:data.rfind(b'\n') + 1]  # Drop a line torn by a crash
+        stamps = [int(line.split(b' ', 1)[0]) for line in data.splitlines()]
+        if stamps:
+            header = HEADER_PREFIX + b'%d %d %d\n' % (min(stamps), max(stamps), len(stamps))
+            temp = sealed + '.tmp'
+            with open(temp, 'wb') as f:
+                f.write(header + data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, sealed)
+        os.remove(path)
+    
+    def seal_orphans(self) -> int:
+        """Seal active segments left behind by processes that no longer run"""
+        sealed = 0
+        for name in self._names(ACTIVE_SUFFIX):
+            pid = int(name[:-len(ACTIVE_SUFFIX)].rsplit('-', 1)[1])
+            path = os.path.join(self.directory, name)
+            if path != self._path and not _pid_alive(pid):
+                self._seal(path)
+                sealed += 1
+        return sealed
+    
+    def seal_idle(self) -> int:
+        """Seal other live processes' active segments idle for max age"""
+        if fcntl is None:
+            return 0
+        sealed = 0
+        for name in self._names(ACTIVE_SUFFIX):
+            path = os.path.join(self.directory, name)
+            if path == self._path:
+                continue
+            try:
+                if time.time() - os.path.getmtime(path) < self.max_age_seconds:
+                    continue
+                segment = open(path, 'rb')
+            except FileNotFoundError:
+                continue  # Sealed by its owner since the listing
+            with segment, _locked(segment):
+                if not _unlinked(segment):
+                    self._seal(path)
+                    sealed += 1
+        return sealed
+    
+    def _names(self, suffix: str) -> List[str]:
+        try:
+            return sorted(name for name in os.listdir(self.directory) if name.endswith(suffix))
+        except FileNotFoundError:
+            return []
+    
+    def _header(self, name: str) -> SegmentHeader:
+        header = self._headers.get(name)
+        if header is None:
+            with open(os.path.join(self.directory, name), 'rb') as f:
+                header = SegmentHeader(*map(int, f.readline()[len(HEADER_PREFIX):].split()))
+            self._headers[name] = header
+        return header
+    
+    def _entries(self, path: str) -> Iterator[Tuple[int, str, str]]:
+        with open(path, 'rb') as f:
+            data = f.read()
+        for line in data.splitlines():
+            parts = line.split()
+            if len(parts) != 3 or line.startswith(HEADER_PREFIX):
+                continue  # Header, or a line still being written
+            yield int(parts[0]), parts[1].decode(), parts[2].decode()
+    
+    def read(self, employee_id: Optional[str] = None, since: Optional[datetime] = None,
+             until: Optional[datetime] = None) -> List[EmployeeLog]:
+        """
+        Entries with since <= timestamp < until, as unsaved EmployeeLogs
+        Sealed segments outside the range are skipped on their header alone.
+        """
+        low = _to_micros(since) if since else None
+        high = _to_micros(until) if until else None
+        paths = []
+        for name in self._names(SEALED_SUFFIX):
+            try:
+                header = self._header(name)
+            except FileNotFoundError:
+                continue  # Compacted since the listing
+            if (low is not None and header.max_micros < low) or (high is not None and header.min_micros >= high):
+                continue
+            paths.append(os.path.join(self.directory, name))
+        paths.extend(os.path.join(self.directory, name) for name in self._names(ACTIVE_SUFFIX))
+        
+        logs = []
+        for path in paths:
+            try:
+                entries = list(self._entries(path))
+            except FileNotFoundError:
+                # Sealed (or compacted) since the listing; read the sealed copy if there is one
+                sealed = path[:-len(ACTIVE_SUFFIX)] + SEALED_SUFFIX
+                if not path.endswith(ACTIVE_SUFFIX) or not os.path.exists(sealed):
+                    continue
+                entries = list(self._entries(sealed))
+            for micros, entry_employee_id, action in entries:
+                if employee_id is not None and entry_employee_id != employee_id:
+                    continue
+                if (low is not None and micros < low) or (high is not None and micros >= high):
+                    continue
+                logs.append(EmployeeLog(employee_id=entry_employee_id, action=action,
+                                        timestamp=_from_micros(micros)))
+        return logs
+    
+    def compact(self, batch_size: int = 1000) -> int:
+        """
+        Move sealed segments into employee_logs and delete them
+        Active segments past max age are sealed first: this process's own, and
+        those of other processes once idle that long, since an idle segment is
+        never rotated by append. Each segment is inserted
+        in one transaction that also records it as a CompactedSegment, so a
+        segment left behind by a crash is deleted rather than inserted twice.
+        Entries of deleted employees are dropped. Returns rows inserted.
+        """
+        self.seal_if_stale()
+        self.seal_orphans()
+        self.seal_idle()
+        inserted = 0
+        for name in self._names(SEALED_SUFFIX):
+            path = os.path.join(self.directory, name)
+            if not CompactedSegment.objects.filter(name=name).exists():
+                entries = list(self._entries(path))
+                employee_ids = set(Employee.objects.filter(
+                    pk__in={employee_id for _, employee_id, _ in entries}
+                ).values_list('pk', flat=True))
+                logs = [
+                    EmployeeLog(employee_id=employee_id, action=action, timestamp=_from_micros(micros))
+                    for micros, employee_id, action in entries if employee_id in employee_ids
+                ]
+                with transaction.atomic():
+                    EmployeeLog.objects.bulk_create(logs, batch_size=batch_size)
+                    CompactedSegment.objects.create(name=name, row_count=len(logs))
+                inserted += len(logs)
+            os.remove(path)
+            CompactedSegment.objects.filter(name=name).delete()
+            self._headers.pop(name, None)
+        return inserted
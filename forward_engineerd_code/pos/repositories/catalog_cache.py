@@ -0,0 +1,81 @@
+"""
+Catalog Cache - Process-local read-through cache of item catalog data
+Only catalog fields (name, price, type) are cached; stock is always read from
+the database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from pos.config import SystemConfig
+
+
+class CatalogCache:
+    """
+    LRU cache with per-entry TTL, keyed by item_id
+    Values are the cached catalog column tuples of an Item.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[int, Tuple[float, tuple]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, item_id: int) -> Optional[tuple]:
+        """Get cached values for item_id, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(item_id)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[item_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(item_id)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, item_id: int, values: tuple):
+        """Cache values for item_id, evicting the least recently used entry"""
+        with self._lock:
+            self._entries[item_id] = (time.monotonic() + self.ttl_seconds, values)
+            self._entries.move_to_end(item_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, *item_ids: int):
+        """Drop cached entries"""
+        with self._lock:
+            for item_id in item_ids:
+                self._entries.pop(item_id, None)
+    
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+catalog_cache = CatalogCache(
+    max_entries=SystemConfig.get_catalog_cache_size(),
+    ttl_seconds=SystemConfig.get_catalog_cache_ttl_seconds()
+)
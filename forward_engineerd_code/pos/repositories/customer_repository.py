@@ -2,8 +2,10 @@
 Customer Repository - Abstracts customer-related database operations
 """
 
-from typing import List, Optional
-from pos.models import Customer
+from typing import Dict, List, Optional
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from pos.models import Customer, Rental
 
 
 class CustomerRepository:
@@ -11,16 +13,16 @@ class CustomerRepository:
     
     @staticmethod
     def get_by_phone(phone_number: str) -> Optional[Customer]:
-        """Get customer by phone number"""
+        """Get customer by phone number, in any formatting"""
         try:
-            return Customer.objects.get(phone_number=phone_number)
+            return Customer.objects.get(phone_key=Customer.normalize_phone(phone_number))
         except Customer.DoesNotExist:
             return None
     
     @staticmethod
     def exists(phone_number: str) -> bool:
         """Check if customer exists"""
-        return Customer.objects.filter(phone_number=phone_number).exists()
+        return Customer.objects.filter(phone_key=Customer.normalize_phone(phone_number)).exists()
     
     @staticmethod
     def create(phone_number: str) -> Customer:
@@ -29,8 +31,11 @@ class CustomerRepository:
     
     @staticmethod
     def get_or_create(phone_number: str) -> tuple[Customer, bool]:
-        """Get existing customer or create new one"""
-        return Customer.objects.get_or_create(phone_number=phone_number)
+        """Get existing customer (matched on the normalized number) or create new one"""
+        return Customer.objects.get_or_create(
+            phone_key=Customer.normalize_phone(phone_number),
+            defaults={'phone_number': phone_number}
+        )
     
     @staticmethod
     def get_all() -> List[Customer]:
@@ -41,4 +46,41 @@ class CustomerRepository:
     def get_with_outstanding_rentals() -> List[Customer]:
         """Get customers with outstanding rentals"""
         return list(Customer.objects.filter(rentals__is_returned=False).distinct())
-
+    
+    @staticmethod
+    def merge_duplicates(batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Merge customers whose phone numbers normalize to the same key
+        Each key's keyed customer (else its oldest) is kept. Duplicates have
+        their rentals repointed with one bulk UPDATE per batch and are then
+        deleted; customers left without a key get one. Safe to re-run.
+        """
+        canonical, duplicates, unkeyed = {}, {}, []
+        rows = list(Customer.objects.order_by('id').values_list('id', 'phone_number', 'phone_key'))
+        for customer_id, phone_number, phone_key in rows:
+            if phone_key is not None:
+                canonical[phone_key] = customer_id
+        for customer_id, phone_number, phone_key in rows:
+            if phone_key is not None:
+                continue
+            key = Customer.normalize_phone(phone_number)
+            if key in canonical:
+                duplicates[customer_id] = canonical[key]
+            else:
+                canonical[key] = customer_id
+                unkeyed.append(Customer(id=customer_id, phone_key=key))
+        
+        rentals = 0
+        duplicate_ids = list(duplicates)
+        for start in range(0, len(duplicate_ids), batch_size):
+            batch = duplicate_ids[start:start + batch_size]
+            customer = Case(
+                *[When(customer_id=duplicate_id, then=Value(duplicates[duplicate_id])) for duplicate_id in batch],
+                output_field=IntegerField()
+            )
+            with transaction.atomic():
+                rentals += Rental.objects.filter(customer_id__in=batch).update(customer_id=customer)
+                Customer.objects.filter(id__in=batch).delete()
+        
+        Customer.objects.bulk_update(unkeyed, ['phone_key'], batch_size=batch_size)
+        return {'merged': len(duplicates), 'rentals': rentals, 'keyed': len(unkeyed)}
@@ -2,9 +2,15 @@
 Employee Repository - Abstracts employee-related database operations
 """
 
+from datetime import datetime
 from typing import List, Optional
+from django.core.cache import cache
+from pos.config import SystemConfig
 from pos.models import Employee, EmployeeLog
-from datetime import datetime
+from django.utils import timezone
+from .audit_log import audit_log
+
+EMPLOYEE_CACHE_KEY = 'pos:employee:%s'
 
 
 class EmployeeRepository:
@@ -18,6 +24,29 @@ class EmployeeRepository:
         except Employee.DoesNotExist:
             return None
     
+    @staticmethod
+    def get_cached(username: str) -> Optional[Employee]:
+        """
+        Get employee by username through the cache
+        The cache is shared by the workers (see CACHES), so invalidate_cached
+        reaches all of them; EMPLOYEE_CACHE_TTL_SECONDS bounds staleness from
+        changes made outside the app.
+        """
+        if not username:
+            return None
+        key = EMPLOYEE_CACHE_KEY % username
+        employee = cache.get(key)
+        if employee is None:
+            employee = EmployeeRepository.get_by_username(username)
+            if employee is not None:
+                cache.set(key, employee, SystemConfig.get_employee_cache_ttl_seconds())
+        return employee
+    
+    @staticmethod
+    def invalidate_cached(username: str):
+        """Drop the cached employee after it changes"""
+        cache.delete(EMPLOYEE_CACHE_KEY % username)
+    
     @staticmethod
     def authenticate(username: str, password: str) -> Optional[Employee]:
         """Authenticate employee"""
@@ -46,12 +75,15 @@ class EmployeeRepository:
     
     @staticmethod
     def log_activity(employee: Employee, action: str) -> EmployeeLog:
-        """Log employee activity"""
-        return EmployeeLog.objects.create(
-            employee=employee,
-            action=action,
-            timestamp=datetime.now()
-        )
+        """
+        Log employee activity
+        The row is written by the audit log. Unbuffered (the default) the
+        returned entry is saved; buffered it has no pk until a later batch
+        or the flush at exit writes it, though its timestamp is taken now.
+        """
+        entry = EmployeeLog(employee=employee, action=action, timestamp=timezone.now())
+        audit_log.write(entry)
+        return entry
     
     @staticmethod
     def get_all() -> List[Employee]:
@@ -64,9 +96,30 @@ class EmployeeRepository:
         return list(Employee.objects.filter(position=position))
     
     @staticmethod
-    def get_activity_logs(employee: Employee = None) -> List[EmployeeLog]:
-        """Get activity logs"""
+    def get_activity_logs(employee: Employee = None, since: datetime = None,
+                          until: datetime = None) -> List[EmployeeLog]:
+        """
+        Get activity logs with since <= timestamp < until, newest first
+        Includes entries still waiting to be flushed, and with segment storage
+        the entries not compacted into the table yet.
+        """
+        audit_log.flush()
+        logs = EmployeeLog.objects.select_related('employee')
         if employee:
-            return list(EmployeeLog.objects.filter(employee=employee))
-        return list(EmployeeLog.objects.all())
+            logs = logs.filter(employee=employee)
+        if since:
+            logs = logs.filter(timestamp__gte=since)
+        if until:
+            logs = logs.filter(timestamp__lt=until)
+        logs = list(logs)
+        
+        if audit_log.segments is not None:
+            pending = audit_log.segments.read(employee.pk if employee else None, since, until)
+            employees = Employee.objects.in_bulk({log.employee_id for log in pending})
+            for log in pending:
+                if log.employee_id in employees:
+                    log.employee = employees[log.employee_id]
+                    logs.append(log)
+            logs.sort(key=lambda log: log.timestamp, reverse=True)
+        return logs
 
@@ -0,0 +1,46 @@
+"""
+Import Checkpoint Repository - Abstracts legacy import progress tracking
+"""
+
+import os
+from typing import Iterable, Optional, Tuple
+from pos.models import ImportCheckpoint
+
+
+class ImportCheckpointRepository:
+    """Repository for ImportCheckpoint model operations"""
+    
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.abspath(file_path)
+    
+    @staticmethod
+    def get_position(file_path: str) -> Tuple[int, int]:
+        """(byte_offset, row_count) to resume a file from; (0, 0) if never imported"""
+        checkpoint = ImportCheckpoint.objects.filter(
+            file_path=ImportCheckpointRepository._key(file_path)
+        ).values_list('byte_offset', 'row_count').first()
+        return checkpoint or (0, 0)
+    
+    @staticmethod
+    def get_checkpoint(file_path: str) -> Optional[Tuple[int, int, Optional[int]]]:
+        """(byte_offset, row_count, fingerprint) of file_path; None if never imported"""
+        return ImportCheckpoint.objects.filter(
+            file_path=ImportCheckpointRepository._key(file_path)
+        ).values_list('byte_offset', 'row_count', 'fingerprint').first()
+    
+    @staticmethod
+    def save(file_path: str, byte_offset: int, row_count: int, fingerprint: Optional[int] = None):
+        """Record progress; call inside the transaction that imported the rows"""
+        ImportCheckpoint.objects.update_or_create(
+            file_path=ImportCheckpointRepository._key(file_path),
+            defaults={'byte_offset': byte_offset, 'row_count': row_count, 'fingerprint': fingerprint}
+        )
+    
+    @staticmethod
+    def clear(file_paths: Iterable[str]) -> int:
+        """Forget progress so the files are imported from the start again"""
+        deleted, _ = ImportCheckpoint.objects.filter(
+            file_path__in=[ImportCheckpointRepository._key(path) for path in file_paths]
+        ).delete()
+        return deleted
@@ -2,9 +2,17 @@
 Item Repository - Abstracts item-related database operations
 """
 
-from typing import List, Optional
-from django.db.models import Q
+from typing import Dict, Iterable, List, Optional
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
 from pos.models import Item
+from pos.repositories import item_search
+from pos.repositories.catalog_cache import catalog_cache
+from pos.repositories.pagination import KeysetPage, keyset_page
+
+# Columns served from the catalog cache, in model field order
+CATALOG_FIELDS = ('id', 'item_id', 'name', 'price', 'item_type')
 
 
 class ItemRepository:
@@ -12,41 +20,107 @@ class ItemRepository:
     
     @staticmethod
     def get_by_id(item_id: int) -> Optional[Item]:
-        """Get item by item_id"""
+        """Get item by item_id, with its stock"""
         try:
-            return Item.objects.get(item_id=item_id)
+            item = Item.objects.get(item_id=item_id)
         except Item.DoesNotExist:
             return None
+        catalog_cache.put(item_id, tuple(getattr(item, field) for field in CATALOG_FIELDS))
+        return item
+    
+    @staticmethod
+    def get_cached(item_id: int) -> Optional[Item]:
+        """
+        Get item by item_id through the catalog cache, for paths that only
+        need its name, price and type. On a hit the other fields are
+        deferred: use get_by_id where stock is read.
+        """
+        values = catalog_cache.get(item_id)
+        if values is not None:
+            return Item.from_db(DEFAULT_DB_ALIAS, CATALOG_FIELDS, values)
+        return ItemRepository.get_by_id(item_id)
+    
+    @staticmethod
+    def invalidate(*item_ids: int):
+        """Drop items from the catalog cache after writes that bypass Item.save"""
+        catalog_cache.invalidate(*item_ids)
+    
+    @staticmethod
+    def get_cache_stats() -> Dict:
+        """Catalog cache hit/miss counters"""
+        return catalog_cache.stats()
+    
+    @staticmethod
+    def get_by_ids(item_ids: Iterable[int]) -> Dict[int, Item]:
+        """Get several items by item_id in one query, keyed by item_id"""
+        return Item.objects.in_bulk(list(item_ids), field_name='item_id')
     
     @staticmethod
     def get_all() -> List[Item]:
         """Get all items"""
         return list(Item.objects.all())
     
+    @staticmethod
+    def get_page(cursor: str = None, limit: int = 50) -> KeysetPage:
+        """Get one page of items in item_id order"""
+        return keyset_page(Item.objects.all(), ('item_id',), cursor, limit)
+    
     @staticmethod
     def get_available_for_sale() -> List[Item]:
-        """Get items available for sale"""
+        """
+        Get items available for sale
+        available_sale is the sale stock minus what open carts have reserved.
+        """
+        from pos.repositories.reservation_repository import ReservationRepository
+        
         return list(Item.objects.filter(
-            Q(item_type='Sale') | Q(item_type='Both'),
-            stock_sale__gt=0
-        ))
+            Q(item_type='Sale') | Q(item_type='Both')
+        ).annotate(
+            available_sale=F('stock_sale') - ReservationRepository.reserved_subquery('sale')
+        ).filter(available_sale__gt=0))
     
     @staticmethod
     def get_available_for_rental() -> List[Item]:
-        """Get items available for rental"""
+        """
+        Get items available for rental
+        Rentals take their stock at once, so rental stock is never reserved.
+        """
         return list(Item.objects.filter(
             Q(item_type='Rental') | Q(item_type='Both'),
             stock_rental__gt=0
         ))
     
+    @staticmethod
+    def get_low_stock(threshold: int = None) -> List[Item]:
+        """
+        Get items whose sale or rental stock is below a threshold
+        Without a threshold each item's own reorder_threshold is used. Each
+        side is then a subquery that matches one partial low-stock index
+        exactly, so the database reads only the index entries of low items.
+        """
+        if threshold is not None:
+            return list(Item.objects.filter(
+                Q(stock_sale__lt=threshold) | Q(stock_rental__lt=threshold)
+            ))
+        
+        low_sale = Item.objects.filter(stock_sale__lt=F('reorder_threshold')).values('pk')
+        low_rental = Item.objects.filter(stock_rental__lt=F('reorder_threshold')).values('pk')
+        return list(Item.objects.filter(Q(pk__in=low_sale) | Q(pk__in=low_rental)))
+    
     @staticmethod
     def search_by_name(name: str) -> List[Item]:
         """Search items by name"""
         return list(Item.objects.filter(name__icontains=name))
     
+    @staticmethod
+    def search(query: str, limit: int = 20) -> List[Item]:
+        """Ranked prefix/fuzzy search over name and item_id (see item_search)"""
+        return item_search.search(query, limit)
+    
     @staticmethod
     def create(item_id: int, name: str, price: float, stock_sale: int = 0, 
-               stock_rental: int = 0, item_type: str = 'Both') -> Item:
+               stock_rental: int = 0, item_type: str = 'Both',
+               reorder_threshold: int = 10) -> Item:
         """Create a new item"""
         return Item.objects.create(
             item_id=item_id,
@@ -54,36 +128,85 @@ class ItemRepository:
             price=price,
             stock_sale=stock_sale,
             stock_rental=stock_rental,
-            item_type=item_type
+            item_type=item_type,
+            reorder_threshold=reorder_threshold
         )
     
     @staticmethod
     def update_stock_sale(item_id: int, quantity: int, decrease: bool = True) -> bool:
-        """Update sale stock"""
-        try:
-            item = Item.objects.get(item_id=item_id)
-            if decrease:
-                item.stock_sale = max(0, item.stock_sale - quantity)
-            else:
-                item.stock_sale += quantity
-            item.save()
-            return True
-        except Item.DoesNotExist:
-            return False
+        """
+        Update sale stock with a single conditional UPDATE
+        A decrease only succeeds if enough stock is left, so concurrent lanes
+        can never sell the same unit twice.
+        """
+        items = Item.objects.filter(item_id=item_id)
+        if decrease:
+            items = items.filter(stock_sale__gte=quantity)
+            change = F('stock_sale') - quantity
+        else:
+            change = F('stock_sale') + quantity
+        return items.update(stock_sale=change, updated_at=timezone.now()) == 1
     
     @staticmethod
     def update_stock_rental(item_id: int, quantity: int, decrease: bool = True) -> bool:
-        """Update rental stock"""
-        try:
-            item = Item.objects.get(item_id=item_id)
-            if decrease:
-                item.stock_rental = max(0, item.stock_rental - quantity)
-            else:
-                item.stock_rental += quantity
-            item.save()
-            return True
-        except Item.DoesNotExist:
-            return False
+        """Update rental stock with a single conditional UPDATE"""
+        items = Item.objects.filter(item_id=item_id)
+        if decrease:
+            items = items.filter(stock_rental__gte=quantity)
+            change = F('stock_rental') - quantity
+        else:
+            change = F('stock_rental') + quantity
+        return items.update(stock_rental=change, updated_at=timezone.now()) == 1
+    
+    @staticmethod
+    def decrement_stock_sale(quantities: Dict[int, int]) -> Dict[int, bool]:
+        """
+        Decrement sale stock for several items with one bulk UPDATE
+        Every line is conditional on the item being sellable and having enough
+        stock. Returns success per item_id; if any line fails, the whole batch
+        is rolled back.
+        """
+        if not quantities:
+            return {}
+        
+        quantity = Case(
+            *[When(item_id=item_id, then=Value(qty)) for item_id, qty in quantities.items()],
+            output_field=IntegerField()
+        )
+        sellable = Item.objects.filter(item_id__in=list(quantities), item_type__in=['Sale', 'Both'])
+        
+        with transaction.atomic():
+            updated = sellable.filter(stock_sale__gte=quantity).update(
+                stock_sale=F('stock_sale') - quantity,
+                updated_at=timezone.now()
+            )
+            if updated != len(quantities):
+                transaction.set_rollback(True)
+        
+        if updated == len(quantities):
+            return dict.fromkeys(quantities, True)
+        
+        # Rolled back; work out which lines were short for the caller
+        stock = dict(sellable.values_list('item_id', 'stock_sale'))
+        results = {item_id: stock.get(item_id, -1) >= qty for item_id, qty in quantities.items()}
+        if all(results.values()):
+            # Stock moved again since the UPDATE; the batch still failed as a whole
+            results = dict.fromkeys(quantities, False)
+        return results
+    
+    @staticmethod
+    def increment_stock_rental(quantities: Dict[int, int]) -> int:
+        """Put returned rental stock back for several items with one bulk UPDATE"""
+        if not quantities:
+            return 0
+        quantity = Case(
+            *[When(item_id=item_id, then=Value(qty)) for item_id, qty in quantities.items()],
+            output_field=IntegerField()
+        )
+        return Item.objects.filter(item_id__in=list(quantities)).update(
+            stock_rental=F('stock_rental') + quantity,
+            updated_at=timezone.now()
+        )
     
     @staticmethod
     def delete(item_id: int) -> bool:
@@ -0,0 +1,115 @@
+"""
+Item Search - Ranked prefix and fuzzy matching over item name and item_id
+Uses the SQLite FTS5 tables created by migration 0005. On other databases
+search falls back to a name icontains / item_id lookup, as fuzzy search does
+on SQLite older than 3.34 (no trigram tokenizer).
+"""
+
+import re
+from typing import List
+from django.db import connection
+from django.db.models import Q
+from pos.models import Item
+
+_WORD = re.compile(r'\w+')
+
+# Share of the query's trigrams a fuzzy match must contain
+FUZZY_MIN_OVERLAP = 0.5
+
+_trigram_tables = {}  # Database alias -> whether migration 0005 created items_trigram
+
+
+def _tokens(query: str) -> List[str]:
+    return [token.lower() for token in _WORD.findall(query)]
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _match(table: str, expression: str, limit: int) -> List[Item]:
+    """Items matching an FTS5 expression, best bm25 rank first"""
+    # Ranked and limited inside FTS5, so the best hits are the ones joined
+    return list(Item.objects.raw(
+        f"SELECT items.* FROM (SELECT rowid, bm25({table}) AS score FROM {table} WHERE {table} MATCH %s "
+        f"ORDER BY score LIMIT %s) AS hits JOIN items ON items.id = hits.rowid ORDER BY hits.score",
+        [expression, limit]
+    ))
+
+
+def has_trigram_index() -> bool:
+    """Whether items_trigram exists (SQLite 3.34+ when migration 0005 ran)"""
+    alias = connection.alias
+    if alias not in _trigram_tables:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_trigram'")
+            _trigram_tables[alias] = cursor.fetchone() is not None
+    return _trigram_tables[alias]
+
+
+def prefix_search(tokens: List[str], limit: int) -> List[Item]:
+    """
+    Items matching every token as a word of the name or the item_id
+    Only the last token may be incomplete, as it is while the cashier types;
+    whole-word terms are much cheaper for FTS5 than prefix terms.
+    """
+    *words, last = tokens
+    expression = ' AND '.join([f'"{word}"' for word in words] + [f'"{last}"*'])
+    return _match('items_fts', expression, limit)
+
+
+def fuzzy_search(tokens: List[str], limit: int) -> List[Item]:
+    """
+    Items whose name shares most of the query's trigrams
+    Catches substrings ("mmer") and small typos ("hamer" finds "Hammer").
+    """
+    wanted = set().union(*(_trigrams(token) for token in tokens))
+    if not wanted:
+        return []
+    seen = set()
+    
+    # Names containing every trigram (substring hits) first, then any of them
+    candidates = []
+    for operator, fetch in ((' AND ', limit), (' OR ', limit * 4)):
+        expression = operator.join(f'"{trigram}"' for trigram in sorted(wanted))
+        for item in _match('items_trigram', expression, fetch):
+            if item.pk not in seen:
+                seen.add(item.pk)
+                candidates.append(item)
+        if len(candidates) >= limit:
+            break
+    
+    matches = []
+    for item in candidates:
+        overlap = len(wanted & _trigrams(item.name.lower())) / len(wanted)
+        if overlap >= FUZZY_MIN_OVERLAP:
+            matches.append(item)
+    return matches[:limit]
+
+
+def fallback_search(query: str, limit: int) -> List[Item]:
+    """Unindexed search for databases without FTS5"""
+    condition = Q(name__icontains=query.strip())
+    if query.strip().isdigit():
+        condition |= Q(item_id=int(query))
+    return list(Item.objects.filter(condition).order_by('name')[:limit])
+
+
+def search(query: str, limit: int = 20) -> List[Item]:
+    """
+    Search items by name or item_id
+    Word/prefix matches are returned in bm25 order. Only when there are none
+    does the slower fuzzy trigram search run, to catch typos and substrings.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+    if connection.vendor != 'sqlite':
+        return fallback_search(query, limit)
+    
+    matches = prefix_search(tokens, limit)
+    if matches:
+        return matches
+    if not has_trigram_index():
+        return fallback_search(query, limit)
+    return fuzzy_search(tokens, limit)
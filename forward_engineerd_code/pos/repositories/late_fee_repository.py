@@ -0,0 +1,73 @@
+"""
+Late Fee Accrual Repository - Abstracts precomputed late fee operations
+"""
+
+from datetime import date
+from decimal import Decimal
+from itertools import islice, repeat
+from typing import Dict, Iterable, Optional
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from pos import pricing
+from pos.config import SystemConfig
+from pos.models import LateFeeAccrual, Rental
+
+
+class LateFeeAccrualRepository:
+    """Repository for LateFeeAccrual model operations"""
+    
+    @staticmethod
+    def refresh(as_of: date = None, batch_size: int = 5000) -> int:
+        """
+        Recompute the accruals of all overdue outstanding rentals in one pass
+        Overdue rentals are read as columns with their item price, batch_size
+        at a time, priced in integer cents and bulk inserted; the table is
+        replaced in a single transaction. Returns the number of accruals.
+        """
+        if as_of is None:
+            as_of = date.today()
+        rate = SystemConfig.get_late_fee_rate()
+        overdue = Rental.objects.filter(is_returned=False, due_date__lt=as_of).values_list(
+            'id', 'due_date', 'quantity', 'item__price'
+        ).iterator(chunk_size=batch_size)
+        
+        count = 0
+        with transaction.atomic():
+            LateFeeAccrual.objects.all().delete()
+            while True:
+                rows = list(islice(overdue, batch_size))
+                if not rows:
+                    break
+                rental_ids, due_dates, quantities, prices = zip(*rows)
+                days = pricing.days_late(due_dates, repeat(False), as_of)
+                fees = pricing.late_fees([pricing.to_cents(price) for price in prices], quantities, days, rate)
+                LateFeeAccrual.objects.bulk_create([
+                    LateFeeAccrual(rental_id=rental_id, days_late=days_late,
+                                   accrued_fee=pricing.from_cents(fee), as_of=as_of)
+                    for rental_id, days_late, fee in zip(rental_ids, days, fees)
+                ])
+                count += len(rows)
+        return count
+    
+    @staticmethod
+    def get_current(rental: Rental, as_of: date = None) -> Optional[LateFeeAccrual]:
+        """The rental's accrual if it was computed for as_of (default today)"""
+        accrual = getattr(rental, 'accrual', None)
+        if accrual is None or accrual.as_of != (as_of or date.today()):
+            return None
+        return accrual
+    
+    @staticmethod
+    def delete_for_rentals(rental_ids: Iterable[int]) -> int:
+        """Drop accruals of rentals that were returned"""
+        deleted, _ = LateFeeAccrual.objects.filter(rental_id__in=list(rental_ids)).delete()
+        return deleted
+    
+    @staticmethod
+    def get_summary() -> Dict:
+        """Overdue rental count and total accrued fees of the last refresh"""
+        summary = LateFeeAccrual.objects.aggregate(
+            rentals=Count('rental'), total=Sum('accrued_fee'), as_of=Max('as_of')
+        )
+        summary['total'] = summary['total'] or Decimal('0.00')
+        return summary
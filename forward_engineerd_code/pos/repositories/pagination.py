@@ -0,0 +1,97 @@
+"""
+Keyset (seek) pagination for repository list queries
+Pages are addressed by an opaque cursor holding the sort key of the last row
+shown, so fetching a page costs the same however deep into the table it is.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import List, Optional, Sequence
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+
+
+class KeysetPage:
+    """One page of rows plus the cursor of the page after it"""
+    
+    def __init__(self, items: List, next_cursor: Optional[str], cursor: Optional[str] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+    
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+    
+    @property
+    def is_first(self) -> bool:
+        return self.cursor is None
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode sort key values as an opaque URL-safe cursor"""
+    raw = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in values])
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[list]:
+    """Decode a cursor; returns None if it is malformed"""
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _seek_filter(fields: Sequence[str], values: Sequence, descending: bool) -> Q:
+    """Rows strictly after values in (fields) order, e.g. a > x OR (a = x AND b > y)"""
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for i, field in enumerate(fields):
+        step = Q(**{f'{field}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            step &= Q(**{prev_field: prev_value})
+        condition |= step
+    return condition
+
+
+def keyset_page(queryset: QuerySet, fields: Sequence[str], cursor: Optional[str] = None,
+                limit: int = 50, descending: bool = False) -> KeysetPage:
+    """
+    Fetch the page of queryset that follows cursor
+    fields must uniquely order the rows (end with a unique column).
+    """
+    model_meta = queryset.model._meta
+    prefix = '-' if descending else ''
+    queryset = queryset.order_by(*[f'{prefix}{field}' for field in fields])
+    
+    values = decode_cursor(cursor) if cursor else None
+    if values is not None and len(values) == len(fields):
+        try:
+            values = [model_meta.get_field(field).to_python(value)
+                      for field, value in zip(fields, values)]
+        except ValidationError:
+            values = None
+    else:
+        values = None
+    
+    # A malformed cursor falls back to the first page
+    if values is None:
+        cursor = None
+    else:
+        queryset = queryset.filter(_seek_filter(fields, values, descending))
+    
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, model_meta.get_field(f).attname) for f in fields])
+    return KeysetPage(rows, next_cursor, cursor)
@@ -2,24 +2,38 @@
 Rental Repository - Abstracts rental-related database operations
 """
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from datetime import date, timedelta
 from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Value, When
 from pos.models import Rental, Customer, Item, Employee
 from pos.config import SystemConfig
+from pos.repositories.pagination import KeysetPage, keyset_page
+from pos.repositories.late_fee_repository import LateFeeAccrualRepository
 
 
 class RentalRepository:
     """Repository for Rental model operations"""
     
+    @staticmethod
+    def _queryset():
+        """Rentals with the customer, item and late fee accrual their consumers render"""
+        return Rental.objects.select_related('customer', 'item', 'accrual')
+    
     @staticmethod
     def get_by_id(rental_id: int) -> Optional[Rental]:
         """Get rental by ID"""
         try:
-            return Rental.objects.get(id=rental_id)
+            return RentalRepository._queryset().get(id=rental_id)
         except Rental.DoesNotExist:
             return None
     
+    @staticmethod
+    def get_by_ids(rental_ids: Iterable[int]) -> List[Rental]:
+        """Get several rentals by ID in one query"""
+        return list(RentalRepository._queryset().filter(id__in=list(rental_ids)).order_by('id'))
+    
     @staticmethod
     def create(customer: Customer, item: Item, quantity: int, 
                rental_date: date = None) -> Rental:
@@ -40,7 +54,7 @@ class RentalRepository:
     @staticmethod
     def get_outstanding_by_customer(customer: Customer) -> List[Rental]:
         """Get outstanding rentals for a customer"""
-        return list(Rental.objects.filter(
+        return list(RentalRepository._queryset().filter(
             customer=customer,
             is_returned=False
         ))
@@ -48,26 +62,61 @@ class RentalRepository:
     @staticmethod
     def get_all_outstanding() -> List[Rental]:
         """Get all outstanding rentals"""
-        return list(Rental.objects.filter(is_returned=False))
+        return list(RentalRepository._queryset().filter(is_returned=False))
+    
+    @staticmethod
+    def get_outstanding_page(cursor: str = None, limit: int = 50) -> KeysetPage:
+        """Get one page of outstanding rentals, earliest due first"""
+        return keyset_page(RentalRepository._queryset().filter(is_returned=False), ('due_date', 'id'),
+                           cursor, limit)
     
     @staticmethod
     def get_overdue() -> List[Rental]:
         """Get all overdue rentals"""
-        return list(Rental.objects.filter(
+        return list(RentalRepository._queryset().filter(
             is_returned=False,
             due_date__lt=date.today()
         ))
     
     @staticmethod
-    def return_rental(rental: Rental, return_date: date = None) -> Rental:
-        """Mark rental as returned"""
+    def get_due_counts(start: date, end: date, as_of: date) -> Dict:
+        """
+        Outstanding rentals due per day from start to end, plus those overdue
+        (due before as_of), in one grouped query over the open rentals'
+        due-date index
+        """
+        counts = dict(Rental.objects.filter(is_returned=False, due_date__lte=end)
+                      .order_by().values('due_date').annotate(count=Count('id'))
+                      .values_list('due_date', 'count'))
+        days = []
+        day = start
+        while day <= end:
+            days.append((day, counts.get(day, 0)))
+            day += timedelta(days=1)
+        return {
+            'overdue': sum(count for due_date, count in counts.items() if due_date < as_of),
+            'days': days,
+        }
+    
+    @staticmethod
+    def get_due_between(start: date, end: date) -> List[Rental]:
+        """Outstanding rentals due from start to end, earliest due first"""
+        return list(RentalRepository._queryset().filter(
+            is_returned=False,
+            due_date__range=(start, end)
+        ).order_by('due_date', 'id'))
+    
+    @staticmethod
+    def return_rental(rental: Rental, return_date: date = None, late_fee: Decimal = None) -> Rental:
+        """Mark rental as returned, charging late_fee (computed if not given)"""
         if return_date is None:
             return_date = date.today()
         
         rental.is_returned = True
         rental.return_date = return_date
-        rental.late_fee = rental.calculate_late_fee()
+        rental.late_fee = rental.calculate_late_fee() if late_fee is None else late_fee
         rental.save()
+        LateFeeAccrualRepository.delete_for_rentals([rental.id])
         
         # Update inventory
         from pos.repositories.item_repository import ItemRepository
@@ -79,6 +128,46 @@ class RentalRepository:
         
         return rental
     
+    @staticmethod
+    def return_rentals(rentals: List[Rental], late_fees: Dict[int, Decimal], return_date: date = None) -> bool:
+        """
+        Mark several rentals as returned with one conditional bulk UPDATE
+        late_fees maps rental id to the fee charged. Fails (returning False,
+        with nothing written) unless every rental was still outstanding, so a
+        concurrent return can't be processed twice. Call inside a transaction.
+        """
+        if return_date is None:
+            return_date = date.today()
+        rental_ids = [rental.id for rental in rentals]
+        late_fee = Case(
+            *[When(id=rental_id, then=Value(late_fees[rental_id])) for rental_id in rental_ids],
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        )
+        with transaction.atomic():
+            updated = Rental.objects.filter(id__in=rental_ids, is_returned=False).update(
+                is_returned=True,
+                return_date=return_date,
+                late_fee=late_fee
+            )
+            if updated != len(rental_ids):
+                transaction.set_rollback(True)
+                return False
+            
+            LateFeeAccrualRepository.delete_for_rentals(rental_ids)
+            
+            # Update inventory
+            quantities = {}
+            for rental in rentals:
+                quantities[rental.item.item_id] = quantities.get(rental.item.item_id, 0) + rental.quantity
+            from pos.repositories.item_repository import ItemRepository
+            ItemRepository.increment_stock_rental(quantities)
+        
+        for rental in rentals:
+            rental.is_returned = True
+            rental.return_date = return_date
+            rental.late_fee = late_fees[rental.id]
+        return True
+    
     @staticmethod
     def calculate_late_fees(rental: Rental) -> Decimal:
         """Calculate late fees for a rental"""
@@ -87,10 +176,10 @@ class RentalRepository:
     @staticmethod
     def get_all() -> List[Rental]:
         """Get all rentals"""
-        return list(Rental.objects.all())
+        return list(RentalRepository._queryset())
     
     @staticmethod
     def get_by_customer(customer: Customer) -> List[Rental]:
         """Get all rentals for a customer"""
-        return list(Rental.objects.filter(customer=customer))
+        return list(RentalRepository._queryset().filter(customer=customer))
 
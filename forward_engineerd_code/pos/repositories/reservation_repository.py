@@ -0,0 +1,94 @@
+"""
+Reservation Repository - Abstracts stock reservation database operations
+"""
+
+from datetime import timedelta
+from typing import Dict, Iterable
+from django.db import transaction
+from django.db.models import IntegerField, OuterRef, QuerySet, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from pos.models import Item, StockReservation
+from pos.config import SystemConfig
+
+
+class ReservationRepository:
+    """Repository for StockReservation model operations"""
+    
+    @staticmethod
+    def _expiry():
+        return timezone.now() + timedelta(minutes=SystemConfig.get_reservation_ttl_minutes())
+    
+    @staticmethod
+    def active() -> QuerySet:
+        """Reservations that have not expired yet"""
+        return StockReservation.objects.filter(expires_at__gt=timezone.now())
+    
+    @staticmethod
+    def reserved_subquery(stock_type: str):
+        """Active reserved quantity per item, for annotating Item querysets"""
+        reserved = ReservationRepository.active().filter(
+            item=OuterRef('pk'),
+            stock_type=stock_type
+        ).values('item').annotate(total=Sum('quantity')).values('total')
+        return Coalesce(Subquery(reserved, output_field=IntegerField()), Value(0))
+    
+    @staticmethod
+    def get_available(item: Item, stock_type: str, exclude_holder: str = None) -> int:
+        """Stock left for an item once other holders' reservations are taken out"""
+        held = ReservationRepository.active().filter(item=item, stock_type=stock_type)
+        if exclude_holder:
+            held = held.exclude(holder=exclude_holder)
+        reserved = held.aggregate(total=Sum('quantity'))['total'] or 0
+        stock = item.stock_sale if stock_type == 'sale' else item.stock_rental
+        return stock - reserved
+    
+    @staticmethod
+    def hold(holder: str, item: Item, stock_type: str, quantity: int) -> bool:
+        """
+        Set the quantity of an item held by holder
+        Succeeds only if the stock not held by anyone else covers quantity.
+        """
+        with transaction.atomic():
+            # Lock the item row so concurrent holders of it are serialized
+            item = Item.objects.select_for_update().get(pk=item.pk)
+            if ReservationRepository.get_available(item, stock_type, exclude_holder=holder) < quantity:
+                return False
+            
+            StockReservation.objects.update_or_create(
+                holder=holder,
+                item=item,
+                stock_type=stock_type,
+                defaults={'quantity': quantity, 'expires_at': ReservationRepository._expiry()}
+            )
+        return True
+    
+    @staticmethod
+    def get_held(holder: str, stock_type: str) -> Dict[int, int]:
+        """Active quantities held by holder, keyed by item_id"""
+        return dict(ReservationRepository.active().filter(
+            holder=holder,
+            stock_type=stock_type
+        ).values_list('item__item_id', 'quantity'))
+    
+    @staticmethod
+    def touch(holder: str) -> int:
+        """Push back the expiry of everything held by holder"""
+        return StockReservation.objects.filter(holder=holder).update(
+            expires_at=ReservationRepository._expiry()
+        )
+    
+    @staticmethod
+    def release(holder: str, item_ids: Iterable[int] = None) -> int:
+        """Release reservations of holder (optionally only for some items)"""
+        reservations = StockReservation.objects.filter(holder=holder)
+        if item_ids is not None:
+            reservations = reservations.filter(item__item_id__in=list(item_ids))
+        deleted, _ = reservations.delete()
+        return deleted
+    
+    @staticmethod
+    def purge_expired() -> int:
+        """Delete reservations of abandoned carts"""
+        deleted, _ = StockReservation.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
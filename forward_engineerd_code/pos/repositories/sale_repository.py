@@ -2,15 +2,28 @@
 Sale Repository - Abstracts sale-related database operations
 """
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import islice
+from django.db import transaction
+from django.db.models import DecimalField, F, Prefetch, Sum, Value
+from django.db.models.functions import Coalesce
+from pos import pricing
 from pos.models import Sale, SaleItem, Item, Employee
+from pos.repositories.pagination import KeysetPage, keyset_page
+
+CENT = Decimal('0.01')
 
 
 class SaleRepository:
     """Repository for Sale model operations"""
     
+    @staticmethod
+    def _queryset():
+        """Sales with the employee and coupon their consumers render"""
+        return Sale.objects.select_related('employee', 'coupon')
+    
     @staticmethod
     def get_by_id(sale_id: int) -> Optional[Sale]:
         """Get sale by ID"""
@@ -19,6 +32,16 @@ class SaleRepository:
         except Sale.DoesNotExist:
             return None
     
+    @staticmethod
+    def get_with_items(sale_id: int) -> Optional[Sale]:
+        """Get sale by ID with its line items and their items loaded"""
+        try:
+            return SaleRepository._queryset().prefetch_related(
+                Prefetch('items', queryset=SaleItem.objects.select_related('item'))
+            ).get(id=sale_id)
+        except Sale.DoesNotExist:
+            return None
+    
     @staticmethod
     def create(employee: Employee = None, coupon=None) -> Sale:
         """Create a new sale"""
@@ -33,91 +56,247 @@ class SaleRepository:
         )
     
     @staticmethod
-    def add_item(sale: Sale, item: Item, quantity: int) -> SaleItem:
-        """Add item to sale"""
+    def create_with_items(lines: Iterable[Tuple[Item, int, Decimal]],
+                          totals: Dict[str, Decimal],
+                          employee: Employee = None, coupon=None) -> Sale:
+        """Create a sale and all of its line items in one pass"""
+        sale = Sale.objects.create(
+            transaction_time=datetime.now(),
+            employee=employee,
+            coupon=coupon,
+            **totals
+        )
+        SaleItem.objects.bulk_create([
+            SaleItem(
+                sale=sale,
+                item=item,
+                quantity=quantity,
+                unit_price=unit_price,
+                subtotal=unit_price * quantity
+            )
+            for item, quantity, unit_price in lines
+        ])
+        return sale
+    
+    @staticmethod
+    def add_item(sale: Sale, item: Item, quantity: int, tax_rate: float = 1.06) -> SaleItem:
+        """Add item to sale and move the running totals by the line delta"""
         unit_price = item.price
         subtotal = unit_price * quantity
         
-        sale_item, created = SaleItem.objects.get_or_create(
-            sale=sale,
-            item=item,
-            defaults={
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'subtotal': subtotal
-            }
-        )
-        
-        if not created:
-            sale_item.quantity += quantity
-            sale_item.subtotal = sale_item.unit_price * sale_item.quantity
-            sale_item.save()
-        
+        # The line and the totals move together or not at all
+        with transaction.atomic():
+            sale_item, created = SaleItem.objects.get_or_create(
+                sale=sale,
+                item=item,
+                defaults={
+                    'quantity': quantity,
+                    'unit_price': unit_price,
+                    'subtotal': subtotal
+                }
+            )
+            
+            if created:
+                delta = sale_item.subtotal
+            else:
+                # In the database, so concurrent edits of the line add up
+                SaleItem.objects.filter(pk=sale_item.pk).update(
+                    quantity=F('quantity') + quantity,
+                    subtotal=F('subtotal') + sale_item.unit_price * quantity
+                )
+                sale_item.refresh_from_db(fields=['quantity', 'subtotal'])
+                delta = sale_item.unit_price * quantity
+            
+            SaleRepository.apply_subtotal_delta(sale, delta, tax_rate)
         return sale_item
     
     @staticmethod
-    def remove_item(sale: Sale, item: Item) -> bool:
-        """Remove item from sale"""
-        try:
-            sale_item = SaleItem.objects.get(sale=sale, item=item)
-            sale_item.delete()
-            return True
-        except SaleItem.DoesNotExist:
-            return False
+    def remove_item(sale: Sale, item: Item, tax_rate: float = 1.06) -> bool:
+        """Remove item from sale and take its line off the running totals"""
+        with transaction.atomic():
+            try:
+                sale_item = SaleItem.objects.get(sale=sale, item=item)
+            except SaleItem.DoesNotExist:
+                return False
+            
+            deleted, _ = SaleItem.objects.filter(pk=sale_item.pk).delete()
+            if not deleted:
+                return False  # Removed concurrently; its delta was already applied
+            SaleRepository.apply_subtotal_delta(sale, -sale_item.subtotal, tax_rate)
+        return True
+    
+    @staticmethod
+    def get_discount_rate(sale: Sale) -> Decimal:
+        """Discount rate of the sale's coupon (1.00 when there is none)"""
+        if sale.coupon and sale.coupon.is_active:
+            return sale.coupon.get_discount_rate()
+        return Decimal('1.00')
+    
+    @staticmethod
+    def apply_subtotal_delta(sale: Sale, delta: Decimal, tax_rate: float = 1.06) -> Sale:
+        """
+        Move the stored subtotal by delta and re-derive discount, tax and total
+        The subtotal is moved with an UPDATE ... SET subtotal = subtotal + delta,
+        which holds the row until commit, so concurrent line edits never lose
+        each other's deltas.
+        """
+        with transaction.atomic():
+            Sale.objects.filter(pk=sale.pk).update(subtotal=F('subtotal') + delta)
+            sale.refresh_from_db(fields=['subtotal'])
+            return SaleRepository.refresh_totals(sale, tax_rate)
+    
+    @staticmethod
+    def refresh_totals(sale: Sale, tax_rate: float = 1.06) -> Sale:
+        """Re-derive discount, tax and total from the stored subtotal"""
+        totals = SaleRepository.compute_totals(
+            sale.subtotal, tax_rate, SaleRepository.get_discount_rate(sale)
+        )
+        for field, value in totals.items():
+            setattr(sale, field, value)
+        sale.save(update_fields=list(totals.keys()))
+        return sale
+    
+    @staticmethod
+    def compute_totals(subtotal: Decimal, tax_rate: float = 1.06,
+                       discount_rate: float = 1.0) -> Dict[str, Decimal]:
+        """Derive discount, tax and total from a subtotal"""
+        subtotal = Decimal(str(subtotal))
+        tax_rate = Decimal(str(tax_rate))
+        discount_rate = Decimal(str(discount_rate))
+        
+        discount_amount = (subtotal * (1 - discount_rate)).quantize(CENT, ROUND_HALF_UP)
+        discounted_subtotal = subtotal - discount_amount
+        tax_amount = (discounted_subtotal * (tax_rate - 1)).quantize(CENT, ROUND_HALF_UP)
+        
+        return {
+            'subtotal': subtotal,
+            'discount_amount': discount_amount,
+            'tax_amount': tax_amount,
+            'total_amount': discounted_subtotal + tax_amount,
+        }
     
     @staticmethod
     def calculate_total(sale: Sale, tax_rate: float = 1.06, discount_rate: float = 1.0) -> Sale:
-        """Calculate and update sale total"""
-        subtotal = sum(item.subtotal for item in sale.items.all())
+        """Recalculate sale total from scratch by summing every line"""
+        subtotal = sum((item.subtotal for item in sale.items.all()), Decimal('0.00'))
         
         # Apply discount if coupon exists
         if sale.coupon and sale.coupon.is_active:
             discount_rate = sale.coupon.get_discount_rate()
         
-        discount_amount = subtotal * (1 - discount_rate)
-        discounted_subtotal = subtotal - discount_amount
-        tax_amount = discounted_subtotal * (tax_rate - 1)
-        total_amount = discounted_subtotal + tax_amount
-        
-        sale.subtotal = subtotal
-        sale.discount_amount = discount_amount
-        sale.tax_amount = tax_amount
-        sale.total_amount = total_amount
+        totals = SaleRepository.compute_totals(subtotal, tax_rate, discount_rate)
+        for field, value in totals.items():
+            setattr(sale, field, value)
         sale.save()
         
         return sale
     
     @staticmethod
-    def finalize(sale: Sale) -> bool:
-        """Finalize sale and update inventory"""
+    def recalculate_totals(sales=None, tax_rate: float = 1.06, batch_size: int = 5000) -> int:
+        """
+        Recalculate many sales' totals from their line items in bulk
+        Line sums and coupon rates are read as columns, batch_size sales at a
+        time, priced in integer cents and written back with bulk_update. The
+        results are the same as calculate_total's. Returns sales updated.
+        """
+        if sales is None:
+            sales = Sale.objects.all()
+        rows = sales.annotate(
+            line_total=Coalesce(Sum('items__subtotal'), Value(Decimal('0.00')),
+                                output_field=DecimalField())
+        ).order_by('id').values_list(
+            'id', 'line_total', 'coupon__discount_percentage', 'coupon__is_active'
+        ).iterator(chunk_size=batch_size)
+        
+        fields = ['subtotal', 'discount_amount', 'tax_amount', 'total_amount']
+        count = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            sale_ids, line_totals, percentages, active = zip(*batch)
+            discount_rates = [
+                Decimal('1.00') - percentage / Decimal('100') if is_active else Decimal('1.00')
+                for percentage, is_active in zip(percentages, active)
+            ]
+            totals = pricing.sale_totals([pricing.to_cents(total) for total in line_totals],
+                                         discount_rates, tax_rate)
+            Sale.objects.bulk_update([
+                Sale(id=sale_id, **{field: pricing.from_cents(totals[field][index]) for field in fields})
+                for index, sale_id in enumerate(sale_ids)
+            ], fields)
+            count += len(batch)
+        return count
+    
+    @staticmethod
+    def verify_totals(sales=None, tax_rate: float = 1.06) -> List[Dict]:
+        """
+        Check stored sale totals against their line items
+        Returns one entry per inconsistent sale with the stored and expected values.
+        """
+        if sales is None:
+            sales = Sale.objects.all()
+        sales = sales.select_related('coupon').annotate(
+            line_total=Coalesce(Sum('items__subtotal'), Value(Decimal('0.00')),
+                                output_field=DecimalField())
+        ).order_by('id')
+        
+        mismatches = []
+        for sale in sales.iterator():
+            expected = SaleRepository.compute_totals(
+                sale.line_total, tax_rate, SaleRepository.get_discount_rate(sale)
+            )
+            stored = {field: Decimal(str(getattr(sale, field))) for field in expected}
+            if stored != expected:
+                mismatches.append({'sale': sale, 'stored': stored, 'expected': expected})
+        return mismatches
+    
+    @staticmethod
+    def finalize(sale: Sale, tax_rate: float = 1.06) -> Dict[int, bool]:
+        """
+        Finalize sale: update inventory and log the sale in one transaction
+        The running totals are checked against the lines first and a drifted
+        subtotal is moved back by its difference. Returns stock decrement
+        success per item_id; nothing is written unless every line can be
+        fulfilled.
+        """
         from pos.repositories.item_repository import ItemRepository
+        from pos.repositories.employee_repository import EmployeeRepository
         
-        try:
-            # Update inventory for each item
-            for sale_item in sale.items.all():
-                ItemRepository.update_stock_sale(
-                    sale_item.item.item_id,
-                    sale_item.quantity,
-                    decrease=True
+        with transaction.atomic():
+            for mismatch in SaleRepository.verify_totals(Sale.objects.filter(pk=sale.pk), tax_rate):
+                SaleRepository.apply_subtotal_delta(
+                    sale, mismatch['expected']['subtotal'] - mismatch['stored']['subtotal'], tax_rate
                 )
-            return True
-        except Exception:
-            return False
+            sale_items = sale.items.select_related('item')
+            results = ItemRepository.decrement_stock_sale(
+                {sale_item.item.item_id: sale_item.quantity for sale_item in sale_items}
+            )
+            if results and all(results.values()) and sale.employee:
+                EmployeeRepository.log_activity(sale.employee, 'sale_completed')
+        
+        return results
     
     @staticmethod
     def get_all() -> List[Sale]:
         """Get all sales"""
-        return list(Sale.objects.all())
+        return list(SaleRepository._queryset())
+    
+    @staticmethod
+    def get_page(cursor: str = None, limit: int = 50) -> KeysetPage:
+        """Get one page of sales, newest first"""
+        return keyset_page(SaleRepository._queryset(), ('transaction_time', 'id'), cursor, limit,
+                           descending=True)
     
     @staticmethod
     def get_by_employee(employee: Employee) -> List[Sale]:
         """Get sales by employee"""
-        return list(Sale.objects.filter(employee=employee))
+        return list(SaleRepository._queryset().filter(employee=employee))
     
     @staticmethod
     def get_by_date_range(start_date: datetime, end_date: datetime) -> List[Sale]:
         """Get sales within date range"""
-        return list(Sale.objects.filter(
+        return list(SaleRepository._queryset().filter(
             transaction_time__gte=start_date,
             transaction_time__lte=end_date
         ))
@@ -2,7 +2,7 @@
 Customer Service - Business logic for customer management
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pos.models import Customer, Rental
 from pos.repositories.customer_repository import CustomerRepository
 from pos.repositories.rental_repository import RentalRepository
@@ -48,4 +48,7 @@ class CustomerService:
         if not customer:
             return []
         return self.rental_repo.get_outstanding_by_customer(customer)
-
+    
+    def merge_duplicate_customers(self, batch_size: int = 1000) -> Dict[str, int]:
+        """Fold customers entered with differently formatted phone numbers together"""
+        return self.customer_repo.merge_duplicates(batch_size)
@@ -2,6 +2,7 @@
 Employee Service - Business logic for employee management and authentication
 """
 
+from datetime import datetime
 from typing import List, Optional, Dict
 from pos.models import Employee, EmployeeLog
 from pos.repositories.employee_repository import EmployeeRepository
@@ -80,9 +81,10 @@ class EmployeeService:
         """Get employees by position"""
         return self.employee_repo.get_by_position(position)
     
-    def get_activity_logs(self, employee: Employee = None) -> List[EmployeeLog]:
-        """Get activity logs"""
-        return self.employee_repo.get_activity_logs(employee)
+    def get_activity_logs(self, employee: Employee = None, since: datetime = None,
+                          until: datetime = None) -> List[EmployeeLog]:
+        """Get activity logs, optionally limited to a time range"""
+        return self.employee_repo.get_activity_logs(employee, since, until)
     
     def is_admin(self, employee: Employee) -> bool:
         """Check if employee is admin"""
@@ -6,6 +6,7 @@ from typing import List, Optional, Dict
 from decimal import Decimal
 from pos.models import Item
 from pos.repositories.item_repository import ItemRepository
+from pos.repositories.pagination import KeysetPage
 from pos.config import SystemConfig
 
 
@@ -23,9 +24,13 @@ class InventoryService:
         """Get all items"""
         return self.item_repo.get_all()
     
-    def search_items(self, query: str) -> List[Item]:
-        """Search items by name"""
-        return self.item_repo.search_by_name(query)
+    def get_items_page(self, cursor: str = None) -> KeysetPage:
+        """Get one page of items"""
+        return self.item_repo.get_page(cursor, SystemConfig.get_page_size())
+    
+    def search_items(self, query: str, limit: int = 20) -> List[Item]:
+        """Search items by name or item_id, best matches first"""
+        return self.item_repo.search(query, limit)
     
     def get_available_for_sale(self) -> List[Item]:
         """Get items available for sale"""
@@ -37,7 +42,7 @@ class InventoryService:
     
     def create_item(self, item_id: int, name: str, price: float, 
                    stock_sale: int = 0, stock_rental: int = 0, 
-                   item_type: str = 'Both') -> Item:
+                   item_type: str = 'Both', reorder_threshold: int = 10) -> Item:
         """Create a new item with validation"""
         # Validation
         if price <= 0:
@@ -46,6 +51,8 @@ class InventoryService:
             raise ValueError("Stock cannot be negative")
         if item_type not in ['Sale', 'Rental', 'Both']:
             raise ValueError("Invalid item type")
+        if reorder_threshold < 0:
+            raise ValueError("Reorder threshold cannot be negative")
         
         # Check if item_id already exists
         if self.item_repo.get_by_id(item_id):
@@ -57,7 +64,8 @@ class InventoryService:
             price=price,
             stock_sale=stock_sale,
             stock_rental=stock_rental,
-            item_type=item_type
+            item_type=item_type,
+            reorder_threshold=reorder_threshold
         )
     
     def update_item_stock(self, item_id: int, stock_type: str, 
@@ -92,13 +100,15 @@ class InventoryService:
         
         return False
     
-    def get_low_stock_items(self, threshold: int = 10) -> List[Item]:
-        """Get items with low stock"""
-        items = self.item_repo.get_all()
-        return [item for item in items 
-                if item.stock_sale < threshold or item.stock_rental < threshold]
+    def get_low_stock_items(self, threshold: int = None) -> List[Item]:
+        """Get items with low stock (per-item reorder thresholds by default)"""
+        return self.item_repo.get_low_stock(threshold)
     
     def delete_item(self, item_id: int) -> bool:
         """Delete an item"""
         return self.item_repo.delete(item_id)
+    
+    def get_catalog_cache_stats(self) -> Dict:
+        """Catalog cache hit/miss counters"""
+        return self.item_repo.get_cache_stats()
 
@@ -5,11 +5,16 @@ Rental Service - Business logic for rental management
 from typing import List, Optional, Dict
 from datetime import date, timedelta
 from decimal import Decimal
+from itertools import repeat
+from django.db import transaction
+from pos import pricing
 from pos.models import Rental, Customer, Item, ReturnTransaction, ReturnItem
 from pos.repositories.rental_repository import RentalRepository
 from pos.repositories.customer_repository import CustomerRepository
 from pos.repositories.item_repository import ItemRepository
 from pos.repositories.employee_repository import EmployeeRepository
+from pos.repositories.late_fee_repository import LateFeeAccrualRepository
+from pos.repositories.pagination import KeysetPage
 from pos.config import SystemConfig
 
 
@@ -21,6 +26,7 @@ class RentalService:
         self.customer_repo = CustomerRepository()
         self.item_repo = ItemRepository()
         self.employee_repo = EmployeeRepository()
+        self.late_fee_repo = LateFeeAccrualRepository()
     
     def create_rental(self, phone_number: str, item_id: int, 
                      quantity: int, employee=None) -> Dict:
@@ -28,23 +34,25 @@ class RentalService:
         # Get or create customer
         customer, created = self.customer_repo.get_or_create(phone_number)
         
-        # Get item
-        item = self.item_repo.get_by_id(item_id)
+        # Get item; its stock is taken by a conditional UPDATE, not read
+        item = self.item_repo.get_cached(item_id)
         if not item:
             return {'success': False, 'message': 'Item not found'}
         
-        # Check availability
-        if not item.is_available_for_rental(quantity):
-            return {
-                'success': False,
-                'message': f'Insufficient rental stock. Available: {item.stock_rental}'
-            }
-        
-        # Create rental
-        rental = self.rental_repo.create(customer, item, quantity)
+        if item.item_type not in ['Rental', 'Both']:
+            return {'success': False, 'message': 'Item is not available for rental'}
         
-        # Update inventory
-        self.item_repo.update_stock_rental(item_id, quantity, decrease=True)
+        with transaction.atomic():
+            # Take the stock first; the conditional UPDATE fails instead of overbooking
+            if not self.item_repo.update_stock_rental(item_id, quantity, decrease=True):
+                item.refresh_from_db(fields=['stock_rental'])
+                return {
+                    'success': False,
+                    'message': f'Insufficient rental stock. Available: {item.stock_rental}'
+                }
+            
+            # Create rental
+            rental = self.rental_repo.create(customer, item, quantity)
         
         # Log activity
         if employee:
@@ -65,59 +73,145 @@ class RentalService:
     
     def process_return(self, rental_id: int, employee=None) -> Dict:
         """Process rental return with late fee calculation"""
-        rental = self.rental_repo.get_by_id(rental_id)
-        if not rental:
+        result = self.process_returns([rental_id], employee)
+        if result['success']:
+            rental = result['rentals'][0]
+            result.update(rental=rental, late_fee=rental.late_fee, days_late=result['days_late'][rental.id],
+                          message='Return processed successfully')
+        return result
+    
+    def process_returns(self, rental_ids: List[int], employee=None) -> Dict:
+        """
+        Return several rentals at once under one return transaction
+        The rentals are marked returned, their stock put back, the return and
+        its items recorded and the activity logged in a single database
+        transaction, with a fixed number of queries however many rentals.
+        """
+        rental_ids = list(dict.fromkeys(rental_ids))
+        if not rental_ids:
+            return {'success': False, 'message': 'No rentals selected'}
+        
+        rentals = self.rental_repo.get_by_ids(rental_ids)
+        if len(rentals) != len(rental_ids):
             return {'success': False, 'message': 'Rental not found'}
         
-        if rental.is_returned:
+        if any(rental.is_returned for rental in rentals):
             return {'success': False, 'message': 'Rental already returned'}
         
-        # Calculate late fee
-        days_late = rental.calculate_days_late()
-        late_fee = rental.calculate_late_fee()
-        
-        # Mark as returned
-        self.rental_repo.return_rental(rental)
+        days_late, late_fees = self._late_fees(rentals)
+        late_fee_total = sum(late_fees.values(), Decimal('0.00'))
         
-        # Create return transaction
-        return_transaction = ReturnTransaction.objects.create(
-            transaction_time=date.today(),
-            total_refund=Decimal('0.00'),  # No refund for rentals
-            late_fee_total=late_fee,
-            employee=employee
-        )
-        
-        # Create return item
-        ReturnItem.objects.create(
-            return_transaction=return_transaction,
-            rental=rental,
-            item=rental.item,
-            quantity=rental.quantity,
-            days_late=days_late,
-            late_fee=late_fee
-        )
-        
-        # Log activity
-        if employee:
-            self.employee_repo.log_activity(employee, 'rental_returned')
+        with transaction.atomic():
+            if not self.rental_repo.return_rentals(rentals, late_fees):
+                return {'success': False, 'message': 'Rental already returned'}
+            
+            # Create return transaction
+            return_transaction = ReturnTransaction.objects.create(
+                transaction_time=date.today(),
+                total_refund=Decimal('0.00'),  # No refund for rentals
+                late_fee_total=late_fee_total,
+                employee=employee
+            )
+            
+            # Create return items
+            ReturnItem.objects.bulk_create([
+                ReturnItem(
+                    return_transaction=return_transaction,
+                    rental=rental,
+                    item=rental.item,
+                    quantity=rental.quantity,
+                    days_late=days_late[rental.id],
+                    late_fee=late_fees[rental.id]
+                )
+                for rental in rentals
+            ])
+            
+            # Log activity
+            if employee:
+                self.employee_repo.log_activity(employee, 'rental_returned')
         
         return {
             'success': True,
-            'rental': rental,
+            'rentals': rentals,
             'return_transaction': return_transaction,
-            'late_fee': late_fee,
+            'late_fee_total': late_fee_total,
             'days_late': days_late,
-            'message': 'Return processed successfully'
+            'message': f'{len(rentals)} rental(s) returned successfully'
         }
     
+    def _late_fees(self, rentals: List[Rental]):
+        """
+        Days late and late fee per rental id
+        Today's accrual is charged if the nightly refresh computed one; the
+        rest are priced together in integer cents.
+        """
+        days_late, late_fees = {}, {}
+        unaccrued = []
+        for rental in rentals:
+            accrual = self.late_fee_repo.get_current(rental)
+            if accrual:
+                days_late[rental.id], late_fees[rental.id] = accrual.days_late, accrual.accrued_fee
+            else:
+                unaccrued.append(rental)
+        
+        if unaccrued:
+            days = pricing.days_late([rental.due_date for rental in unaccrued], repeat(False), date.today())
+            fees = pricing.late_fees([pricing.to_cents(rental.item.price) for rental in unaccrued],
+                                     [rental.quantity for rental in unaccrued], days,
+                                     SystemConfig.get_late_fee_rate())
+            for rental, rental_days, fee in zip(unaccrued, days, fees):
+                days_late[rental.id], late_fees[rental.id] = rental_days, pricing.from_cents(fee)
+        return days_late, late_fees
+    
     def get_overdue_rentals(self) -> List[Rental]:
         """Get all overdue rentals"""
         return self.rental_repo.get_overdue()
     
+    def refresh_late_fees(self, as_of: date = None) -> int:
+        """Recompute accrued late fees of all overdue rentals"""
+        return self.late_fee_repo.refresh(as_of)
+    
+    def get_late_fee_summary(self) -> Dict:
+        """Overdue rentals and total accrued late fees"""
+        return self.late_fee_repo.get_summary()
+    
+    def get_due_calendar(self, start: date = None, weeks: int = 4, as_of: date = None) -> Dict:
+        """
+        Due-date heatmap of outstanding rentals: weeks rows of seven days from
+        the Monday of start's week, each with its count and a 0-4 intensity.
+        Overdue counts everything due before as_of (default: today).
+        """
+        as_of = as_of or date.today()
+        start = start or as_of
+        first = start - timedelta(days=start.weekday())
+        counts = self.rental_repo.get_due_counts(first, first + timedelta(days=7 * weeks - 1), as_of)
+        busiest = max((count for _, count in counts['days']), default=0)
+        days = [
+            {
+                'date': day,
+                'count': count,
+                'level': -(-4 * count // busiest) if busiest else 0,  # ceil: any rental shows
+                'is_today': day == as_of,
+            }
+            for day, count in counts['days']
+        ]
+        return {
+            'overdue': counts['overdue'],
+            'weeks': [days[index:index + 7] for index in range(0, len(days), 7)],
+        }
+    
+    def get_rentals_due(self, start: date, end: date = None) -> List[Rental]:
+        """Outstanding rentals due from start to end (default: that day)"""
+        return self.rental_repo.get_due_between(start, end or start)
+    
     def get_all_outstanding_rentals(self) -> List[Rental]:
         """Get all outstanding rentals"""
         return self.rental_repo.get_all_outstanding()
     
+    def get_outstanding_page(self, cursor: str = None) -> KeysetPage:
+        """Get one page of outstanding rentals, earliest due first"""
+        return self.rental_repo.get_outstanding_page(cursor, SystemConfig.get_page_size())
+    
     def get_rental(self, rental_id: int) -> Optional[Rental]:
         """Get rental by ID"""
         return self.rental_repo.get_by_id(rental_id)
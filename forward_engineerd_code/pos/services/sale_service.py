@@ -5,10 +5,14 @@ Sale Service - Business logic for sales processing
 from typing import List, Optional, Dict
 from decimal import Decimal
 from datetime import datetime
+from django.db import transaction
 from pos.models import Sale, SaleItem, Item, Employee, Coupon
+from pos.cart import Cart
 from pos.repositories.sale_repository import SaleRepository
 from pos.repositories.item_repository import ItemRepository
 from pos.repositories.employee_repository import EmployeeRepository
+from pos.repositories.reservation_repository import ReservationRepository
+from pos.repositories.pagination import KeysetPage
 from pos.config import SystemConfig
 
 
@@ -19,6 +23,7 @@ class SaleService:
         self.sale_repo = SaleRepository()
         self.item_repo = ItemRepository()
         self.employee_repo = EmployeeRepository()
+        self.reservation_repo = ReservationRepository()
     
     def create_sale(self, employee: Employee = None, coupon_code: str = None) -> Sale:
         """Create a new sale transaction"""
@@ -43,8 +48,7 @@ class SaleService:
                 'message': f'Insufficient stock. Available: {item.stock_sale}'
             }
         
-        sale_item = self.sale_repo.add_item(sale, item, quantity)
-        self.sale_repo.calculate_total(sale, SystemConfig.get_tax_rate())
+        sale_item = self.sale_repo.add_item(sale, item, quantity, SystemConfig.get_tax_rate())
         
         return {
             'success': True,
@@ -54,58 +58,134 @@ class SaleService:
     
     def remove_item_from_sale(self, sale: Sale, item_id: int) -> bool:
         """Remove item from sale"""
-        item = self.item_repo.get_by_id(item_id)
+        item = self.item_repo.get_cached(item_id)
         if not item:
             return False
         
-        success = self.sale_repo.remove_item(sale, item)
-        if success:
-            self.sale_repo.calculate_total(sale, SystemConfig.get_tax_rate())
-        return success
+        return self.sale_repo.remove_item(sale, item, SystemConfig.get_tax_rate())
     
     def apply_coupon(self, sale: Sale, coupon_code: str) -> Dict:
         """Apply coupon to sale"""
         try:
             coupon = Coupon.objects.get(code=coupon_code, is_active=True)
             sale.coupon = coupon
-            sale.save()
-            self.sale_repo.calculate_total(sale, SystemConfig.get_tax_rate())
+            sale.save(update_fields=['coupon'])
+            self.sale_repo.refresh_totals(sale, SystemConfig.get_tax_rate())
             return {'success': True, 'message': 'Coupon applied successfully'}
         except Coupon.DoesNotExist:
             return {'success': False, 'message': 'Invalid coupon code'}
     
-    def finalize_sale(self, sale: Sale) -> Dict:
-        """Finalize sale and update inventory"""
-        if sale.items.count() == 0:
+    def add_item_to_cart(self, cart: Cart, item_id: int, quantity: int) -> Dict:
+        """Add item to an open cart, reserving its stock until checkout"""
+        item = self.item_repo.get_cached(item_id)
+        if not item:
+            return {'success': False, 'message': 'Item not found'}
+        
+        if item.item_type not in ['Sale', 'Both']:
+            return {'success': False, 'message': 'Item is not for sale'}
+        
+        wanted = cart.quantity_of(item_id) + quantity
+        if not self.reservation_repo.hold(cart.cart_id, item, 'sale', wanted):
+            available = self.reservation_repo.get_available(item, 'sale', exclude_holder=cart.cart_id)
+            return {
+                'success': False,
+                'message': f'Insufficient stock. Available: {max(0, available)}'
+            }
+        self.reservation_repo.touch(cart.cart_id)
+        
+        line = cart.add(item.item_id, item.name, item.price, quantity)
+        return {'success': True, 'line': line, 'cart': cart}
+    
+    def remove_item_from_cart(self, cart: Cart, item_id: int) -> bool:
+        """Remove item from an open cart and release its reservation"""
+        if not cart.remove(item_id):
+            return False
+        self.reservation_repo.release(cart.cart_id, [item_id])
+        return True
+    
+    def apply_coupon_to_cart(self, cart: Cart, coupon_code: str) -> Dict:
+        """Apply coupon to an open cart"""
+        try:
+            coupon = Coupon.objects.get(code=coupon_code, is_active=True)
+        except Coupon.DoesNotExist:
+            return {'success': False, 'message': 'Invalid coupon code'}
+        
+        cart.set_coupon(coupon.code, coupon.discount_percentage)
+        return {'success': True, 'message': 'Coupon applied successfully'}
+    
+    def get_cart_totals(self, cart: Cart) -> Dict[str, Decimal]:
+        """Running totals of an open cart"""
+        return self.sale_repo.compute_totals(
+            cart.subtotal,
+            SystemConfig.get_tax_rate(),
+            cart.get_discount_rate()
+        )
+    
+    def finalize_sale(self, cart: Cart, employee: Employee = None) -> Dict:
+        """Write the cart as a sale and update inventory"""
+        if cart.is_empty():
             return {'success': False, 'message': 'Cannot finalize empty sale'}
         
-        # Check all items are still available
-        for sale_item in sale.items.all():
-            if not sale_item.item.is_available_for_sale(sale_item.quantity):
+        items = self.item_repo.get_by_ids(cart.item_ids())
+        held = self.reservation_repo.get_held(cart.cart_id, 'sale')
+        for line in cart.lines:
+            item = items.get(line.item_id)
+            # Lines whose reservation expired must be able to take it back
+            if not item or (held.get(line.item_id, 0) < line.quantity and
+                            not self.reservation_repo.hold(cart.cart_id, item, 'sale', line.quantity)):
                 return {
                     'success': False,
-                    'message': f'Item {sale_item.item.name} is no longer available'
+                    'message': f'Item {line.name} is no longer available'
                 }
         
-        # Update inventory
-        success = self.sale_repo.finalize(sale)
-        if success:
-            # Log activity if employee exists
-            if sale.employee:
-                self.employee_repo.log_activity(sale.employee, 'sale_completed')
+        coupon = None
+        if cart.coupon_code:
+            coupon = Coupon.objects.filter(code=cart.coupon_code, is_active=True).first()
+        discount_rate = coupon.get_discount_rate() if coupon else Decimal('1.00')
+        
+        with transaction.atomic():
+            sale = self.sale_repo.create_with_items(
+                [(items[line.item_id], line.quantity, line.unit_price) for line in cart.lines],
+                self.sale_repo.compute_totals(
+                    cart.subtotal, SystemConfig.get_tax_rate(), discount_rate
+                ),
+                employee=employee,
+                coupon=coupon
+            )
             
+            # Update inventory and log; an oversold line rejects the whole sale
+            stock_results = self.sale_repo.finalize(sale, SystemConfig.get_tax_rate())
+            oversold = [items[item_id].name for item_id, ok in stock_results.items() if not ok]
+            if oversold:
+                transaction.set_rollback(True)
+            else:
+                self.reservation_repo.release(cart.cart_id)
+        
+        if oversold:
             return {
-                'success': True,
-                'sale': sale,
-                'message': 'Sale completed successfully'
+                'success': False,
+                'message': f'Item {", ".join(oversold)} is no longer available'
             }
         
-        return {'success': False, 'message': 'Failed to finalize sale'}
+        cart.clear()
+        return {
+            'success': True,
+            'sale': sale,
+            'message': 'Sale completed successfully'
+        }
     
     def get_sale(self, sale_id: int) -> Optional[Sale]:
         """Get sale by ID"""
         return self.sale_repo.get_by_id(sale_id)
     
+    def get_sale_with_items(self, sale_id: int) -> Optional[Sale]:
+        """Get sale by ID with its line items loaded for display"""
+        return self.sale_repo.get_with_items(sale_id)
+    
+    def get_sales_page(self, cursor: str = None) -> KeysetPage:
+        """Get one page of sales, newest first"""
+        return self.sale_repo.get_page(cursor, SystemConfig.get_page_size())
+    
     def get_sales_by_employee(self, employee: Employee) -> List[Sale]:
         """Get sales by employee"""
         return self.sale_repo.get_by_employee(employee)
@@ -118,4 +198,12 @@ class SaleService:
     def calculate_total(self, sale: Sale) -> Sale:
         """Recalculate sale total"""
         return self.sale_repo.calculate_total(sale, SystemConfig.get_tax_rate())
+    
+    def recalculate_totals(self, sales=None) -> int:
+        """Recalculate the totals of many sales (default: all) in bulk"""
+        return self.sale_repo.recalculate_totals(sales, SystemConfig.get_tax_rate())
+    
+    def verify_totals(self, sales=None) -> List[Dict]:
+        """Find sales whose stored totals disagree with their line items"""
+        return self.sale_repo.verify_totals(sales, SystemConfig.get_tax_rate())
 
@@ -0,0 +1,30 @@
+"""
+Model signal receivers
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from pos.models import Item
+from pos.repositories.catalog_cache import catalog_cache
+
+
+@receiver(pre_save, sender=Item)
+def invalidate_renamed_item(sender, instance, update_fields=None, **kwargs):
+    """
+    An edit may change item_id; drop the entry under the old one too
+    Compares with the item_id the instance was loaded with (see Item.from_db),
+    so stock updates and other saves cost no extra query.
+    """
+    if update_fields is not None and 'item_id' not in update_fields:
+        return
+    old_item_id = getattr(instance, '_loaded_item_id', None)
+    if old_item_id is not None and old_item_id != instance.item_id:
+        catalog_cache.invalidate(old_item_id)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def invalidate_cached_item(sender, instance, **kwargs):
+    """Any save or delete of an item, including admin edits, drops its cached catalog entry"""
+    catalog_cache.invalidate(instance.item_id)
+    instance._loaded_item_id = instance.__dict__.get('item_id')
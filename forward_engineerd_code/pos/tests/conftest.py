@@ -0,0 +1,119 @@
+"""
+Shared fixtures for POS tests.
+"""
+import shutil
+import tempfile
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+
+from pos.metrics import request_metrics
+from pos.models import Coupon, Customer, Employee, Item, Rental
+from pos.repositories.audit_log import audit_log
+from pos.repositories.catalog_cache import catalog_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache():
+    """The catalog cache is process-wide; start every test cold"""
+    catalog_cache.clear()
+    yield
+    catalog_cache.clear()
+
+
+def pytest_configure(config):
+    """Keep the file-based cache out of Database/ while testing"""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': tempfile.mkdtemp(prefix='pos-cache-'),
+        }
+    }
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(settings.CACHES['default']['LOCATION'], ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clear_django_cache():
+    """Cached employees and sessions must not outlive their test database rows"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_request_metrics(tmp_path, monkeypatch):
+    """Record request histograms into a file of this test's own"""
+    monkeypatch.setattr(request_metrics, 'path', str(tmp_path / 'requestMetrics.bin'))
+    monkeypatch.setattr(request_metrics, '_map', None)
+
+
+@pytest.fixture(autouse=True)
+def synchronous_audit_log(monkeypatch):
+    """Write activity logs inline so tests can read them back at once"""
+    monkeypatch.setattr(audit_log, 'buffered', False)
+
+
+@pytest.fixture
+def employee(db):
+    return Employee.objects.create_user(
+        username='cashier1',
+        password='secret',
+        first_name='Casey',
+        last_name='Cashier',
+        position='Cashier',
+    )
+
+
+@pytest.fixture
+def employee_client(client, employee):
+    """Test client with a logged-in cashier session"""
+    session = client.session
+    session['employee_id'] = employee.username
+    session.save()
+    # Mid-shift: the session and employee are already cached
+    client.get('/dashboard/')
+    return client
+
+
+@pytest.fixture
+def item(db):
+    return Item.objects.create(
+        item_id=1001,
+        name='Hammer',
+        price=Decimal('10.00'),
+        stock_sale=5,
+        stock_rental=3,
+    )
+
+
+@pytest.fixture
+def rent(db):
+    """Factory for two-week rentals due on a date, or a number of days ago"""
+    def rent(item, due=None, due_days_ago=None, quantity=1, returned=False, phone='555-0100'):
+        if due is None:
+            due = date.today() - timedelta(days=due_days_ago)
+        customer, _ = Customer.objects.get_or_create(phone_number=phone)
+        return Rental.objects.create(customer=customer, item=item, quantity=quantity,
+                                     rental_date=due - timedelta(days=14), due_date=due, is_returned=returned)
+    return rent
+
+
+@pytest.fixture
+def coupon(db):
+    return Coupon.objects.create(code='SAVE10', discount_percentage=Decimal('10.00'))
+
+
+class FakeSession(dict):
+    """Minimal stand-in for request.session"""
+    modified = False
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
@@ -0,0 +1,26 @@
+"""
+Test helpers for POS tests.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_view_queries(client, url):
+    """Render url with client and return the number of queries it ran"""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, f'{url} returned {response.status_code}'
+    return len(queries)
+
+
+def assert_fixed_query_count(client, url, expected, add_rows):
+    """
+    Assert a list view runs exactly expected queries, both as-is and after
+    add_rows() has added more rows to the list (i.e. no N+1 per row).
+    """
+    before = count_view_queries(client, url)
+    add_rows()
+    after = count_view_queries(client, url)
+    assert (before, after) == (expected, expected), (
+        f'{url}: expected {expected} queries, got {before} then {after}'
+    )
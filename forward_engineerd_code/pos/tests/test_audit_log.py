@@ -0,0 +1,105 @@
+"""
+Buffered activity log writes
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from pos.models import EmployeeLog
+from pos.repositories import EmployeeRepository
+from pos.repositories.audit_log import AuditLogWriter, audit_log
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    # No flush thread: tests flush explicitly on the test's own connection
+    writer = AuditLogWriter(buffered=True, flush_interval_ms=60000, flush_size=1000, max_pending=3)
+    monkeypatch.setattr(writer, '_start', lambda: None)
+    return writer
+
+
+def test_buffered_entries_are_written_in_one_batch(writer, employee, django_capture_on_commit_callbacks, django_assert_num_queries):
+    with django_capture_on_commit_callbacks(execute=True):
+        for action in ('login', 'logout', 'login'):
+            writer.write(EmployeeLog(employee=employee, action=action))
+    assert EmployeeLog.objects.count() == 0
+
+    with django_assert_num_queries(1):
+        assert writer.flush() == 3
+    assert list(EmployeeLog.objects.order_by('id').values_list('action', flat=True)) == ['login', 'logout', 'login']
+    assert writer.flush() == 0
+
+
+def test_rolled_back_entries_are_never_queued(writer, employee, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                writer.write(EmployeeLog(employee=employee, action='login'))
+                raise RuntimeError
+    assert writer.stats()['pending'] == 0
+
+
+def test_full_queue_is_flushed_by_the_writer(writer, employee, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        for _ in range(5):
+            writer.write(EmployeeLog(employee=employee, action='login'))
+    assert writer.stats() == {'buffered': True, 'pending': 2, 'written': 3, 'dropped': 0}
+
+    writer.close()
+    assert EmployeeLog.objects.count() == 5
+
+
+def test_oldest_entries_are_dropped_when_flushing_fails(writer, employee, monkeypatch, caplog,
+                                                        django_capture_on_commit_callbacks):
+    def fail(*args, **kwargs):
+        raise DatabaseError('database is locked')
+    monkeypatch.setattr(EmployeeLog.objects, 'bulk_create', fail)
+    with django_capture_on_commit_callbacks(execute=True):
+        for _ in range(5):
+            writer.write(EmployeeLog(employee=employee, action='login'))
+    assert writer.stats() == {'buffered': True, 'pending': 3, 'written': 0, 'dropped': 2}
+    assert 'dropped the oldest entry (2 dropped)' in caplog.text
+
+
+def test_activity_logs_include_pending_entries(monkeypatch, employee, django_capture_on_commit_callbacks):
+    monkeypatch.setattr(audit_log, 'buffered', True)
+    monkeypatch.setattr(audit_log, '_start', lambda: None)
+    with django_capture_on_commit_callbacks(execute=True):
+        EmployeeRepository.log_activity(employee, 'sale_completed')
+
+    logs = EmployeeRepository.get_activity_logs(employee)
+    assert [log.action for log in logs] == ['sale_completed']
+
+
+def test_pending_entries_are_flushed_at_exit(tmp_path):
+    """A process that exits with entries still queued writes them on the way out."""
+    database = tmp_path / 'exit.sqlite3'
+    script = '''
+import sys
+import django
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = sys.argv[1]
+settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+django.setup()
+from django.core.management import call_command
+call_command('migrate', verbosity=0)
+from pos.models import Employee, EmployeeLog
+from pos.repositories import EmployeeRepository
+from pos.repositories.audit_log import audit_log
+audit_log.buffered = True
+audit_log.flush_interval = 3600
+employee = Employee.objects.create_user(username='cashier1', password='secret', position='Cashier')
+entry = EmployeeRepository.log_activity(employee, 'login')
+assert entry.pk is None and not EmployeeLog.objects.exists()
+'''
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='pos_system.settings',
+               PYTHONPATH=os.pathsep.join([str(settings.BASE_DIR), os.environ.get('PYTHONPATH', '')]))
+    subprocess.run([sys.executable, '-c', script, str(database)], cwd=tmp_path, env=env, check=True)
+
+    with sqlite3.connect(database) as connection:
+        assert connection.execute('SELECT action FROM employee_logs').fetchall() == [('login',)]
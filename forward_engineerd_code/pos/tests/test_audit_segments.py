@@ -0,0 +1,117 @@
+"""
+Segment file storage for activity logs
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pos.models import CompactedSegment, EmployeeLog
+from pos.repositories import EmployeeRepository
+from pos.repositories.audit_log import audit_log
+from pos.repositories.audit_segments import AuditSegmentStore
+
+START = datetime(2024, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AuditSegmentStore(str(tmp_path), max_entries=3, max_age_seconds=3600)
+
+
+def append_hours(store, employee, hours, action='login'):
+    for hour in hours:
+        store.append(EmployeeLog(employee_id=employee.pk, action=action, timestamp=START + timedelta(hours=hour)))
+
+
+def names(store, suffix):
+    return sorted(name for name in os.listdir(store.directory) if name.endswith(suffix))
+
+
+def test_full_segments_are_sealed_with_a_time_range_header(store, employee):
+    append_hours(store, employee, [2, 0, 1, 3])
+
+    sealed = names(store, '.seg')
+    assert len(sealed) == 1 and len(names(store, '.active')) == 1
+    with open(os.path.join(store.directory, sealed[0]), 'rb') as f:
+        header = f.readline().split()
+    low = int((START - datetime(1970, 1, 1, tzinfo=timezone.utc)).total_seconds()) * 10**6
+    assert header == [b'#segment', b'%d' % low, b'%d' % (low + 2 * 3600 * 10**6), b'3']
+
+
+def test_range_reads_skip_segments_outside_the_range(store, employee, monkeypatch):
+    append_hours(store, employee, range(9))  # Three sealed segments
+    store.close()
+
+    opened = []
+    entries = store._entries
+    monkeypatch.setattr(store, '_entries', lambda path: opened.append(path) or entries(path))
+    logs = store.read(since=START + timedelta(hours=4), until=START + timedelta(hours=6))
+
+    assert [log.timestamp for log in logs] == [START + timedelta(hours=4), START + timedelta(hours=5)]
+    assert len(opened) == 1
+    assert store.read(employee_id='nobody') == []
+
+
+def test_compaction_moves_sealed_segments_into_the_table(store, employee):
+    append_hours(store, employee, range(4))
+
+    assert store.compact() == 3
+    assert EmployeeLog.objects.count() == 3
+    assert names(store, '.seg') == []
+    # The active segment is left alone until it is sealed
+    assert [log.timestamp for log in store.read()] == [START + timedelta(hours=3)]
+
+
+def test_compaction_after_a_crash_does_not_duplicate(store, employee):
+    append_hours(store, employee, range(3))
+    name = names(store, '.seg')[0]
+    # Inserted and recorded, but the file was never deleted
+    EmployeeLog.objects.bulk_create(store.read())
+    CompactedSegment.objects.create(name=name, row_count=3)
+
+    assert store.compact() == 0
+    assert EmployeeLog.objects.count() == 3
+    assert not os.path.exists(os.path.join(store.directory, name))
+    assert not CompactedSegment.objects.exists()
+
+
+def test_compaction_seals_an_idle_active_segment_past_max_age(store, employee, monkeypatch):
+    append_hours(store, employee, range(2))
+    assert store.compact() == 0
+
+    monkeypatch.setattr(store, 'max_age_seconds', 0)
+    assert store.compact() == 2
+    assert names(store, '.active') == [] and EmployeeLog.objects.count() == 2
+
+
+def test_activity_logs_merge_segments_and_table(tmp_path, monkeypatch, employee, django_capture_on_commit_callbacks):
+    segments = AuditSegmentStore(str(tmp_path), max_entries=2, max_age_seconds=3600)
+    monkeypatch.setattr(audit_log, 'segments', segments)
+    EmployeeLog.objects.create(employee=employee, action='login', timestamp=START)
+    with django_capture_on_commit_callbacks(execute=True):
+        EmployeeRepository.log_activity(employee, 'logout')
+
+    logs = EmployeeRepository.get_activity_logs(employee)
+    assert [log.action for log in logs] == ['logout', 'login']
+    assert logs[0].employee == employee
+    assert EmployeeRepository.get_activity_logs(employee, until=START + timedelta(hours=1))[0].action == 'login'
+
+
+def test_compaction_seals_another_workers_idle_segment(store, employee):
+    worker = AuditSegmentStore(store.directory, max_entries=100, max_age_seconds=3600)
+    append_hours(worker, employee, range(2))
+    path = os.path.join(store.directory, names(store, '.active')[0])
+    assert store.compact() == 0
+
+    idle_since = os.path.getmtime(path) - 3600
+    os.utime(path, (idle_since, idle_since))
+    assert store.compact() == 2
+    assert names(store, '.active') == []
+
+    # The worker notices and carries on in a new segment
+    append_hours(worker, employee, [5])
+    assert len(names(store, '.active')) == 1
+    worker.close()
+    assert store.compact() == 1
+    assert EmployeeLog.objects.count() == 3
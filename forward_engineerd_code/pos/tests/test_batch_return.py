@@ -0,0 +1,75 @@
+"""
+Returning several rentals at once
+"""
+import pytest
+from decimal import Decimal
+
+from pos.models import EmployeeLog, Item, LateFeeAccrual, Rental, ReturnItem, ReturnTransaction
+from pos.repositories import LateFeeAccrualRepository
+from pos.services.rental_service import RentalService
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', [1, 12])
+def test_batch_return_is_a_fixed_number_of_queries(item, rent, employee, count, django_assert_num_queries):
+    rentals = [rent(item, due_days_ago=1) for _ in range(count)]
+    item.refresh_from_db()
+
+    # Read, update, accruals, stock, return, return items, log, and two
+    # savepoints (the test's own transaction makes atomic() nest)
+    with django_assert_num_queries(11):
+        result = RentalService().process_returns([rental.id for rental in rentals], employee)
+    assert result['success']
+
+    return_transaction = ReturnTransaction.objects.get()
+    assert return_transaction.items.count() == count
+    assert return_transaction.late_fee_total == Decimal('1.00') * count
+    assert Item.objects.get(pk=item.pk).stock_rental == item.stock_rental + count
+    assert EmployeeLog.objects.filter(action='rental_returned').count() == 1
+    assert not Rental.objects.filter(is_returned=False).exists()
+
+
+@pytest.mark.django_db
+def test_batch_return_charges_accruals_and_prices_the_rest(item, rent):
+    accrued = rent(item, due_days_ago=2)
+    LateFeeAccrualRepository.refresh()
+    LateFeeAccrual.objects.filter(rental=accrued).update(accrued_fee=Decimal('1.23'))
+    priced = rent(item, due_days_ago=3, quantity=2)
+    on_time = rent(item, due_days_ago=-1)
+
+    result = RentalService().process_returns([accrued.id, priced.id, on_time.id])
+    fees = dict(ReturnItem.objects.values_list('rental_id', 'late_fee'))
+    assert fees == {accrued.id: Decimal('1.23'), priced.id: Decimal('6.00'), on_time.id: Decimal('0.00')}
+    assert result['late_fee_total'] == Decimal('7.23')
+    assert Rental.objects.get(pk=priced.pk).late_fee == Decimal('6.00')
+    assert not LateFeeAccrual.objects.exists()
+
+
+@pytest.mark.django_db
+def test_batch_with_a_returned_rental_writes_nothing(item, rent):
+    outstanding = rent(item, due_days_ago=1)
+    returned = rent(item, due_days_ago=1)
+    RentalService().process_return(returned.id)
+    stock = Item.objects.get(pk=item.pk).stock_rental
+
+    result = RentalService().process_returns([outstanding.id, returned.id])
+    assert result == {'success': False, 'message': 'Rental already returned'}
+    assert not Rental.objects.get(pk=outstanding.pk).is_returned
+    assert Item.objects.get(pk=item.pk).stock_rental == stock
+    assert ReturnTransaction.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_return_screen_returns_ticked_rentals(employee_client, item, rent):
+    first, second = rent(item, due_days_ago=1), rent(item, due_days_ago=1)
+    other = rent(item, due_days_ago=1, phone='555-0199')
+
+    response = employee_client.post('/rental/return/', {
+        'phone_number': '555-0100', 'rental_ids': [first.id, second.id]
+    })
+    assert response.status_code == 302
+    assert set(Rental.objects.filter(is_returned=True).values_list('id', flat=True)) == {first.id, second.id}
+
+    # Another customer's rental is refused
+    employee_client.post('/rental/return/', {'phone_number': '555-0100', 'rental_ids': [other.id]})
+    assert not Rental.objects.get(pk=other.pk).is_returned
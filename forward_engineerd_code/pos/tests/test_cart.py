@@ -0,0 +1,81 @@
+"""
+Tests for the session-backed cart and cart finalization.
+"""
+import pytest
+from decimal import Decimal
+
+from pos.cart import Cart
+from pos.models import Item, Sale, SaleItem
+from pos.services.sale_service import SaleService
+
+
+def test_cart_keeps_running_subtotal(session):
+    """Adding and removing lines updates the subtotal without a re-scan."""
+    cart = Cart(session)
+    cart.add(1, 'Hammer', Decimal('10.00'), 2)
+    cart.add(2, 'Saw', Decimal('4.50'), 1)
+    cart.add(1, 'Hammer', Decimal('10.00'), 1)
+
+    assert cart.quantity_of(1) == 3
+    assert cart.subtotal == Decimal('34.50')
+
+    cart.remove(1)
+    assert cart.subtotal == Decimal('4.50')
+
+
+def test_cart_round_trips_through_session(session):
+    """A cart rebuilt from the session sees the same lines and coupon."""
+    cart = Cart(session)
+    cart.add(1, 'Hammer', Decimal('10.00'), 2)
+    cart.set_coupon('SAVE10', Decimal('10.00'))
+
+    restored = Cart(session)
+    assert restored.subtotal == Decimal('20.00')
+    assert restored.get_line(1).name == 'Hammer'
+    assert restored.get_discount_rate() == Decimal('0.90')
+
+
+@pytest.mark.django_db
+def test_scanning_does_not_create_sale_rows(session, item):
+    """Items can be added to a cart without writing any Sale rows."""
+    service = SaleService()
+    cart = Cart(session)
+
+    result = service.add_item_to_cart(cart, item.item_id, 2)
+
+    assert result['success']
+    assert Sale.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_finalize_writes_sale_once(session, item, employee, coupon):
+    """Finalizing writes the sale, its lines and the stock change."""
+    service = SaleService()
+    cart = Cart(session)
+    service.add_item_to_cart(cart, item.item_id, 2)
+    service.apply_coupon_to_cart(cart, coupon.code)
+
+    result = service.finalize_sale(cart, employee)
+
+    assert result['success']
+    sale = result['sale']
+    assert sale.subtotal == Decimal('20.00')
+    assert sale.discount_amount == Decimal('2.00')
+    assert sale.total_amount == Decimal('19.08')
+    assert sale.coupon == coupon
+    assert SaleItem.objects.filter(sale=sale).count() == 1
+    assert Item.objects.get(pk=item.pk).stock_sale == 3
+    assert cart.is_empty()
+
+
+@pytest.mark.django_db
+def test_add_rejects_quantity_beyond_stock(session, item):
+    """The quantity already in the cart counts against available stock."""
+    service = SaleService()
+    cart = Cart(session)
+    service.add_item_to_cart(cart, item.item_id, 4)
+
+    result = service.add_item_to_cart(cart, item.item_id, 2)
+
+    assert not result['success']
+    assert cart.quantity_of(item.item_id) == 4
@@ -0,0 +1,83 @@
+"""
+Tests for the read-through item catalog cache.
+"""
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pos.models import Item
+from pos.repositories.catalog_cache import CatalogCache
+from pos.repositories.item_repository import ItemRepository
+
+
+def test_lru_eviction_and_counters():
+    """The least recently used entry is evicted and lookups are counted."""
+    cache = CatalogCache(max_entries=2, ttl_seconds=60)
+    cache.put(1, ('a',))
+    cache.put(2, ('b',))
+    cache.get(1)
+    cache.put(3, ('c',))
+
+    assert cache.get(2) is None
+    assert cache.get(1) == ('a',)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 1, 1)
+
+
+def test_expired_entries_miss():
+    """Entries older than the TTL are not served."""
+    cache = CatalogCache(max_entries=2, ttl_seconds=0)
+    cache.put(1, ('a',))
+    assert cache.get(1) is None
+
+
+@pytest.mark.django_db
+def test_cached_item_keeps_stock_authoritative(item):
+    """Name and price come from the cache; stock is still read from the DB."""
+    ItemRepository.get_cached(item.item_id)
+    Item.objects.filter(pk=item.pk).update(stock_sale=1)
+
+    with CaptureQueriesContext(connection) as queries:
+        cached = ItemRepository.get_cached(item.item_id)
+        assert cached.name == 'Hammer'
+        assert cached.price == Decimal('10.00')
+    assert len(queries) == 0
+
+    assert cached.stock_sale == 1
+
+
+@pytest.mark.django_db
+def test_stock_reads_load_the_whole_row_at_once(item, django_assert_num_queries):
+    """get_by_id serves stock paths with one query, cached or not."""
+    ItemRepository.get_cached(item.item_id)
+
+    with django_assert_num_queries(1):
+        loaded = ItemRepository.get_by_id(item.item_id)
+        assert (loaded.stock_sale, loaded.stock_rental, loaded.reorder_threshold) == (5, 3, 10)
+
+
+@pytest.mark.django_db
+def test_writes_invalidate_cache(item):
+    """Saving or deleting an item, by any path, drops it from the cache."""
+    ItemRepository.get_cached(item.item_id)
+    edited = Item.objects.get(pk=item.pk)  # As the admin would
+    edited.name = 'Claw Hammer'
+    edited.item_id = 1009
+    edited.save()
+
+    assert ItemRepository.get_cached(item.item_id) is None
+    assert ItemRepository.get_cached(1009).name == 'Claw Hammer'
+
+    ItemRepository.delete(1009)
+    assert ItemRepository.get_cached(1009) is None
+
+
+@pytest.mark.django_db
+def test_saving_an_item_runs_no_extra_query(item, django_assert_num_queries):
+    edited = Item.objects.get(pk=item.pk)
+    edited.stock_sale -= 1
+    with django_assert_num_queries(1):
+        edited.save()
+    with django_assert_num_queries(1):
+        edited.save(update_fields=['stock_sale'])
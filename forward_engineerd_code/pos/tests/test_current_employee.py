@@ -0,0 +1,48 @@
+"""
+Per-request employee resolution and cached sessions
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pos.models import Employee
+
+
+@pytest.fixture
+def admin(db):
+    return Employee.objects.create_user(username='admin1', password='secret', first_name='Ada',
+                                        last_name='Admin', position='Admin', is_staff=True)
+
+
+def login(client, employee, is_admin=False):
+    session = client.session
+    session['employee_id'] = employee.username
+    session['is_admin'] = is_admin
+    session.save()
+
+
+@pytest.mark.django_db
+def test_cashier_requests_skip_session_and_employee_queries(employee_client):
+    with CaptureQueriesContext(connection) as queries:
+        response = employee_client.get('/sale/create/')
+    assert response.status_code == 200
+    assert response.wsgi_request.employee.username == 'cashier1'
+    tables = ' '.join(query['sql'] for query in queries)
+    assert 'django_session' not in tables
+    assert '"employees"' not in tables
+
+
+@pytest.mark.django_db
+def test_employee_update_invalidates_cached_employee(client, employee, admin):
+    login(client, employee)
+    client.get('/dashboard/')
+    login(client, admin, is_admin=True)
+    response = client.post(f'/employee/{employee.username}/update/', {
+        'username': employee.username, 'first_name': 'Renamed', 'last_name': 'Cashier',
+        'position': 'Cashier', 'password': '', 'password_confirm': '',
+    })
+    assert response.status_code == 302
+
+    login(client, employee)
+    response = client.get('/dashboard/')
+    assert response.wsgi_request.employee.first_name == 'Renamed'
@@ -0,0 +1,65 @@
+"""
+Phone number normalization and merging duplicate customers
+"""
+import io
+
+import pytest
+from datetime import date
+
+from django.core.management import call_command
+
+from legacy.data_importer import ParsedFile, import_customers_and_rentals
+from pos.forms.rental_forms import ReturnForm
+from pos.models import Customer, Rental
+from pos.repositories import CustomerRepository
+
+
+def test_formatting_is_ignored():
+    keys = {Customer.normalize_phone(phone) for phone in ('555-1234', '(555) 1234', '5551234', ' 555.1234 ')}
+    assert keys == {'5551234'}
+    assert Customer.normalize_phone('1 (800) 555-0100') == Customer.normalize_phone('800-555-0100')
+
+
+@pytest.mark.django_db
+def test_lookups_match_any_formatting():
+    customer, created = CustomerRepository.get_or_create('555-1234')
+    assert created and customer.phone_key == '5551234'
+
+    assert CustomerRepository.get_or_create('(555) 1234') == (customer, False)
+    assert CustomerRepository.get_by_phone('5551234') == customer
+    assert CustomerRepository.get_by_phone(' 555.1234') == customer
+
+
+def test_forms_keep_the_typed_number_and_reject_numbers_without_digits():
+    form = ReturnForm({'phone_number': ' (555) 123-4567 ', 'rental_id': '1'})
+    assert form.is_valid() and form.cleaned_data['phone_number'] == '(555) 123-4567'
+    assert not ReturnForm({'phone_number': 'n/a', 'rental_id': '1'}).is_valid()
+
+
+@pytest.mark.django_db
+def test_merge_moves_rentals_to_the_keyed_customer(item):
+    keyed = Customer.objects.create(phone_number='555-1234')
+    # As left by the migration: duplicates have no key yet
+    duplicates = Customer.objects.bulk_create([Customer(phone_number='5551234'), Customer(phone_number='555.1234')])
+    unkeyed = Customer.objects.bulk_create([Customer(phone_number='555-9999')])[0]
+    for customer in (keyed, *duplicates, unkeyed):
+        Rental.objects.create(customer=customer, item=item, rental_date=date(2024, 3, 1), due_date=date(2024, 3, 15))
+
+    call_command('merge_customers', stdout=io.StringIO())
+
+    assert set(Customer.objects.values_list('phone_number', 'phone_key')) == {
+        ('555-1234', '5551234'), ('555-9999', '5559999')
+    }
+    assert keyed.rentals.count() == 3
+    assert CustomerRepository.merge_duplicates() == {'merged': 0, 'rentals': 0, 'keyed': 0}
+
+
+@pytest.mark.django_db
+def test_importer_creates_one_customer_per_normalized_number(tmp_path, item):
+    path = tmp_path / 'userDatabase.txt'
+    path.write_text('header\n555-1234 1001,03/15/24,true\n555.1234 1001,04/15/24,false\n')
+
+    assert import_customers_and_rentals(ParsedFile(None, 'user', str(path), skip_header=True)) == (1, 2)
+    customer = Customer.objects.get()
+    assert (customer.phone_number, customer.phone_key) == ('555-1234', '5551234')
+    assert customer.rentals.count() == 2
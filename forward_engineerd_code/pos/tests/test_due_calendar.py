@@ -0,0 +1,71 @@
+"""
+Due-date calendar of outstanding rentals
+"""
+import pytest
+from datetime import date, timedelta
+
+from pos.repositories import RentalRepository
+from pos.services.rental_service import RentalService
+from pos.tests.helpers import assert_fixed_query_count
+
+MONDAY = date(2024, 3, 4)
+
+
+@pytest.mark.django_db
+def test_counts_per_day_with_earlier_days_counted_as_overdue(item, rent, django_assert_num_queries):
+    rent(item, MONDAY - timedelta(days=3))
+    rent(item, MONDAY)
+    rent(item, MONDAY)
+    rent(item, MONDAY, returned=True)
+    rent(item, MONDAY + timedelta(days=2))
+    rent(item, MONDAY + timedelta(days=7))  # Past the window
+
+    with django_assert_num_queries(1):
+        counts = RentalRepository.get_due_counts(MONDAY, MONDAY + timedelta(days=6), as_of=MONDAY)
+    assert counts['overdue'] == 1
+    assert [count for _, count in counts['days']] == [2, 0, 1, 0, 0, 0, 0]
+
+
+@pytest.mark.django_db
+def test_calendar_is_whole_weeks_with_relative_levels(item, rent):
+    for _ in range(4):
+        rent(item, MONDAY + timedelta(days=1))
+    rent(item, MONDAY + timedelta(days=9))
+
+    calendar = RentalService().get_due_calendar(MONDAY + timedelta(days=3), weeks=2)
+    days = [day for week in calendar['weeks'] for day in week]
+    assert [len(week) for week in calendar['weeks']] == [7, 7]
+    assert days[0]['date'] == MONDAY
+    assert (days[1]['level'], days[9]['level'], days[2]['level']) == (4, 1, 0)
+
+
+@pytest.mark.django_db
+def test_mid_week_overdue_includes_earlier_days_of_the_week(item, rent):
+    wednesday = MONDAY + timedelta(days=2)
+    rent(item, MONDAY - timedelta(days=3))
+    rent(item, MONDAY)
+    rent(item, MONDAY + timedelta(days=1))
+    rent(item, wednesday)  # Due today, not overdue yet
+
+    calendar = RentalService().get_due_calendar(as_of=wednesday)
+    assert calendar['overdue'] == 3
+    assert calendar['weeks'][0][0]['date'] == MONDAY
+    assert [day['date'] for week in calendar['weeks'] for day in week if day['is_today']] == [wednesday]
+
+
+@pytest.mark.django_db
+def test_dashboard_heatmap_is_one_query(employee_client, item, rent):
+    def add_rows():
+        for offset in range(10):
+            rent(item, date.today() + timedelta(days=offset), phone=f'555-03{offset:02d}')
+
+    assert_fixed_query_count(employee_client, '/dashboard/', 1, add_rows)
+
+
+@pytest.mark.django_db
+def test_rental_list_filters_one_due_date(employee_client, item, rent):
+    due = rent(item, MONDAY)
+    rent(item, MONDAY + timedelta(days=1))
+
+    response = employee_client.get('/rental/list/', {'due': MONDAY.isoformat()})
+    assert list(response.context['rentals']) == [due]
@@ -0,0 +1,103 @@
+"""
+Tests for resumable legacy file reading.
+"""
+import pytest
+from django.db import transaction
+
+from legacy.reader import read_chunks, resume_position
+from pos.repositories import ImportCheckpointRepository
+
+
+@pytest.fixture
+def legacy_file(tmp_path):
+    path = tmp_path / 'itemDatabase.txt'
+    path.write_text(''.join(f'{i} Item{i} 1.00 5\n' for i in range(1, 11)))
+    return str(path)
+
+
+def read_all(path, **kwargs):
+    return [line.split()[0] for chunk in read_chunks(path, resume_position(path), chunk_size=4, **kwargs)
+            for line in chunk.lines]
+
+
+@pytest.mark.django_db
+def test_resume_after_committed_chunks(legacy_file):
+    """Only chunks whose transaction committed are skipped on restart."""
+    chunks = read_chunks(legacy_file, resume_position(legacy_file), chunk_size=4)
+    with transaction.atomic():
+        next(chunks).commit()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            next(chunks).commit()
+            raise RuntimeError('import failed')
+    chunks.close()
+
+    assert ImportCheckpointRepository.get_position(legacy_file)[1] == 4
+    assert read_all(legacy_file) == [str(i) for i in range(5, 11)]
+
+
+@pytest.mark.django_db
+def test_restart_and_replaced_file(legacy_file):
+    for chunk in read_chunks(legacy_file, chunk_size=4, skip_header=True):
+        chunk.commit()
+
+    assert read_all(legacy_file) == []
+    assert resume_position(legacy_file, restart=True) == (0, 0)
+
+    # A file shorter than its checkpoint is read from the start again
+    for chunk in read_chunks(legacy_file, chunk_size=4):
+        chunk.commit()
+    with open(legacy_file, 'w') as f:
+        f.write('header\n1 New 1.00 1\n')
+    assert read_all(legacy_file, skip_header=True) == ['1']
+
+
+@pytest.mark.django_db
+def test_replaced_file_longer_than_its_checkpoint_is_read_again(legacy_file):
+    chunks = read_chunks(legacy_file, chunk_size=4)
+    next(chunks).commit()
+    chunks.close()
+
+    with open(legacy_file, 'w') as f:
+        f.write(''.join(f'{i} Replacement{i} 20.00 2\n' for i in range(1001, 1021)))
+    assert read_all(legacy_file) == [str(i) for i in range(1001, 1021)]
+
+
+@pytest.mark.django_db
+def test_appended_file_resumes_after_its_checkpoint(legacy_file):
+    for chunk in read_chunks(legacy_file, chunk_size=4):
+        chunk.commit()
+    with open(legacy_file, 'a') as f:
+        f.write('11 Item11 1.00 5\n')
+    assert read_all(legacy_file) == ['11']
+
+
+@pytest.mark.django_db
+def test_import_counts_only_rows_inserted(tmp_path):
+    """Rows skipped by ignore_conflicts are not reported as imported."""
+    from decimal import Decimal
+    from legacy.data_importer import ParsedFile, write_new
+    from pos.models import Coupon
+
+    path = tmp_path / 'couponNumber.txt'
+    path.write_text('SAVE1\nSAVE2\n')
+
+    def build(records):
+        # Another writer inserts SAVE2 between the existing-key check and ours
+        Coupon.objects.create(code='SAVE2', discount_percentage=Decimal('10.00'))
+        return [Coupon(code=code, discount_percentage=Decimal('10.00')) for code, in records]
+
+    assert write_new('Coupons', ParsedFile(None, 'coupon', str(path)), Coupon, 'code', build) == 1
+
+
+@pytest.mark.django_db
+def test_unknown_items_are_summarized(tmp_path, item, capsys):
+    from legacy.data_importer import ParsedFile, import_customers_and_rentals
+
+    path = tmp_path / 'userDatabase.txt'
+    path.write_text('header\n5551234 1001,03/15/24,true 7,03/15/24,true 7,04/15/24,true 8,04/15/24,true\n')
+
+    assert import_customers_and_rentals(ParsedFile(None, 'user', str(path), skip_header=True)) == (1, 1)
+    output = capsys.readouterr().out
+    assert 'not found' not in output
+    assert 'Skipped 3 rentals of 2 unknown items (most frequent: 7, 8)' in output
@@ -0,0 +1,30 @@
+"""
+Tests for the bulk-import password hashing path.
+"""
+import pytest
+
+from legacy.passwords import hash_passwords
+from pos.backends import EmployeeBackend
+from pos.models import Employee
+
+
+def test_hash_passwords_in_pool_matches_inline():
+    """Pool hashes verify like hashes made in this process."""
+    from django.contrib.auth.hashers import check_password
+
+    hashes = hash_passwords(['a1', 'b2'], workers=2)
+
+    assert [check_password(raw, encoded) for raw, encoded in zip(['a1', 'b2'], hashes)] == [True, True]
+
+
+@pytest.mark.django_db
+def test_fast_hash_is_upgraded_on_first_login():
+    [fast_hash] = hash_passwords(['lehigh2017'], fast=True)
+    Employee.objects.create(username='110002', first_name='Debra', last_name='Cooper',
+                            position='Cashier', password=fast_hash)
+
+    employee = EmployeeBackend().authenticate(None, username='110002', password='lehigh2017')
+
+    assert employee is not None
+    assert fast_hash.startswith('pbkdf2_import$')
+    assert Employee.objects.get(username='110002').password.startswith('pbkdf2_sha256$')
@@ -0,0 +1,37 @@
+"""
+Tests for the import key maps.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from legacy.keymaps import KeyMap
+from pos.models import Customer
+
+
+@pytest.mark.django_db
+def test_small_table_is_resolved_without_queries():
+    Customer.objects.create(phone_number='5551234')
+    customers = KeyMap(Customer, 'phone_number')
+
+    with CaptureQueriesContext(connection) as queries:
+        found = customers.resolve(['5551234', '5559999'])
+
+    assert customers.complete
+    assert list(found) == ['5551234']
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_bounded_map_fetches_misses_and_inserts_new_keys():
+    Customer.objects.bulk_create([Customer(phone_number=f'555000{i}') for i in range(3)])
+    customers = KeyMap(Customer, 'phone_number', max_entries=2)
+
+    pks, created = customers.ensure(['5550000', '5550002', '5557777'])
+
+    assert not customers.complete
+    assert created == {'5557777'}
+    assert pks == dict(Customer.objects.filter(
+        phone_number__in=['5550000', '5550002', '5557777']
+    ).values_list('phone_number', 'pk'))
+    assert len(customers._pks) == 2
@@ -0,0 +1,91 @@
+"""
+Late fee math and the precomputed accrual table
+"""
+import io
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+
+from pos.models import Item, LateFeeAccrual, Rental
+from pos.repositories import LateFeeAccrualRepository
+from pos.services.rental_service import RentalService
+
+TODAY = date.today()
+
+
+def test_late_fee_is_exact_to_the_cent():
+    # 19.99 * 3 * 0.1 * 7 = 41.979; float math gave 41.979000000000006
+    assert Rental.late_fee_for(Decimal('19.99'), 3, 7) == Decimal('41.98')
+    assert Rental.late_fee_for(Decimal('19.99'), 3, 0) == Decimal('0.00')
+
+
+@pytest.mark.django_db
+def test_calculate_late_fee_rounds_saved_prices_half_up(item, rent):
+    rental = rent(item, due_days_ago=7, quantity=3)
+    Item.objects.filter(pk=item.pk).update(price=Decimal('19.99'))
+    rental.item.refresh_from_db()
+    assert rental.calculate_late_fee() == Decimal('41.98')
+
+    # 0.05 * 0.1 = 0.005 rounds up to a cent
+    Item.objects.filter(pk=item.pk).update(price=Decimal('0.05'))
+    rental.item.refresh_from_db()
+    rental.quantity = 1
+    rental.due_date = TODAY - timedelta(days=1)
+    assert rental.calculate_late_fee() == Decimal('0.01')
+
+
+@pytest.mark.django_db
+def test_refresh_accrues_all_overdue_rentals_in_one_pass(item, rent, django_assert_max_num_queries):
+    late = rent(item, due_days_ago=3, quantity=2)
+    rent(item, due_days_ago=-2)  # Not due yet
+    for i in range(20):
+        rent(item, due_days_ago=1, phone=f'555-02{i:02d}')
+
+    with django_assert_max_num_queries(5):
+        assert LateFeeAccrualRepository.refresh() == 21
+
+    accrual = LateFeeAccrual.objects.get(rental=late)
+    assert (accrual.days_late, accrual.accrued_fee, accrual.as_of) == (3, Decimal('6.00'), TODAY)
+    assert LateFeeAccrualRepository.get_summary()['total'] == Decimal('26.00')
+
+
+@pytest.mark.django_db
+def test_return_charges_the_current_accrual(item, rent, employee):
+    rental = rent(item, due_days_ago=2)
+    LateFeeAccrualRepository.refresh()
+    LateFeeAccrual.objects.filter(rental=rental).update(accrued_fee=Decimal('1.23'))
+
+    result = RentalService().process_return(rental.id, employee)
+    assert (result['late_fee'], result['days_late']) == (Decimal('1.23'), 2)
+    assert not LateFeeAccrual.objects.filter(rental=rental).exists()
+
+
+@pytest.mark.django_db
+def test_stale_accruals_are_recomputed_on_return(item, rent):
+    rental = rent(item, due_days_ago=2)
+    LateFeeAccrualRepository.refresh(as_of=TODAY - timedelta(days=1))
+
+    result = RentalService().process_return(rental.id)
+    assert (result['late_fee'], result['days_late']) == (Decimal('2.00'), 2)
+
+
+@pytest.mark.django_db
+def test_rental_list_shows_accrued_fees(employee_client, item, rent):
+    rent(item, due_days_ago=4)
+    call_command('accrue_late_fees', stdout=io.StringIO())
+
+    response = employee_client.get('/rental/list/')
+    assert '$4.00' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_return_screen_shows_accrued_fees(employee_client, item, rent):
+    rent(item, due_days_ago=5, phone='555-0199')
+    LateFeeAccrualRepository.refresh()
+
+    response = employee_client.post('/rental/return/', {'phone_number': '555-0199'})
+    assert response.status_code == 200
+    assert '$5.00' in response.content.decode()
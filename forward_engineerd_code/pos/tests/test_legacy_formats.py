@@ -0,0 +1,33 @@
+"""
+Tests for the memory-mapped legacy line reader and field parsers.
+"""
+from datetime import date, datetime, timedelta
+
+from legacy.formats import parse_legacy_date
+from legacy.reader import iter_lines, read_chunks
+
+
+def test_iter_lines_handles_crlf_and_missing_final_newline():
+    lines = [bytes(line) for line in iter_lines(b'a b\r\n\nlast')]
+
+    assert lines == [b'a b', b'', b'last']
+
+
+def test_chunks_are_byte_ranges_of_whole_lines(tmp_path):
+    path = tmp_path / 'userDatabase.txt'
+    path.write_bytes(b'header\n111 1,06/12/09,true\n222\n333\n')
+
+    chunks = list(read_chunks(str(path), chunk_size=2, skip_header=True))
+
+    assert [chunk.lines for chunk in chunks] == [['111 1,06/12/09,true', '222'], ['333']]
+    assert chunks[-1].end_offset == path.stat().st_size
+    assert chunks[-1].rows_read == 3
+
+
+def test_legacy_date_fast_path_matches_strptime():
+    day = date(1969, 1, 1)
+    while day < date(2068, 12, 31):
+        text = day.strftime('%m/%d/%y')
+        assert parse_legacy_date(text.encode()) == datetime.strptime(text, '%m/%d/%y').date()
+        day += timedelta(days=17)
+    assert parse_legacy_date(b'6/1/09') == date(2009, 6, 1)
@@ -0,0 +1,47 @@
+"""
+Tests that list views run a fixed number of queries however many rows they show.
+"""
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from pos.models import Customer, Item, Rental, Sale, SaleItem
+from pos.tests.helpers import assert_fixed_query_count
+
+
+def add_rentals(count):
+    for i in range(count):
+        customer = Customer.objects.create(phone_number=f'555-{Customer.objects.count():04d}')
+        item = Item.objects.create(item_id=Item.objects.count() + 1, name=f'Item {i}',
+                                   price=Decimal('2.00'))
+        Rental.objects.create(customer=customer, item=item, due_date=date.today() + timedelta(days=i))
+
+
+def add_sales(employee, count):
+    for _ in range(count):
+        Sale.objects.create(total_amount=Decimal('1.00'), employee=employee)
+
+
+@pytest.mark.django_db
+def test_rental_list_query_count(employee_client):
+    add_rentals(2)
+    assert_fixed_query_count(employee_client, '/rental/list/', 1, lambda: add_rentals(5))
+
+
+@pytest.mark.django_db
+def test_sale_list_query_count(employee_client, employee):
+    add_sales(employee, 2)
+    assert_fixed_query_count(employee_client, '/sale/list/', 1, lambda: add_sales(employee, 5))
+
+
+@pytest.mark.django_db
+def test_sale_detail_query_count(employee_client, employee):
+    sale = Sale.objects.create(total_amount=Decimal('1.00'), employee=employee)
+
+    def add_lines():
+        for i in range(5):
+            item = Item.objects.create(item_id=100 + i, name=f'Item {i}', price=Decimal('1.00'))
+            SaleItem.objects.create(sale=sale, item=item, quantity=1,
+                                    unit_price=item.price, subtotal=item.price)
+
+    assert_fixed_query_count(employee_client, f'/sale/{sale.id}/', 2, add_lines)
@@ -0,0 +1,37 @@
+"""
+Tests for the database-side low-stock query.
+"""
+import pytest
+from decimal import Decimal
+
+from pos.models import Item
+from pos.services.inventory_service import InventoryService
+
+
+@pytest.mark.django_db
+def test_low_stock_uses_per_item_thresholds():
+    """Each item is compared against its own reorder threshold."""
+    Item.objects.bulk_create([
+        Item(item_id=1, name='Low sale', price=Decimal('1.00'), stock_sale=2, stock_rental=50,
+             reorder_threshold=5),
+        Item(item_id=2, name='Low rental', price=Decimal('1.00'), stock_sale=50, stock_rental=0,
+             reorder_threshold=1),
+        Item(item_id=3, name='Fine', price=Decimal('1.00'), stock_sale=4, stock_rental=4,
+             reorder_threshold=3),
+    ])
+
+    low = InventoryService().get_low_stock_items()
+
+    assert [item.item_id for item in low] == [1, 2]
+    assert all(item.is_low_stock() for item in low)
+
+
+@pytest.mark.django_db
+def test_low_stock_with_explicit_threshold():
+    """An explicit threshold overrides the per-item reorder levels."""
+    Item.objects.create(item_id=1, name='A', price=Decimal('1.00'), stock_sale=4, stock_rental=9)
+    Item.objects.create(item_id=2, name='B', price=Decimal('1.00'), stock_sale=9, stock_rental=9)
+
+    low = InventoryService().get_low_stock_items(threshold=5)
+
+    assert [item.item_id for item in low] == [1]
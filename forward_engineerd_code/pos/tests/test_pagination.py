@@ -0,0 +1,56 @@
+"""
+Tests for keyset pagination of list screens.
+"""
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from pos.models import Item, Sale
+from pos.repositories.item_repository import ItemRepository
+from pos.repositories.sale_repository import SaleRepository
+
+
+@pytest.mark.django_db
+def test_item_pages_cover_catalog_once():
+    """Following next_cursor visits every item exactly once, in order."""
+    Item.objects.bulk_create([
+        Item(item_id=i, name=f'Item {i}', price=Decimal('1.00')) for i in range(1, 8)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        page = ItemRepository.get_page(cursor, limit=3)
+        seen.extend(item.item_id for item in page)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+
+    assert seen == list(range(1, 8))
+
+
+@pytest.mark.django_db
+def test_sale_pages_break_ties_on_id():
+    """Sales sharing a transaction_time are split across pages without loss."""
+    same_time = datetime(2026, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+    for _ in range(5):
+        Sale.objects.create(total_amount=Decimal('1.00'))
+    Sale.objects.update(transaction_time=same_time)
+
+    first = SaleRepository.get_page(limit=2)
+    second = SaleRepository.get_page(first.next_cursor, limit=2)
+    third = SaleRepository.get_page(second.next_cursor, limit=2)
+
+    ids = [s.id for page in (first, second, third) for s in page]
+    assert ids == sorted(Sale.objects.values_list('id', flat=True), reverse=True)
+    assert not third.has_next
+
+
+@pytest.mark.django_db
+def test_malformed_cursor_returns_first_page():
+    """A garbage cursor is treated as the first page rather than an error."""
+    Item.objects.create(item_id=1, name='Item', price=Decimal('1.00'))
+
+    page = ItemRepository.get_page('not-a-cursor', limit=3)
+
+    assert page.is_first
+    assert [item.item_id for item in page] == [1]
@@ -0,0 +1,74 @@
+"""
+The batch pricer agrees exactly with the scalar Decimal methods
+"""
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from hypothesis import given, strategies as st
+
+from pos import pricing
+from pos.models import Coupon, Item, Rental, Sale, SaleItem
+from pos.repositories.sale_repository import SaleRepository
+
+cents = st.integers(min_value=0, max_value=10**9)
+rates = st.sampled_from([0.1, 0.05, 0.125, 0.15, 0.333, 0.0])
+percentages = st.integers(min_value=0, max_value=10000).map(lambda basis_points: Decimal(basis_points).scaleb(-2))
+tax_rates = st.sampled_from([1.06, 1.0725, 1.0, 1.2])
+
+
+@given(st.lists(st.tuples(cents, st.integers(1, 100), st.integers(-30, 3650)), max_size=50), rates)
+def test_late_fees_match_scalar(rentals, rate):
+    prices, quantities, days = zip(*rentals) if rentals else ((), (), ())
+    fees = pricing.late_fees(prices, quantities, days, rate)
+    assert [pricing.from_cents(fee) for fee in fees] == [
+        Rental.late_fee_for(pricing.from_cents(price), quantity, day, rate)
+        for price, quantity, day in rentals
+    ]
+
+
+@given(st.lists(st.tuples(st.integers(-60, 60), st.booleans()), max_size=50))
+def test_days_late_match_scalar(rentals):
+    today = date.today()
+    rows = [Rental(due_date=today + timedelta(days=offset), is_returned=returned) for offset, returned in rentals]
+    days = pricing.days_late([row.due_date for row in rows], [row.is_returned for row in rows], today)
+    assert list(days) == [row.calculate_days_late() for row in rows]
+
+
+@given(st.lists(st.tuples(cents, st.one_of(st.none(), percentages)), max_size=50), tax_rates)
+def test_sale_totals_match_scalar(sales, tax_rate):
+    discount_rates = [Decimal('1.00') if percentage is None else Decimal('1.00') - percentage / Decimal('100')
+                      for _, percentage in sales]
+    totals = pricing.sale_totals([subtotal for subtotal, _ in sales], discount_rates, tax_rate)
+    for index, ((subtotal, _), discount_rate) in enumerate(zip(sales, discount_rates)):
+        expected = SaleRepository.compute_totals(pricing.from_cents(subtotal), tax_rate, discount_rate)
+        assert {field: pricing.from_cents(column[index]) for field, column in totals.items()} == expected
+
+
+def test_cents_conversion_is_exact():
+    assert pricing.to_cents(Decimal('19.99')) == 1999
+    assert pricing.to_cents(0.1) == 10
+    assert pricing.from_cents(-5) == Decimal('-0.05')
+    with pytest.raises(ValueError):
+        pricing.to_cents(Decimal('0.005'))
+
+
+@pytest.mark.django_db
+def test_bulk_recalculation_matches_calculate_total(employee):
+    coupon = Coupon.objects.create(code='SAVE12', discount_percentage=Decimal('12.50'))
+    items = [Item.objects.create(item_id=i, name=f'Item {i}', price=price)
+             for i, price in enumerate([Decimal('0.10'), Decimal('0.20'), Decimal('19.99')], start=1)]
+    sales = []
+    for index, sale_coupon in enumerate([None, coupon, coupon, None]):
+        sale = Sale.objects.create(total_amount=Decimal('0.00'), employee=employee, coupon=sale_coupon)
+        for item in items[:index]:
+            SaleItem.objects.create(sale=sale, item=item, quantity=3, unit_price=item.price,
+                                    subtotal=item.price * 3)
+        sales.append(sale)
+
+    assert SaleRepository.recalculate_totals(tax_rate=1.06, batch_size=2) == 4
+    fields = ['subtotal', 'discount_amount', 'tax_amount', 'total_amount']
+    bulk = [[getattr(Sale.objects.get(id=sale.id), field) for field in fields] for sale in sales]
+    scalar = [[getattr(SaleRepository.calculate_total(Sale.objects.get(id=sale.id)), field) for field in fields]
+              for sale in sales]
+    assert bulk == scalar
@@ -0,0 +1,81 @@
+"""
+Per-view request histograms
+"""
+import multiprocessing
+import sys
+
+import pytest
+
+from pos.metrics import RequestMetrics, _percentile, request_metrics
+
+
+def test_percentiles_interpolate_within_buckets():
+    bounds = [10, 20, 50]
+    counts = [50, 40, 10, 0]  # 100 samples, none above 50
+    assert _percentile(counts, bounds, 100, 50) == 10
+    assert _percentile(counts, bounds, 100, 70) == pytest.approx(15)
+    assert _percentile(counts, bounds, 100, 95) == pytest.approx(35)
+    assert _percentile([0, 0, 0, 3], bounds, 3, 99) == 50
+    assert _percentile(counts, bounds, 100, 70, interpolate=False) == 20
+
+
+def record_in_child(path):
+    RequestMetrics(path).record('pos:sale_create', wall_ms=12, queries=3, db_ms=2, size=4096)
+
+
+def record_with_inherited(metrics):
+    inherited = metrics._map
+    metrics.record('pos:sale_create', wall_ms=10, queries=3, db_ms=1, size=1024)
+    sys.exit(0 if inherited.closed and metrics._map is not inherited else 1)
+
+
+def test_forked_worker_remaps_instead_of_reusing_the_parent_mapping(tmp_path):
+    metrics = RequestMetrics(str(tmp_path / 'metrics.bin'))
+    metrics.record('pos:sale_create', wall_ms=8, queries=3, db_ms=1, size=2048)
+    child = multiprocessing.get_context('fork').Process(target=record_with_inherited, args=(metrics,))
+    child.start()
+    child.join()
+
+    assert child.exitcode == 0
+    assert metrics.report()['pos:sale_create']['wall_ms']['count'] == 2
+
+
+def test_worker_processes_share_histograms(tmp_path):
+    path = str(tmp_path / 'metrics.bin')
+    metrics = RequestMetrics(path)
+    metrics.record('pos:sale_create', wall_ms=8, queries=3, db_ms=1, size=2048)
+    child = multiprocessing.get_context('fork').Process(target=record_in_child, args=(path,))
+    child.start()
+    child.join()
+
+    report = metrics.report()['pos:sale_create']
+    assert report['wall_ms']['count'] == 2
+    assert report['wall_ms']['mean'] == pytest.approx(10)
+    assert report['queries']['p99'] == 3
+
+    metrics.record('/not/a/pos/view', wall_ms=1, queries=0, db_ms=0, size=None)
+    assert 'bytes' not in metrics.report()['other']
+    metrics.reset()
+    assert metrics.report() == {}
+
+
+@pytest.mark.django_db
+def test_middleware_records_by_url_name(employee_client, employee):
+    employee_client.get('/sale/list/')
+    report = request_metrics.report()
+    # The fixture's warm-up request to the dashboard is recorded too
+    assert report['pos:dashboard']['wall_ms']['count'] == 1
+    assert report['pos:sale_list']['queries']['p50'] == 1
+    assert report['pos:sale_list']['bytes']['count'] == 1
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_admin_only(employee_client):
+    assert employee_client.get('/metrics/').status_code == 403
+
+    session = employee_client.session
+    session['is_admin'] = True
+    session.save()
+    response = employee_client.get('/metrics/')
+    assert response.status_code == 200
+    assert 'pos:dashboard' in response.json()
@@ -0,0 +1,63 @@
+"""
+Tests for stock reservations held by open carts.
+"""
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+
+from pos.cart import Cart
+from pos.models import StockReservation
+from pos.repositories.item_repository import ItemRepository
+from pos.services.rental_service import RentalService
+from pos.services.sale_service import SaleService
+from pos.tests.conftest import FakeSession
+
+
+@pytest.mark.django_db
+def test_second_cart_cannot_take_reserved_stock(item):
+    """Stock held by one cart is refused to another at scan time."""
+    service = SaleService()
+    first, second = Cart(FakeSession()), Cart(FakeSession())
+
+    assert service.add_item_to_cart(first, item.item_id, 4)['success']
+    result = service.add_item_to_cart(second, item.item_id, 2)
+
+    assert not result['success']
+    assert result['message'] == 'Insufficient stock. Available: 1'
+    assert [i.available_sale for i in ItemRepository.get_available_for_sale()] == [1]
+
+
+@pytest.mark.django_db
+def test_expired_reservation_frees_stock(item):
+    """An abandoned cart stops holding stock once its reservation expires."""
+    service = SaleService()
+    abandoned, active = Cart(FakeSession()), Cart(FakeSession())
+    service.add_item_to_cart(abandoned, item.item_id, 5)
+    StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    assert service.add_item_to_cart(active, item.item_id, 5)['success']
+
+
+@pytest.mark.django_db
+def test_finalize_and_remove_release_reservations(session, item):
+    """Reservations go away when a line is removed or the sale completes."""
+    service = SaleService()
+    cart = Cart(session)
+    service.add_item_to_cart(cart, item.item_id, 1)
+    service.remove_item_from_cart(cart, item.item_id)
+    assert StockReservation.objects.count() == 0
+
+    service.add_item_to_cart(cart, item.item_id, 2)
+    assert service.finalize_sale(cart)['success']
+    assert StockReservation.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_rental_cannot_overbook(item):
+    """Rentals take stock with a conditional UPDATE and report what is left."""
+    assert RentalService().create_rental('5551234', item.item_id, 2)['success']
+
+    result = RentalService().create_rental('5551234', item.item_id, 2)
+
+    assert not result['success']
+    assert result['message'] == 'Insufficient rental stock. Available: 1'
@@ -0,0 +1,98 @@
+"""
+Tests for incremental sale totals and the consistency check.
+"""
+import pytest
+from decimal import Decimal
+
+from pos.cart import Cart
+from pos.models import Item, Sale, SaleItem
+from pos.repositories.sale_repository import SaleRepository
+from pos.services.sale_service import SaleService
+
+
+@pytest.fixture
+def saw(db):
+    return Item.objects.create(item_id=1002, name='Saw', price=Decimal('4.50'), stock_sale=10)
+
+
+@pytest.mark.django_db
+def test_running_totals_follow_adds_and_removes(item, saw, coupon):
+    """Totals move by delta and stay equal to a full recalculation."""
+    service = SaleService()
+    sale = service.create_sale()
+
+    service.add_item_to_sale(sale, item.item_id, 2)
+    service.add_item_to_sale(sale, saw.item_id, 3)
+    service.add_item_to_sale(sale, item.item_id, 1)
+    assert sale.subtotal == Decimal('43.50')
+
+    service.apply_coupon(sale, coupon.code)
+    service.remove_item_from_sale(sale, saw.item_id)
+
+    stored = Sale.objects.get(pk=sale.pk)
+    assert stored.subtotal == Decimal('30.00')
+    assert stored.discount_amount == Decimal('3.00')
+    assert stored.total_amount == Decimal('28.62')
+    assert service.verify_totals() == []
+
+
+@pytest.mark.django_db
+def test_edits_through_stale_copies_are_not_lost(item, saw):
+    """Two lanes holding the same sale both get their line deltas applied."""
+    service = SaleService()
+    sale = service.create_sale()
+    other_lane = Sale.objects.get(pk=sale.pk)
+
+    service.add_item_to_sale(sale, item.item_id, 1)
+    service.add_item_to_sale(other_lane, saw.item_id, 2)
+    service.add_item_to_sale(other_lane, item.item_id, 1)
+
+    stored = Sale.objects.get(pk=sale.pk)
+    assert stored.subtotal == Decimal('29.00')
+    assert service.verify_totals() == []
+
+
+@pytest.mark.django_db
+def test_verify_totals_reports_drift(item):
+    """A sale whose stored subtotal drifted from its lines is reported."""
+    service = SaleService()
+    sale = service.create_sale()
+    service.add_item_to_sale(sale, item.item_id, 2)
+    Sale.objects.filter(pk=sale.pk).update(subtotal=Decimal('99.00'))
+
+    mismatches = service.verify_totals()
+
+    assert [m['sale'].pk for m in mismatches] == [sale.pk]
+    assert mismatches[0]['expected']['subtotal'] == Decimal('20.00')
+
+
+@pytest.mark.django_db
+def test_failed_total_update_leaves_no_line(item, monkeypatch):
+    """A line is not kept when moving the sale's totals fails."""
+    service = SaleService()
+    sale = service.create_sale()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('totals unavailable')
+    monkeypatch.setattr(SaleRepository, 'apply_subtotal_delta', fail)
+
+    with pytest.raises(RuntimeError):
+        service.add_item_to_sale(sale, item.item_id, 2)
+    assert not SaleItem.objects.filter(sale=sale).exists()
+
+
+@pytest.mark.django_db
+def test_finalize_corrects_a_drifted_cart_subtotal(session, item, employee):
+    """A cart whose running subtotal drifted is finalized with its lines' totals."""
+    service = SaleService()
+    cart = Cart(session)
+    service.add_item_to_cart(cart, item.item_id, 2)
+    cart._subtotal = Decimal('99.00')
+
+    result = service.finalize_sale(cart, employee)
+
+    assert result['success']
+    stored = Sale.objects.get(pk=result['sale'].pk)
+    assert stored.subtotal == Decimal('20.00')
+    assert stored.total_amount == Decimal('21.20')
+    assert service.verify_totals() == []
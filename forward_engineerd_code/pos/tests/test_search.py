@@ -0,0 +1,90 @@
+"""
+Tests for the FTS5 item search.
+"""
+import io
+
+import pytest
+from decimal import Decimal
+
+from django.core.management import call_command
+
+from pos.models import Item
+from pos.repositories import item_search
+from pos.services.inventory_service import InventoryService
+
+
+@pytest.fixture
+def catalogue(db):
+    Item.objects.bulk_create([
+        Item(item_id=1001, name='Claw Hammer', price=Decimal('10.00')),
+        Item(item_id=1002, name='Sledge Hammer Heavy Duty', price=Decimal('30.00')),
+        Item(item_id=2001, name='Cordless Drill', price=Decimal('80.00')),
+        Item(item_id=3001, name='Paint Roller', price=Decimal('5.00')),
+    ])
+
+
+def names(items):
+    return [item.name for item in items]
+
+
+@pytest.mark.django_db
+def test_prefix_search_ranks_shorter_names_first(catalogue):
+    """Every word must match; the last one may be a prefix."""
+    service = InventoryService()
+
+    assert names(service.search_items('hamm')) == ['Claw Hammer', 'Sledge Hammer Heavy Duty']
+    assert names(service.search_items('cordless dr')) == ['Cordless Drill']
+    assert names(service.search_items('hammer heavy')) == ['Sledge Hammer Heavy Duty']
+
+
+@pytest.mark.django_db
+def test_search_by_item_id_prefix(catalogue):
+    assert names(InventoryService().search_items('200')) == ['Cordless Drill']
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_catches_typos_and_substrings(catalogue):
+    service = InventoryService()
+
+    assert names(service.search_items('hamer'))[:2] == ['Claw Hammer', 'Sledge Hammer Heavy Duty']
+    assert names(service.search_items('oller')) == ['Paint Roller']
+
+
+@pytest.mark.django_db
+def test_index_follows_renames_and_deletes(catalogue):
+    """Triggers keep the index in sync, including for queryset updates."""
+    service = InventoryService()
+    Item.objects.filter(item_id=3001).update(name='Paint Tray')
+    Item.objects.filter(item_id=2001).delete()
+
+    assert names(service.search_items('tray')) == ['Paint Tray']
+    assert service.search_items('roller') == []
+    assert service.search_items('cordless') == []
+
+
+@pytest.mark.django_db
+def test_broad_queries_rank_every_match(catalogue):
+    """The best match is found however many rows the query matches."""
+    Item.objects.bulk_create([
+        Item(item_id=5000 + i, name=f'Hammer Handle Spare Part Number {i}', price=Decimal('1.00'))
+        for i in range(300)
+    ])
+    Item.objects.create(item_id=9999, name='Hammer', price=Decimal('12.00'))
+
+    assert names(InventoryService().search_items('hammer', limit=1)) == ['Hammer']
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_falls_back_without_trigram_index(catalogue, monkeypatch):
+    monkeypatch.setattr(item_search, 'has_trigram_index', lambda: False)
+
+    assert names(InventoryService().search_items('oller')) == ['Paint Roller']
+
+
+@pytest.mark.django_db
+def test_benchmark_command_leaves_the_catalogue_alone(item):
+    out = io.StringIO()
+    call_command('benchmark_item_search', items=300, repeat=2, stdout=out)
+    assert 'Inserted 300 items' in out.getvalue()
+    assert 'two words' in out.getvalue()
+    assert list(Item.objects.all()) == [item]
@@ -0,0 +1,72 @@
+"""
+Tests for conditional, race-free stock updates.
+"""
+import pytest
+from decimal import Decimal
+
+from pos.cart import Cart
+from pos.models import Item, Rental, Sale
+from pos.repositories.item_repository import ItemRepository
+from pos.services.rental_service import RentalService
+from pos.services.sale_service import SaleService
+
+
+@pytest.mark.django_db
+def test_decrement_refuses_to_oversell(item):
+    """A decrease larger than the remaining stock changes nothing."""
+    assert not ItemRepository.update_stock_sale(item.item_id, 6)
+    assert ItemRepository.update_stock_sale(item.item_id, 5)
+    assert Item.objects.get(pk=item.pk).stock_sale == 0
+
+
+@pytest.mark.django_db
+def test_batch_decrement_is_all_or_nothing(item):
+    """One short line rolls back every other line of the batch."""
+    saw = Item.objects.create(item_id=1002, name='Saw', price=Decimal('4.50'), stock_sale=1)
+
+    results = ItemRepository.decrement_stock_sale({item.item_id: 2, saw.item_id: 2})
+
+    assert results == {item.item_id: True, saw.item_id: False}
+    assert Item.objects.get(pk=item.pk).stock_sale == 5
+    assert Item.objects.get(pk=saw.pk).stock_sale == 1
+
+
+@pytest.mark.django_db
+def test_finalize_rejects_oversold_cart(session, item):
+    """Stock sold by another lane after scanning makes finalize fail cleanly."""
+    service = SaleService()
+    cart = Cart(session)
+    service.add_item_to_cart(cart, item.item_id, 3)
+    Item.objects.filter(pk=item.pk).update(stock_sale=2)
+
+    result = service.finalize_sale(cart)
+
+    assert not result['success']
+    assert Sale.objects.count() == 0
+    assert Item.objects.get(pk=item.pk).stock_sale == 2
+    assert not cart.is_empty()
+
+
+@pytest.mark.django_db
+def test_rental_cannot_overbook(item):
+    """A rental larger than the rental stock is refused without side effects."""
+    service = RentalService()
+
+    result = service.create_rental('5551234', item.item_id, 4)
+
+    assert not result['success']
+    assert Rental.objects.count() == 0
+    assert Item.objects.get(pk=item.pk).stock_rental == 3
+
+
+@pytest.mark.django_db
+def test_finalize_logs_sale_once(session, item, employee):
+    """A completed sale writes exactly one sale_completed log entry."""
+    service = SaleService()
+    cart = Cart(session)
+    service.add_item_to_cart(cart, item.item_id, 1)
+
+    result = service.finalize_sale(cart, employee)
+
+    assert result['success']
+    assert employee.logs.filter(action='sale_completed').count() == 1
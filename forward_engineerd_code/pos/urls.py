@@ -8,7 +8,9 @@ from pos.views import (
     sale_create_view, sale_detail_view, sale_list_view,
     rental_create_view, rental_return_view, rental_list_view,
     item_list_view, item_create_view, item_detail_view, item_update_view,
+    catalog_cache_stats_view,
     employee_list_view, employee_create_view, employee_update_view,
+    request_metrics_view,
 )
 
 app_name = 'pos'
@@ -35,10 +37,12 @@ urlpatterns = [
     path('item/create/', item_create_view, name='item_create'),
     path('item/<int:item_id>/', item_detail_view, name='item_detail'),
     path('item/<int:item_id>/update/', item_update_view, name='item_update'),
+    path('item/cache/stats/', catalog_cache_stats_view, name='catalog_cache_stats'),
     
     # Admin
     path('employee/list/', employee_list_view, name='employee_list'),
     path('employee/create/', employee_create_view, name='employee_create'),
     path('employee/<str:username>/update/', employee_update_view, name='employee_update'),
+    path('metrics/', request_metrics_view, name='request_metrics'),
 ]
 
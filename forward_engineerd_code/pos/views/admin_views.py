@@ -2,6 +2,7 @@
 Admin Views
 """
 
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
@@ -9,6 +10,8 @@ from django.contrib.auth.decorators import user_passes_test
 from pos.views.auth_views import employee_login_required
 from pos.forms.employee_forms import EmployeeForm
 from pos.services.employee_service import EmployeeService
+from pos.repositories.employee_repository import EmployeeRepository
+from pos.metrics import request_metrics
 from pos.models import Employee
 
 
@@ -81,6 +84,7 @@ def employee_update_view(request, username):
             if form.cleaned_data['password']:
                 employee.set_password(form.cleaned_data['password'])
             form.save()
+            EmployeeRepository.invalidate_cached(username)
             messages.success(request, 'Employee updated successfully')
             return redirect('pos:employee_list')
     else:
@@ -92,3 +96,11 @@ def employee_update_view(request, username):
     }
     return render(request, 'pos/employee_update.html', context)
 
+
+@employee_login_required
+def request_metrics_view(request):
+    """Per-view request time, query and size percentiles of all workers (admin only)"""
+    if not request.session.get('is_admin', False):
+        return JsonResponse({'error': 'Access denied. Admin only.'}, status=403)
+    
+    return JsonResponse(request_metrics.report())
@@ -9,6 +9,7 @@ from django.contrib.auth.decorators import login_required
 from functools import wraps
 from pos.forms.auth_forms import LoginForm
 from pos.services.employee_service import EmployeeService
+from pos.services.rental_service import RentalService
 
 
 def employee_login_required(view_func):
@@ -57,14 +58,9 @@ def login_view(request):
 @employee_login_required
 def logout_view(request):
     """Logout view"""
-    if 'employee_id' in request.session:
-        from pos.services.employee_service import EmployeeService
+    if request.employee:
         employee_service = EmployeeService()
-        from pos.repositories.employee_repository import EmployeeRepository
-        employee_repo = EmployeeRepository()
-        employee = employee_repo.get_by_username(request.session['employee_id'])
-        if employee:
-            employee_service.logout(employee)
+        employee_service.logout(request.employee)
     
     request.session.flush()
     messages.success(request, 'You have been logged out successfully.')
@@ -78,6 +74,7 @@ def dashboard_view(request):
         'employee_name': request.session.get('employee_name', 'User'),
         'employee_position': request.session.get('employee_position', 'Cashier'),
         'is_admin': request.session.get('is_admin', False),
+        'due_calendar': RentalService().get_due_calendar(),
     }
     return render(request, 'pos/dashboard.html', context)
 
@@ -6,10 +6,12 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import user_passes_test
+from django.http import JsonResponse
 from pos.views.auth_views import employee_login_required
 from pos.forms.item_forms import ItemForm
 from pos.services.inventory_service import InventoryService
 from pos.models import Item
+from pos.config import SystemConfig
 
 
 def is_admin(user):
@@ -19,12 +21,20 @@ def is_admin(user):
 
 @employee_login_required
 def item_list_view(request):
-    """List all items"""
+    """List all items, or the items matching a search query"""
     inventory_service = InventoryService()
-    items = inventory_service.get_all_items()
+    query = request.GET.get('q', '').strip()
+    
+    if query:
+        items = inventory_service.search_items(query, SystemConfig.get_page_size())
+        page = None
+    else:
+        items = page = inventory_service.get_items_page(request.GET.get('after'))
     
     context = {
         'items': items,
+        'page': page,
+        'query': query,
     }
     return render(request, 'pos/item_list.html', context)
 
@@ -48,7 +58,8 @@ def item_create_view(request):
                     price=float(form.cleaned_data['price']),
                     stock_sale=form.cleaned_data['stock_sale'],
                     stock_rental=form.cleaned_data['stock_rental'],
-                    item_type=form.cleaned_data['item_type']
+                    item_type=form.cleaned_data['item_type'],
+                    reorder_threshold=form.cleaned_data['reorder_threshold']
                 )
                 messages.success(request, 'Item created successfully')
                 return redirect('pos:item_detail', item_id=item.item_id)
@@ -108,3 +119,12 @@ def item_update_view(request, item_id):
     }
     return render(request, 'pos/item_update.html', context)
 
+
+@employee_login_required
+def catalog_cache_stats_view(request):
+    """Catalog cache hit/miss counters of this process (admin only)"""
+    if not request.session.get('is_admin', False):
+        return JsonResponse({'error': 'Access denied. Admin only.'}, status=403)
+    
+    inventory_service = InventoryService()
+    return JsonResponse(inventory_service.get_catalog_cache_stats())
@@ -2,6 +2,7 @@
 Rental Views
 """
 
+from datetime import date
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
@@ -9,7 +10,6 @@ from pos.views.auth_views import employee_login_required
 from pos.forms.rental_forms import RentalForm, ReturnForm
 from pos.services.rental_service import RentalService
 from pos.services.inventory_service import InventoryService
-from pos.repositories.employee_repository import EmployeeRepository
 
 
 @employee_login_required
@@ -17,9 +17,7 @@ def rental_create_view(request):
     """Create new rental"""
     rental_service = RentalService()
     inventory_service = InventoryService()
-    employee_repo = EmployeeRepository()
-    
-    employee = employee_repo.get_by_username(request.session.get('employee_id'))
+    employee = request.employee
     
     if request.method == 'POST':
         form = RentalForm(request.POST)
@@ -48,49 +46,44 @@ def rental_create_view(request):
 
 @employee_login_required
 def rental_return_view(request):
-    """Process rental return"""
+    """Process rental returns: one typed rental ID, or several ticked rentals"""
     rental_service = RentalService()
-    employee_repo = EmployeeRepository()
-    
-    employee = employee_repo.get_by_username(request.session.get('employee_id'))
+    employee = request.employee
     
     if request.method == 'POST':
         form = ReturnForm(request.POST)
         if form.is_valid():
             # Get outstanding rentals for customer
-            outstanding = rental_service.get_outstanding_rentals(
-                form.cleaned_data['phone_number']
-            )
+            phone_number = form.cleaned_data['phone_number']
+            outstanding = rental_service.get_outstanding_rentals(phone_number)
             
             if not outstanding:
                 messages.error(request, 'No outstanding rentals found for this customer')
                 return redirect('pos:rental_return')
             
-            # Find rental by ID
-            rental_id = form.cleaned_data.get('rental_id')
-            if rental_id:
-                result = rental_service.process_return(rental_id, employee)
+            rental_ids = form.cleaned_data['rental_ids']
+            if not rental_ids:
+                # Phone number only: list the customer's rentals to pick from
+                context = {
+                    'form': form,
+                    'outstanding_rentals': outstanding,
+                    'phone_number': phone_number,
+                }
+                return render(request, 'pos/rental_return.html', context)
+            
+            if not set(rental_ids) <= {rental.id for rental in outstanding}:
+                messages.error(request, 'Rental not found for this customer')
+            else:
+                result = rental_service.process_returns(rental_ids, employee)
                 if result['success']:
                     messages.success(
                         request,
-                        f"Return processed! Late fee: ${result['late_fee']}"
+                        f"Return processed! {len(result['rentals'])} rental(s), "
+                        f"late fee: ${result['late_fee_total']}"
                     )
                     return redirect('pos:rental_list')
                 else:
                     messages.error(request, result['message'])
-            else:
-                messages.error(request, 'Please select a rental to return')
-        else:
-            # Show outstanding rentals for phone number
-            phone_number = request.POST.get('phone_number')
-            if phone_number:
-                outstanding = rental_service.get_outstanding_rentals(phone_number)
-                context = {
-                    'form': form,
-                    'outstanding_rentals': outstanding,
-                    'phone_number': phone_number,
-                }
-                return render(request, 'pos/rental_return.html', context)
     else:
         form = ReturnForm()
     
@@ -104,10 +97,22 @@ def rental_return_view(request):
 def rental_list_view(request):
     """List all rentals"""
     rental_service = RentalService()
-    rentals = rental_service.get_all_outstanding_rentals()
+    try:
+        due = date.fromisoformat(request.GET['due']) if request.GET.get('due') else None
+    except ValueError:
+        due = None
     
-    context = {
-        'rentals': rentals,
-    }
+    if due:
+        # One day of the dashboard's due-date heatmap
+        context = {
+            'rentals': rental_service.get_rentals_due(due),
+            'due': due,
+        }
+    else:
+        page = rental_service.get_outstanding_page(request.GET.get('after'))
+        context = {
+            'rentals': page,
+            'page': page,
+        }
     return render(request, 'pos/rental_list.html', context)
 
@@ -2,16 +2,15 @@
 Sale Views
 """
 
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from pos.views.auth_views import employee_login_required
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from pos.forms.sale_forms import SaleItemForm, CouponForm
 from pos.services.sale_service import SaleService
 from pos.services.inventory_service import InventoryService
-from pos.repositories.employee_repository import EmployeeRepository
-from pos.models import Sale
+from pos.cart import Cart
 
 
 @employee_login_required
@@ -19,28 +18,16 @@ def sale_create_view(request):
     """Create new sale"""
     sale_service = SaleService()
     inventory_service = InventoryService()
-    employee_repo = EmployeeRepository()
     
-    # Get current employee
-    employee = employee_repo.get_by_username(request.session.get('employee_id'))
-    
-    # Get or create current sale from session
-    sale_id = request.session.get('current_sale_id')
-    if sale_id:
-        sale = sale_service.get_sale(sale_id)
-        if not sale:
-            sale = sale_service.create_sale(employee=employee)
-            request.session['current_sale_id'] = sale.id
-    else:
-        sale = sale_service.create_sale(employee=employee)
-        request.session['current_sale_id'] = sale.id
+    # The open sale lives in the session until it is finalized
+    cart = Cart(request.session)
     
     if request.method == 'POST':
         if 'add_item' in request.POST:
             item_form = SaleItemForm(request.POST)
             if item_form.is_valid():
-                result = sale_service.add_item_to_sale(
-                    sale,
+                result = sale_service.add_item_to_cart(
+                    cart,
                     item_form.cleaned_data['item_id'],
                     item_form.cleaned_data['quantity']
                 )
@@ -53,8 +40,8 @@ def sale_create_view(request):
         elif 'apply_coupon' in request.POST:
             coupon_form = CouponForm(request.POST)
             if coupon_form.is_valid():
-                result = sale_service.apply_coupon(
-                    sale,
+                result = sale_service.apply_coupon_to_cart(
+                    cart,
                     coupon_form.cleaned_data['coupon_code']
                 )
                 if result['success']:
@@ -65,17 +52,17 @@ def sale_create_view(request):
         
         elif 'remove_item' in request.POST:
             item_id = request.POST.get('item_id')
-            if sale_service.remove_item_from_sale(sale, int(item_id)):
+            if sale_service.remove_item_from_cart(cart, int(item_id)):
                 messages.success(request, 'Item removed from sale')
             else:
                 messages.error(request, 'Failed to remove item')
             return redirect('pos:sale_create')
         
         elif 'finalize' in request.POST:
-            result = sale_service.finalize_sale(sale)
+            result = sale_service.finalize_sale(cart, request.employee)
             if result['success']:
+                sale = result['sale']
                 messages.success(request, f"Sale completed! Total: ${sale.total_amount}")
-                del request.session['current_sale_id']
                 return redirect('pos:sale_detail', sale_id=sale.id)
             else:
                 messages.error(request, result['message'])
@@ -86,7 +73,8 @@ def sale_create_view(request):
     available_items = inventory_service.get_available_for_sale()
     
     context = {
-        'sale': sale,
+        'cart': cart,
+        'totals': sale_service.get_cart_totals(cart),
         'item_form': item_form,
         'coupon_form': coupon_form,
         'available_items': available_items,
@@ -97,7 +85,10 @@ def sale_create_view(request):
 @employee_login_required
 def sale_detail_view(request, sale_id):
     """View sale details"""
-    sale = get_object_or_404(Sale, id=sale_id)
+    sale_service = SaleService()
+    sale = sale_service.get_sale_with_items(sale_id)
+    if not sale:
+        raise Http404('Sale not found')
     context = {
         'sale': sale,
     }
@@ -108,10 +99,11 @@ def sale_detail_view(request, sale_id):
 def sale_list_view(request):
     """List all sales"""
     sale_service = SaleService()
-    sales = sale_service.sale_repo.get_all()
+    page = sale_service.get_sales_page(request.GET.get('after'))
     
     context = {
-        'sales': sales,
+        'sales': page,
+        'page': page,
     }
     return render(request, 'pos/sale_list.html', context)
 